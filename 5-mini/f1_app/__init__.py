@@ -1,2 +1,2 @@
 # f1_app package
-__all__ = ['cache', 'aggregator', 'standings', 'server']
+__all__ = ['cache', 'aggregator', 'standings', 'server', 'text', 'fields', 'parsers', 'assets', 'progression', 'ergast_cache', 'schedule', 'deadline', 'news_store', 'profiling', 'lazy', 'ratelimit', 'thumbnails']
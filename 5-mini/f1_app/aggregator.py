@@ -1,8 +1,18 @@
-import xml.etree.ElementTree as ET
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from email.utils import parsedate_to_datetime
-import requests
 import os
+import threading
 import traceback
+from . import deadline
+from .lazy import LazyModule
+from .parsers import get_parser
+from .profiling import phase
+from .schedule import FeedSchedule
+from .text import clean_summary, strip_html
+
+requests = LazyModule('requests')
 
 
 def _append_debug_log(text: str):
@@ -16,34 +26,47 @@ def _append_debug_log(text: str):
 
 
 class FeedAggregator:
-    def __init__(self, feeds, timeout=6, max_items=50):
+    def __init__(self, feeds, timeout=6, max_items=50, summary_length=200, parser=None, schedule=None, max_workers=4,
+                 thumbnails=None):
         self.feeds = feeds
+        self.max_workers = max_workers
         self.timeout = timeout
         self.max_items = max_items
-    self.session = requests.Session()
-    self.last_error = None
-    self.last_fetch = None
+        # backend name from parsers.PARSERS ('etree', 'lxml', 'feedparser') or an instance
+        self.parser = get_parser(parser)
+        # summaries are reduced to plain text of at most this many chars at ingest
+        self.summary_length = summary_length
+        self._session = None
+        self.last_error = None
+        self.last_fetch = None
+        self.partial = False  # the last fetch ran out of time before every due feed was polled
+        # each feed is re-polled on its own learned interval; between polls its last items are reused
+        self.schedule = schedule or FeedSchedule()
+        self._feed_items = {}
+        self._merged = None
+        self._lock = threading.Lock()
+        # a thumbnails.ThumbnailCache: feed images may be fetched through it
+        self.thumbnails = thumbnails
 
-    def _parse_rss_text(self, text):
+    @property
+    def session(self):
+        # made on the first fetch, so requests is not imported at startup (see lazy.py)
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def parse(self, content):
+        """Parse raw feed bytes with the configured backend into cleaned items."""
         items = []
-        try:
-            root = ET.fromstring(text)
-        except Exception:
-            return items
-        for item in root.findall('.//item'):
-            title = item.findtext('title') or ''
-            link = item.findtext('link') or ''
-            summary = item.findtext('description') or ''
-            pub = item.findtext('pubDate') or ''
-            items.append({'title': title, 'link': link, 'summary': summary, 'published': pub})
-        if not items:
-            for entry in root.findall('.//{http://www.w3.org/2005/Atom}entry'):
-                title = entry.findtext('{http://www.w3.org/2005/Atom}title') or ''
-                link_el = entry.find('{http://www.w3.org/2005/Atom}link')
-                link = link_el.get('href') if link_el is not None else ''
-                summary = entry.findtext('{http://www.w3.org/2005/Atom}summary') or entry.findtext('{http://www.w3.org/2005/Atom}content') or ''
-                pub = entry.findtext('{http://www.w3.org/2005/Atom}updated') or entry.findtext('{http://www.w3.org/2005/Atom}published') or ''
-                items.append({'title': title, 'link': link, 'summary': summary, 'published': pub})
+        for e in self.parser.parse(content):
+            items.append({
+                'title': strip_html(e['title']),
+                'link': e['link'],
+                'summary': clean_summary(e['summary'], self.summary_length),
+                'published': e['published'],
+                'published_ts': self._to_ts(e['published']),
+                'image': e.get('image', ''),
+            })
         return items
 
     def _to_ts(self, pub_val):
@@ -59,30 +82,68 @@ class FeedAggregator:
         try:
             dt = parsedate_to_datetime(pub_val)
             return dt.timestamp()
+        except Exception:
+            pass
+        # Atom dates are ISO 8601
+        try:
+            return datetime.fromisoformat(pub_val.strip().replace('Z', '+00:00')).timestamp()
         except Exception:
             return 0
 
     def fetch(self):
+        """Poll the feeds that are due and return the merged, deduped items."""
         import time as _time
-        items = []
-        self.last_error = None
-        self.last_fetch = _time.time()
-        for feed in self.feeds:
-            try:
-                r = self.session.get(feed, timeout=self.timeout)
-                if r.status_code == 200 and r.text:
-                    parsed_items = self._parse_rss_text(r.text)
-                    for e in parsed_items:
-                        ts = self._to_ts(e.get('published'))
-                        e['published_ts'] = ts
-                        e['source'] = feed
-                        items.append(e)
-            except Exception:
-                # record the last error but keep going with other feeds
-                tb = traceback.format_exc()
-                self.last_error = tb
-                _append_debug_log('[aggregator] ' + tb)
-                continue
+        # a concurrent fetch is already polling: wait for it, but not past the request deadline
+        if not self._lock.acquire(timeout=deadline.remaining(-1)):
+            deadline.mark_partial()
+            return self._merged or []
+        try:
+            now = _time.time()
+            due = [f for f in self.feeds if self.schedule.due(f, now)]
+            if not due and self._merged is not None:
+                return self._merged
+            self.last_error = None
+            self.last_fetch = now
+            self.partial = False
+            if len(due) == 1:
+                self._poll(due[0], now)
+            elif due:
+                # poll due feeds side by side so one slow feed does not use up the whole request budget
+                with ThreadPoolExecutor(max_workers=min(len(due), self.max_workers)) as pool:
+                    for feed in due:
+                        pool.submit(contextvars.copy_context().run, self._poll, feed, now)
+            with phase('dedupe'):
+                self._merged = self._merge()
+            return self._merged
+        finally:
+            self._lock.release()
+
+    def _poll(self, feed, now):
+        try:
+            r = deadline.fetch(self.session, feed, self.timeout)
+            r.raise_for_status()
+            with phase('parse'):
+                items = self.parse(r.content)
+        except deadline.DeadlineExceeded:
+            # out of time (or shed): the feed stays due and keeps its old items
+            self.partial = True
+            return
+        except Exception:
+            # record the last error but keep going with other feeds (and keep their old items)
+            tb = traceback.format_exc()
+            self.last_error = tb
+            _append_debug_log('[aggregator] ' + tb)
+            self.schedule.record(feed, None, now)
+            return
+        for e in items:
+            e['source'] = feed
+        self._feed_items[feed] = items
+        if self.thumbnails is not None:
+            self.thumbnails.allow(e['image'] for e in items if e.get('image'))
+        self.schedule.record(feed, [e['published_ts'] for e in items], now)
+
+    def _merge(self):
+        items = [e for feed in self.feeds for e in self._feed_items.get(feed, ())]
         # dedupe
         seen = set()
         uniq = []
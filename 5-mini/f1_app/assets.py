@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from flask import Response, abort, request
+
+try:
+    import brotli
+    HAVE_BROTLI = True
+except Exception:
+    brotli = None
+    HAVE_BROTLI = False
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# dynamic responses worth compressing on the fly
+COMPRESSIBLE = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript', 'image/svg+xml'}
+
+
+def _encodings():
+    return ['br', 'gzip'] if HAVE_BROTLI else ['gzip']
+
+
+def choose_encoding(available=None):
+    """Best content-coding the client accepts, or None for identity."""
+    offered = [e for e in _encodings() if available is None or e in available]
+    if not offered:
+        return None
+    return request.accept_encodings.best_match(offered)
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+
+
+class AssetPipeline:
+    """Fingerprints and precompresses everything under static_dir at startup.
+
+    Templates call asset_url('style.css') to get /assets/style.<hash>.css,
+    which is served from memory with an immutable Cache-Control header.
+    """
+
+    def __init__(self, static_dir, url_prefix='/assets', min_size=512):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.min_size = min_size
+        self.manifest = {}  # logical name -> hashed name
+        self._files = {}    # hashed name -> entry
+        self._build()
+
+    def _build(self):
+        if not self.static_dir or not os.path.isdir(self.static_dir):
+            return
+        for root, _dirs, files in os.walk(self.static_dir):
+            for fname in files:
+                path = os.path.join(root, fname)
+                name = os.path.relpath(path, self.static_dir).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                stem, ext = os.path.splitext(name)
+                hashed = '%s.%s%s' % (stem, digest, ext)
+                mimetype = mimetypes.guess_type(fname)[0] or 'application/octet-stream'
+                variants = {None: data}
+                if len(data) >= self.min_size and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE):
+                    for enc in _encodings():
+                        packed = compress(data, enc)
+                        if len(packed) < len(data):
+                            variants[enc] = packed
+                self.manifest[name] = hashed
+                self._files[hashed] = {'mimetype': mimetype, 'etag': digest, 'variants': variants}
+
+    def url_for(self, name):
+        hashed = self.manifest.get(name)
+        if hashed is None:
+            # unknown asset: fall back to Flask's plain static route
+            return '/static/' + name
+        return self.url_prefix + '/' + hashed
+
+    def serve(self, filename):
+        entry = self._files.get(filename)
+        if entry is None:
+            abort(404)
+        headers = {'Cache-Control': IMMUTABLE, 'Vary': 'Accept-Encoding', 'ETag': '"%s"' % entry['etag']}
+        if request.if_none_match.contains(entry['etag']):
+            return Response(status=304, headers=headers)
+        enc = choose_encoding(entry['variants'])
+        if enc:
+            headers['Content-Encoding'] = enc
+        return Response(entry['variants'][enc], mimetype=entry['mimetype'], headers=headers)
+
+    def init_app(self, app):
+        app.add_url_rule(self.url_prefix + '/<path:filename>', 'asset', self.serve)
+        app.jinja_env.globals['asset_url'] = self.url_for
+        app.after_request(self.compress_response)
+        app.extensions['assets'] = self
+
+    def compress_response(self, response):
+        """Content-negotiated compression for dynamic JSON/HTML responses."""
+        if request.endpoint in ('asset', 'static'):
+            return response
+        if response.mimetype not in COMPRESSIBLE or response.direct_passthrough:
+            return response
+        if response.status_code == 200:
+            # set before make_conditional, so a 304 varies like its 200
+            response.vary.add('Accept-Encoding')
+            # weak validator: the same entity may go out with different encodings
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        enc = choose_encoding()
+        if not enc:
+            return response
+        # cheaper levels than the startup precompression: this runs per request
+        response.set_data(compress(data, enc, level=5 if enc == 'br' else 6))
+        response.headers['Content-Encoding'] = enc
+        return response
@@ -20,3 +20,7 @@ class SimpleCache:
         with self._lock:
             self._store[key] = {'val': val, 'ts': time.time()}
         return val
+
+    def invalidate(self, key):
+        with self._lock:
+            self._store.pop(key, None)
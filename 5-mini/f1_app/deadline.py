@@ -0,0 +1,173 @@
+"""Per-request time budget and a global cap on in-flight upstream fetches.
+
+The server opens a Deadline for every request (see server.create_app). All
+upstream HTTP goes through fetch(), which clips the caller's own timeout to
+the time the request has left, waits for one of the limiter's slots no
+longer than that, and aborts a body that is still trickling in when the
+budget runs out. Callers treat DeadlineExceeded as "skip this source": they
+return what they already have and the deadline is marked partial, which
+the server turns into an X-Partial-Response header.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from .lazy import LazyModule
+from .profiling import phase
+
+requests = LazyModule('requests')
+
+CHUNK_SIZE = 16384
+
+_current = contextvars.ContextVar('f1_app_deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget is used up."""
+
+
+class UpstreamBusy(DeadlineExceeded):
+    """Shed: too many upstream fetches in flight and queued."""
+
+
+class ResponseTooLarge(Exception):
+    """The response body is larger than the caller's max_bytes."""
+
+
+class UpstreamLimiter:
+    """At most max_in_flight upstream fetches at once; up to max_queued more may wait."""
+
+    def __init__(self, max_in_flight=8, max_queued=16):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, wait):
+        with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                if self.queued >= self.max_queued:
+                    self.shed += 1
+                    raise UpstreamBusy('%d upstream fetches in flight, %d queued' % (self.in_flight, self.queued))
+                self.queued += 1
+                try:
+                    if not self._cond.wait_for(lambda: self.in_flight < self.max_in_flight, timeout=wait):
+                        raise DeadlineExceeded('no upstream slot within %.2fs' % (wait or 0))
+                finally:
+                    self.queued -= 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {'in_flight': self.in_flight, 'queued': self.queued, 'shed': self.shed,
+                    'max_in_flight': self.max_in_flight, 'max_queued': self.max_queued}
+
+
+class Deadline:
+    def __init__(self, seconds, limiter=None):
+        self.expires = time.monotonic() + seconds
+        self.limiter = limiter
+        self.partial = False  # set when a source was skipped or cut short
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def check(self):
+        if self.expired():
+            self.partial = True
+            raise DeadlineExceeded('request deadline passed')
+
+
+def current():
+    """The Deadline of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def begin(seconds, limiter=None):
+    """Start a deadline for the current context; pass the token to end()."""
+    return _current.set(Deadline(seconds, limiter))
+
+
+def end(token):
+    _current.reset(token)
+
+
+@contextmanager
+def scope(seconds, limiter=None):
+    token = begin(seconds, limiter)
+    try:
+        yield _current.get()
+    finally:
+        end(token)
+
+
+def remaining(default=None):
+    """Seconds the current request has left, or default outside a request."""
+    dl = current()
+    return default if dl is None else dl.remaining()
+
+
+def mark_partial():
+    dl = current()
+    if dl is not None:
+        dl.partial = True
+
+
+def fetch(session, url, timeout, max_bytes=None, **kwargs):
+    """session.get(url) bounded by the current deadline and the in-flight cap.
+
+    Returns the response with its body already read; raises DeadlineExceeded
+    (or UpstreamBusy) when the budget does not allow the fetch to finish, and
+    ResponseTooLarge when the body is over max_bytes.
+    """
+    with phase('fetch'):
+        dl = current()
+        if dl is None:
+            r = session.get(url, timeout=timeout, **kwargs)
+            if max_bytes is not None and len(r.content) > max_bytes:
+                raise ResponseTooLarge('%s is larger than %d bytes' % (url, max_bytes))
+            return r
+        dl.check()
+        try:
+            if dl.limiter is None:
+                return _read(session, url, dl, timeout, max_bytes, kwargs)
+            with dl.limiter.slot(dl.remaining()):
+                return _read(session, url, dl, timeout, max_bytes, kwargs)
+        except DeadlineExceeded:
+            dl.partial = True
+            raise
+
+
+def _read(session, url, dl, timeout, max_bytes, kwargs):
+    dl.check()
+    try:
+        r = session.get(url, timeout=min(timeout, dl.remaining()), stream=True, **kwargs)
+        try:
+            # the socket timeout is per read, so a slow body is checked against the deadline per chunk
+            body = bytearray()
+            for chunk in r.iter_content(CHUNK_SIZE):
+                body.extend(chunk)
+                if max_bytes is not None and len(body) > max_bytes:
+                    raise ResponseTooLarge('%s is larger than %d bytes' % (url, max_bytes))
+                dl.check()
+            r._content = bytes(body)  # what .content / .json() read
+        finally:
+            r.close()
+    except (requests.Timeout, requests.exceptions.ConnectionError) as e:
+        # a timeout clipped to the deadline (while streaming it surfaces as ConnectionError)
+        if dl.remaining() > 0.05:
+            raise
+        raise DeadlineExceeded('request deadline passed during %s' % url) from e
+    return r
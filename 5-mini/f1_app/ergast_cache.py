@@ -0,0 +1,174 @@
+"""Content cache for Ergast responses keyed by season, round and resource.
+
+Results and standings of a finished round never change, so those responses
+are written once, gzip-compressed, under cache_dir and never fetched again;
+they are decompressed lazily on first use and a bounded number stay decoded
+in memory. Everything that can still change -- the 'current' aliases, the
+newest round of the running season, season-wide listings of the running
+season -- stays on a short in-memory TTL.
+
+Seasons and rounds come from clients, so only ones that can exist are
+fetched (FIRST_SEASON up to this year, rounds 1..MAX_ROUNDS), and only
+answers that contain data go to disk: Ergast answers a round that does not
+exist with empty lists, and those stay on the short TTL like live data.
+"""
+import gzip
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from . import deadline
+from .cache import SimpleCache
+from .lazy import LazyModule
+
+ERGAST_BASE = 'http://ergast.com/api/f1'
+FIRST_SEASON = 1950
+MAX_ROUNDS = 30  # no season has come close (24 rounds in 2024)
+requests = LazyModule('requests')
+
+
+def has_data(data):
+    # MRData of a round that does not exist: its table's lists are all empty
+    tables = [v for k, v in data.items() if k.endswith('Table') and isinstance(v, dict)]
+    return any(isinstance(v, list) and v for t in tables for v in t.values())
+
+
+class ErgastCache:
+    def __init__(self, base_url=ERGAST_BASE, cache_dir=None, ttl=120, timeout=8, max_loaded=64):
+        self.base_url = base_url.rstrip('/')
+        # None keeps finished rounds in memory only (nothing survives a restart)
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_loaded = max_loaded
+        self._session = None
+        self.latest = None  # (season, round) of the newest round seen
+        self.fetches = 0
+        self._volatile = SimpleCache(ttl=ttl)
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # made on the first fetch, so requests is not imported at startup (see lazy.py)
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def note_latest(self, season, rnd):
+        """Record the newest round of the running season; every earlier round is final."""
+        latest = (int(season), int(rnd))
+        with self._lock:
+            if self.latest is None or latest > self.latest:
+                self.latest = latest
+
+    def in_range(self, season, rnd=None):
+        """Whether season/round can exist ('current' and 'last' always can)."""
+        if season != 'current' and not (str(season).isdigit() and FIRST_SEASON <= int(season) <= datetime.now().year):
+            return False
+        return rnd is None or rnd == 'last' or (str(rnd).isdigit() and 1 <= int(rnd) <= MAX_ROUNDS)
+
+    def is_final(self, season, rnd=None):
+        if not str(season).isdigit():
+            return False
+        season = int(season)
+        # a season from an earlier calendar year is over even before the newest round is known
+        if season < datetime.now().year or (self.latest is not None and season < self.latest[0]):
+            return True
+        if self.latest is None or season > self.latest[0] or rnd is None or not str(rnd).isdigit():
+            return False
+        return int(rnd) < self.latest[1]
+
+    def _url_path(self, season, rnd, resource):
+        parts = [str(season)] + ([str(rnd)] if rnd is not None else []) + [resource]
+        return '/'.join(parts) + '.json'
+
+    def _key(self, season, rnd, resource, params):
+        suffix = ''.join('-%s%s' % (k, params[k]) for k in sorted(params))
+        return '%s/%s/%s%s' % (season, 'season' if rnd is None else rnd, resource, suffix)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, *key.split('/')) + '.json.gz'
+
+    def _fetch(self, season, rnd, resource, params):
+        path = self._url_path(season, rnd, resource)
+        r = deadline.fetch(self.session, '%s/%s' % (self.base_url, path), self.timeout, params=params or None)
+        r.raise_for_status()
+        self.fetches += 1
+        return r.json()['MRData']
+
+    def has(self, season, rnd, resource, **params):
+        key = self._key(season, rnd, resource, params)
+        with self._lock:
+            if key in self._loaded:
+                return True
+        return bool(self.cache_dir) and os.path.exists(self._disk_path(key))
+
+    def get(self, season, rnd, resource, **params):
+        """MRData of <base>/<season>[/<round>]/<resource>.json, from cache when possible.
+
+        Raises ValueError for a season or round that cannot exist (see in_range).
+        """
+        if not self.in_range(season, rnd):
+            raise ValueError('no such season/round: %s/%s' % (season, rnd))
+        key = self._key(season, rnd, resource, params)
+        if not self.is_final(season, rnd):
+            return self._volatile.get_or_load(key, lambda: self._fetch(season, rnd, resource, params))
+        data = self._load(key)
+        if data is None:
+            # an empty answer (a round that never ran) is kept briefly in memory, never on disk
+            data = self._volatile.get_or_load(key, lambda: self._fetch(season, rnd, resource, params))
+            if has_data(data):
+                self._store(key, data)
+        return data
+
+    def put(self, season, rnd, resource, data, **params):
+        """Seed a finished round's entry (e.g. split out of a season-wide listing).
+
+        Callers pass rounds from the season's own results, so an empty entry
+        (a round without a sprint) is real data and is stored too.
+        """
+        if self.is_final(season, rnd) and self.in_range(season, rnd):
+            self._store(self._key(season, rnd, resource, params), data)
+
+    def _load(self, key):
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+        if not self.cache_dir:
+            return None
+        try:
+            with gzip.open(self._disk_path(key), 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, data)
+        return data
+
+    def _store(self, key, data):
+        self._remember(key, data)
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write-then-rename so a reader never sees a half-written entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'), mtime=0))
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._loaded[key] = data
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
@@ -0,0 +1,21 @@
+# fields a client may select with /api/news?fields=title,link,...
+NEWS_FIELDS = ('title', 'link', 'summary', 'published', 'published_ts', 'source', 'image')
+# what the dashboard cards render; the snapshot carries nothing else
+DASHBOARD_NEWS_FIELDS = ('title', 'link', 'summary', 'published', 'source', 'image')
+
+
+def parse_fields(raw):
+    """Parse a ?fields= value into a tuple of news fields; None means all fields."""
+    if not raw:
+        return None
+    fields = tuple(f.strip() for f in raw.split(',') if f.strip())
+    unknown = [f for f in fields if f not in NEWS_FIELDS]
+    if unknown:
+        raise ValueError('unknown fields: ' + ', '.join(unknown))
+    return fields
+
+
+def project_items(items, fields):
+    if fields is None:
+        return items
+    return [{k: it.get(k) for k in fields} for it in items]
@@ -0,0 +1,61 @@
+"""Heavy dependencies imported on first use instead of at startup.
+
+requests, numpy and the feed parser backends take most of the import time
+of the package, and workers are recycled often. Modules bind a LazyModule
+and the real import happens on the first attribute access, i.e. the first
+fetch or parse; create_app(prewarm=True) imports them on a background
+thread right away so that is usually done before the first request.
+"""
+import importlib
+import importlib.util
+import threading
+
+# in the order the first requests need them; the parser backend is added by the server
+PREWARM_MODULES = ('requests', 'numpy')
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def __getattr__(self, attr):
+        module = self.__dict__['_module']
+        if module is None:
+            # the import system's module locks make a concurrent first use safe
+            module = self.__dict__['_module'] = importlib.import_module(self.__dict__['_name'])
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return '<lazy module %r%s>' % (self.__dict__['_name'], '' if self.__dict__['_module'] else ' (not loaded)')
+
+
+def installed(name):
+    """Whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _import_all(modules):
+    for name in modules:
+        if not installed(name):
+            continue
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print('prewarm: importing %s failed: %s' % (name, e))
+
+
+def prewarm(modules=PREWARM_MODULES, profiler=None):
+    """Import modules on a daemon thread (profiled as 'prewarm' if a profiler is given)."""
+    def run():
+        if profiler is None:
+            _import_all(modules)
+        else:
+            with profiler.task('prewarm'):
+                _import_all(modules)
+    t = threading.Thread(target=run, name='import-prewarm', daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,85 @@
+"""Versioned news list for delta sync (/api/news?since_version=).
+
+Every time the merged news list changes, the store moves to a new version and
+remembers the list's item keys (link plus a digest of the item, so an
+edited item counts as removed and re-added). A client that sends the
+version it has gets back only the removed links and the added items with
+their position in the new list; a client whose version is no longer (or
+never was) in the history gets the full list. A version is a digest of the
+list's item keys, not a counter: every worker (and every restart) names the
+same list with the same number, so a client bouncing between workers never
+gets a delta computed against a different list that happens to share its
+version.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+
+
+def _key(item):
+    digest = hashlib.blake2b(json.dumps(item, sort_keys=True, default=str).encode('utf-8'), digest_size=8).hexdigest()
+    return '%s#%s' % (item.get('link', ''), digest)
+
+
+def _version(keys):
+    # 48 bits, so it stays exact as a JavaScript number
+    return int.from_bytes(hashlib.blake2b('\n'.join(keys).encode('utf-8'), digest_size=6).digest(), 'big')
+
+
+def _link(key):
+    return key.rsplit('#', 1)[0]
+
+
+class NewsStore:
+    def __init__(self, max_versions=50):
+        self.max_versions = max_versions
+        self._keys = ()
+        self.version = _version(self._keys)
+        self._items = {}
+        self._history = OrderedDict()
+        self._history[self.version] = self._keys
+        self._source = None
+        self._lock = Lock()
+
+    def update(self, items):
+        """Record the current list; returns the version describing it."""
+        with self._lock:
+            if items is self._source:
+                # same list object as last time (the aggregator did not re-merge)
+                return self.version
+            self._source = items
+            keys = tuple(_key(it) for it in items)
+            if keys == self._keys:
+                return self.version
+            self._items = dict(zip(keys, items))
+            self._keys = keys
+            self.version = _version(keys)
+            self._history[self.version] = keys
+            self._history.move_to_end(self.version)
+            while len(self._history) > self.max_versions:
+                self._history.popitem(last=False)
+            return self.version
+
+    def items(self):
+        with self._lock:
+            return [self._items[k] for k in self._keys], self.version
+
+    def changes_since(self, version):
+        """Delta from a client's version: {'version', 'full', 'items'} or {'version', 'full', 'added', 'removed'}."""
+        with self._lock:
+            current = self._keys
+            old = self._history.get(version)
+            if old is not None:
+                old_set, new_set = set(old), set(current)
+                added = [{'at': i, 'item': self._items[k]} for i, k in enumerate(current) if k not in old_set]
+                # resending everything is cheaper than a delta that replaces most of the list
+                if len(added) <= len(current) // 2 or not current:
+                    return {
+                        'version': self.version,
+                        'full': False,
+                        'added': added,
+                        'removed': [_link(k) for k in old if k not in new_set],
+                    }
+            # unknown version (too far behind, or a list this worker never had): full resync
+            return {'version': self.version, 'full': True, 'items': [self._items[k] for k in current]}
@@ -0,0 +1,183 @@
+"""Interchangeable RSS/Atom parser backends.
+
+Every backend takes the raw bytes of a feed that was already fetched through
+the aggregator's timed session (parsers never do network I/O) and returns a
+list of {'title', 'link', 'summary', 'published', 'image'} dicts with the
+summary still raw; cleaning and timestamps are the aggregator's job. 'image'
+is the entry's thumbnail URL (media:thumbnail, an image media:content or an
+image enclosure, in that order) or ''.
+"""
+from .lazy import LazyModule, installed
+
+# imported by the first parse (or the prewarm), not at startup
+ET = LazyModule('xml.etree.ElementTree')
+feedparser = LazyModule('feedparser')
+lxml_etree = LazyModule('lxml.etree')
+HAVE_FEEDPARSER = installed('feedparser')
+HAVE_LXML = installed('lxml')
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+MEDIA = '{http://search.yahoo.com/mrss/}'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+
+class FeedParseError(ValueError):
+    pass
+
+
+def is_image(url, mime_type=None, medium=None):
+    if not url or not url.startswith(('http://', 'https://')):
+        return False
+    if medium or mime_type:
+        return medium == 'image' or (mime_type or '').startswith('image/')
+    return url.lower().split('?')[0].endswith(IMAGE_EXTENSIONS)
+
+
+def _entry_image(el):
+    # direct children or inside <media:group>; the thumbnail is the smallest rendition
+    for thumb in el.iterfind('.//' + MEDIA + 'thumbnail'):
+        if is_image(thumb.get('url'), 'image/'):
+            return thumb.get('url')
+    for content in el.iterfind('.//' + MEDIA + 'content'):
+        if is_image(content.get('url'), content.get('type'), content.get('medium')):
+            return content.get('url')
+    for enc in el.iterfind('enclosure'):
+        if is_image(enc.get('url'), enc.get('type')):
+            return enc.get('url')
+    for link_el in el.iterfind(ATOM + 'link'):
+        if link_el.get('rel') == 'enclosure' and is_image(link_el.get('href'), link_el.get('type')):
+            return link_el.get('href')
+    return ''
+
+
+def _entries_from_root(root):
+    # shared by the ElementTree-API backends (stdlib and lxml)
+    items = []
+    for item in root.iterfind('.//item'):
+        items.append({
+            'title': item.findtext('title') or '',
+            'link': item.findtext('link') or '',
+            'summary': item.findtext('description') or '',
+            'published': item.findtext('pubDate') or '',
+            'image': _entry_image(item),
+        })
+    if not items:
+        for entry in root.iterfind('.//' + ATOM + 'entry'):
+            link = ''
+            for link_el in entry.iterfind(ATOM + 'link'):
+                if link_el.get('rel', 'alternate') == 'alternate':
+                    link = link_el.get('href') or ''
+                    break
+            items.append({
+                'title': entry.findtext(ATOM + 'title') or '',
+                'link': link,
+                'summary': entry.findtext(ATOM + 'summary') or entry.findtext(ATOM + 'content') or '',
+                'published': entry.findtext(ATOM + 'updated') or entry.findtext(ATOM + 'published') or '',
+                'image': _entry_image(entry),
+            })
+    return items
+
+
+class FeedParser:
+    name = None
+    module = None  # the library the backend imports on first use
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def parse(self, content):
+        raise NotImplementedError
+
+
+class ElementTreeParser(FeedParser):
+    name = 'etree'
+    module = 'xml.etree.ElementTree'
+
+    def parse(self, content):
+        try:
+            root = ET.fromstring(content)
+        except ET.ParseError as e:
+            raise FeedParseError(str(e))
+        return _entries_from_root(root)
+
+
+class LxmlParser(FeedParser):
+    name = 'lxml'
+    module = 'lxml.etree'
+
+    @classmethod
+    def available(cls):
+        return HAVE_LXML
+
+    def __init__(self):
+        # recover from the small XML errors real feeds ship; never resolve external entities
+        self._parser = lxml_etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=True)
+
+    def parse(self, content):
+        root = lxml_etree.fromstring(content, parser=self._parser)
+        if root is None:
+            raise FeedParseError('lxml could not parse feed')
+        return _entries_from_root(root)
+
+
+class FeedparserParser(FeedParser):
+    name = 'feedparser'
+    module = 'feedparser'
+
+    @classmethod
+    def available(cls):
+        return HAVE_FEEDPARSER
+
+    def parse(self, content):
+        # bytes in, so feedparser never opens a URL itself
+        parsed = feedparser.parse(content, sanitize_html=False, resolve_relative_uris=False)
+        if parsed.bozo and not parsed.entries:
+            raise FeedParseError(str(parsed.get('bozo_exception', 'unparseable feed')))
+        items = []
+        for e in parsed.entries:
+            summary = e.get('summary', '')
+            if not summary and e.get('content'):
+                summary = e['content'][0].get('value', '')
+            items.append({
+                'title': e.get('title', ''),
+                'link': e.get('link', ''),
+                'summary': summary,
+                'published': e.get('published', '') or e.get('updated', ''),
+                'image': self._image(e),
+            })
+        return items
+
+    @staticmethod
+    def _image(e):
+        for thumb in e.get('media_thumbnail') or []:
+            if is_image(thumb.get('url'), 'image/'):
+                return thumb['url']
+        for content in e.get('media_content') or []:
+            if is_image(content.get('url'), content.get('type'), content.get('medium')):
+                return content['url']
+        for link in e.get('links') or []:
+            if link.get('rel') == 'enclosure' and is_image(link.get('href'), link.get('type')):
+                return link['href']
+        return ''
+
+
+PARSERS = {cls.name: cls for cls in (ElementTreeParser, LxmlParser, FeedparserParser)}
+DEFAULT_PARSER = 'etree'
+
+
+def available_parsers():
+    return [name for name, cls in PARSERS.items() if cls.available()]
+
+
+def get_parser(parser=None):
+    """Resolve a backend name (or instance) to a parser; None means the default."""
+    if isinstance(parser, FeedParser):
+        return parser
+    name = parser or DEFAULT_PARSER
+    cls = PARSERS.get(name)
+    if cls is None:
+        raise ValueError('unknown feed parser %r (known: %s)' % (name, ', '.join(PARSERS)))
+    if not cls.available():
+        raise ValueError('feed parser %r is not installed' % name)
+    return cls()
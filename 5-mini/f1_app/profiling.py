@@ -0,0 +1,161 @@
+"""Opt-in sampling profiler (create_app(profile_rate=...), results on /debug/profile).
+
+A sampled request (or background task, via profiler.task()) registers its
+thread; a sampler thread reads the registered threads' stacks every
+`interval` seconds with sys._current_frames(), so the profiled code is not
+slowed by tracing and unsampled requests pay one random() call. Code marks
+what it is doing with `with phase('fetch'):` (parse, dedupe, serialize);
+the mark travels into pool threads started with contextvars.copy_context().
+Samples are counted as collapsed stacks, `route;phase;frame;... count`,
+which flamegraph.pl / inferno / speedscope turn into a flame graph.
+"""
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+OUTSIDE_PHASES = 'handler'  # profiled time not inside any phase() block
+OVERFLOW_STACK = '[other stacks]'
+
+_current = contextvars.ContextVar('f1_app_profiled', default=None)  # (profiler, label)
+
+
+@contextmanager
+def phase(name):
+    """Count the samples taken inside the block under this phase (no-op when not profiled)."""
+    profiled = _current.get()
+    if profiled is None:
+        yield
+        return
+    profiler, label = profiled
+    tid = threading.get_ident()
+    previous = profiler._enter(tid, label, name)
+    try:
+        yield
+    finally:
+        profiler._leave(tid, previous)
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return '%s:%s' % (module, getattr(code, 'co_qualname', code.co_name))
+
+
+class SamplingProfiler:
+    def __init__(self, rate=0.01, interval=0.005, max_depth=64, max_stacks=5000):
+        self.rate = rate  # fraction of requests/tasks profiled; 0 pauses profiling
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.profiled = 0
+        self.samples = 0
+        self._counts = Counter()
+        self._threads = {}  # thread id -> (label, phase)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler = None
+
+    def sampled(self):
+        return self.rate > 0 and random.random() < self.rate
+
+    def begin(self, label):
+        """Profile the current context under label; pass the token to end()."""
+        with self._lock:
+            self.profiled += 1
+        token = _current.set((self, label))
+        self._enter(threading.get_ident(), label, OUTSIDE_PHASES)
+        return token
+
+    def end(self, token):
+        self._leave(threading.get_ident(), None)
+        _current.reset(token)
+
+    @contextmanager
+    def task(self, label):
+        """Profile background work (a refresh, a prewarm) at the same sample rate."""
+        if not self.sampled():
+            yield
+            return
+        token = self.begin(label)
+        try:
+            yield
+        finally:
+            self.end(token)
+
+    def _enter(self, tid, label, phase_name):
+        with self._lock:
+            previous = self._threads.get(tid)
+            self._threads[tid] = (label, phase_name)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._sampler.start()
+        self._wake.set()
+        return previous
+
+    def _leave(self, tid, previous):
+        with self._lock:
+            if previous is None:
+                self._threads.pop(tid, None)
+            else:
+                self._threads[tid] = previous
+
+    def _run(self):
+        while True:
+            with self._lock:
+                targets = dict(self._threads)
+                if not targets:
+                    self._wake.clear()
+            if not targets:
+                # nothing profiled right now: sleep until a sampled request starts
+                self._wake.wait()
+                continue
+            self._sample(targets)
+            time.sleep(self.interval)
+
+    def _sample(self, targets):
+        frames = sys._current_frames()
+        stacks = []
+        for tid, (label, phase_name) in targets.items():
+            frame = frames.get(tid)
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                stacks.append(';'.join([label, phase_name] + names[::-1]))
+        del frames
+        with self._lock:
+            for stack in stacks:
+                if stack not in self._counts and len(self._counts) >= self.max_stacks:
+                    stack = OVERFLOW_STACK
+                self._counts[stack] += 1
+            self.samples += len(stacks)
+
+    def collapsed(self, label=None):
+        """Collapsed-stack text, one 'stack count' line per stack (optionally one route's)."""
+        with self._lock:
+            counts = sorted(self._counts.items())
+        lines = ['%s %d' % (s, n) for s, n in counts if label is None or s.startswith(label + ';')]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def stats(self):
+        with self._lock:
+            routes = {}
+            for stack, n in self._counts.items():
+                label, _, rest = stack.partition(';')
+                phases = routes.setdefault(label, {})
+                phase_name = rest.partition(';')[0]
+                phases[phase_name] = phases.get(phase_name, 0) + n
+            return {'rate': self.rate, 'interval': self.interval, 'profiled': self.profiled,
+                    'samples': self.samples, 'stacks': len(self._counts), 'routes': routes}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self.samples = 0
+            self.profiled = 0
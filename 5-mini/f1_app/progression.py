@@ -0,0 +1,282 @@
+"""Season points progression built from round-by-round Ergast results.
+
+Points are kept as dense (entity x round) arrays, one table for drivers and
+one for constructors. Cumulative points, gap to the leader and championship
+position are derived column by column, so a refresh only ever fetches and
+recomputes the newest round. Finished rounds come from the ErgastCache, so
+after the first backfill they are local reads, also across restarts. A
+finished round that comes back empty keeps a zero column and a placeholder
+in rounds, and is fetched again on the next refresh.
+"""
+import json
+import time
+import traceback
+from .aggregator import _append_debug_log
+from .ergast_cache import ERGAST_BASE, ErgastCache
+from .lazy import LazyModule, installed
+
+# numpy is imported when the first season is loaded (or by the prewarm), not at startup
+np = LazyModule('numpy')
+HAVE_NUMPY = installed('numpy')
+
+PAGE_SIZE = 100  # the Ergast-compatible mirrors cap limit= at 100
+
+
+class PointsTable:
+    """Per-round points and race wins for one kind of entity, plus derived columns.
+
+    Rows are entities in first-seen order, columns are rounds. Derived arrays:
+    cumulative points, gap to the leader after each round, championship
+    position after each round (0 = not classified yet) and position change
+    versus the previous round (positive = places gained).
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.info = {}
+        self.n_rounds = 0
+        if HAVE_NUMPY:
+            empty = lambda dtype: np.zeros((0, 0), dtype=dtype)  # noqa: E731
+            self.points, self.wins = empty(float), empty(np.int32)
+            self.cumulative, self.cum_wins = empty(float), empty(np.int32)
+            self.gap, self.position, self.change = empty(float), empty(np.int32), empty(np.int32)
+        else:
+            self.points, self.wins = [], []
+            self.cumulative, self.cum_wins = [], []
+            self.gap, self.position, self.change = [], [], []
+
+    _ARRAYS = ('points', 'wins', 'cumulative', 'cum_wins', 'gap', 'position', 'change')
+
+    def _ensure(self, entity_id, info):
+        if entity_id in self.index:
+            self.info[entity_id].update(info)
+            return
+        self.index[entity_id] = len(self.ids)
+        self.ids.append(entity_id)
+        self.info[entity_id] = dict(info)
+        for name in self._ARRAYS:
+            arr = getattr(self, name)
+            if HAVE_NUMPY:
+                setattr(self, name, np.vstack([arr, np.zeros((1, self.n_rounds), dtype=arr.dtype)]))
+            else:
+                arr.append([0] * self.n_rounds)
+
+    def _add_column(self):
+        for name in self._ARRAYS:
+            arr = getattr(self, name)
+            if HAVE_NUMPY:
+                setattr(self, name, np.hstack([arr, np.zeros((len(self.ids), 1), dtype=arr.dtype)]))
+            else:
+                for row in arr:
+                    row.append(0)
+        self.n_rounds += 1
+
+    def set_round(self, col, points, wins, info):
+        """Store one round (0-based column) and recompute the derived columns from it on.
+
+        points/wins map entity id -> value; info maps entity id -> display fields.
+        """
+        for entity_id in points:
+            self._ensure(entity_id, info.get(entity_id, {}))
+        # columns skipped on the way (rounds not loaded yet) are zeros and still need deriving
+        start = min(col, self.n_rounds)
+        while self.n_rounds <= col:
+            self._add_column()
+        rows = [self.index[e] for e in points]
+        if HAVE_NUMPY:
+            self.points[:, col] = 0
+            self.wins[:, col] = 0
+            self.points[rows, col] = [points[e] for e in points]
+            self.wins[rows, col] = [wins.get(e, 0) for e in points]
+        else:
+            for row in range(len(self.ids)):
+                self.points[row][col] = 0
+                self.wins[row][col] = 0
+            for e, row in zip(points, rows):
+                self.points[row][col] = points[e]
+                self.wins[row][col] = wins.get(e, 0)
+        self._derive(start)
+
+    def _derive(self, start):
+        if not self.ids:
+            return
+        if HAVE_NUMPY:
+            self._derive_numpy(start)
+        else:
+            self._derive_python(start)
+
+    def _derive_numpy(self, start):
+        n = len(self.ids)
+        prev_cum = self.cumulative[:, start - 1] if start else np.zeros(n)
+        prev_wins = self.cum_wins[:, start - 1] if start else np.zeros(n, dtype=np.int32)
+        self.cumulative[:, start:] = prev_cum[:, None] + np.cumsum(self.points[:, start:], axis=1)
+        self.cum_wins[:, start:] = prev_wins[:, None] + np.cumsum(self.wins[:, start:], axis=1)
+        cum = self.cumulative[:, start:]
+        self.gap[:, start:] = cum.max(axis=0) - cum
+        tiebreak = np.arange(n)
+        for col in range(start, self.n_rounds):
+            # most points, then most wins, then first seen
+            order = np.lexsort((tiebreak, -self.cum_wins[:, col], -self.cumulative[:, col]))
+            self.position[order, col] = np.arange(1, n + 1)
+            if col:
+                prev = self.position[:, col - 1]
+                self.change[:, col] = np.where(prev > 0, prev - self.position[:, col], 0)
+            else:
+                self.change[:, col] = 0
+
+    def _derive_python(self, start):
+        n = len(self.ids)
+        for col in range(start, self.n_rounds):
+            for row in range(n):
+                base = self.cumulative[row][col - 1] if col else 0
+                base_wins = self.cum_wins[row][col - 1] if col else 0
+                self.cumulative[row][col] = base + self.points[row][col]
+                self.cum_wins[row][col] = base_wins + self.wins[row][col]
+            leader = max(self.cumulative[row][col] for row in range(n))
+            order = sorted(range(n), key=lambda r: (-self.cumulative[r][col], -self.cum_wins[r][col], r))
+            for pos, row in enumerate(order, 1):
+                self.position[row][col] = pos
+            for row in range(n):
+                self.gap[row][col] = leader - self.cumulative[row][col]
+                prev = self.position[row][col - 1] if col else 0
+                self.change[row][col] = prev - self.position[row][col] if prev else 0
+
+    def rows(self):
+        out = []
+        for row, entity_id in enumerate(self.ids):
+            entry = {'id': entity_id}
+            entry.update(self.info[entity_id])
+            for name in ('points', 'cumulative', 'gap', 'position', 'change'):
+                values = getattr(self, name)[row]
+                entry[name] = [v.item() if hasattr(v, 'item') else v for v in values]
+            out.append(entry)
+        if self.n_rounds:
+            out.sort(key=lambda e: e['position'][-1])
+        return out
+
+
+class SeasonProgression:
+    def __init__(self, base_url=ERGAST_BASE, timeout=8, ergast=None):
+        self.ergast = ergast or ErgastCache(base_url=base_url, timeout=timeout)
+        self.last_error = None
+        self.last_fetch = None
+        self._reset(None)
+
+    def _reset(self, season):
+        self.season = season
+        self.rounds = []  # [{'round', 'name', 'date'}], index = column
+        self.missing = set()  # finished rounds that came back empty; retried on each refresh
+        # no tables until a season is seen, so creating the app does not import numpy
+        self.drivers = PointsTable() if season else None
+        self.constructors = PointsTable() if season else None
+        self.payload = json.dumps({'season': season, 'rounds': [], 'drivers': [], 'constructors': []})
+
+    def _get_races(self, season, resource, key):
+        # walk the pages of a season-wide listing; one race can straddle two pages
+        races = {}
+        offset = 0
+        while True:
+            data = self.ergast.get(season, None, resource, limit=PAGE_SIZE, offset=offset)
+            page = data['RaceTable']['Races']
+            seen = 0
+            for race in page:
+                merged = races.setdefault(int(race['round']), dict(race, **{key: []}))
+                merged[key].extend(race.get(key, []))
+                seen += len(race.get(key, []))
+            offset += PAGE_SIZE
+            if not seen or offset >= int(data.get('total', 0)):
+                return races
+
+    def _round(self, season, rnd, resource):
+        races = self.ergast.get(season, rnd, resource)['RaceTable']['Races']
+        return races[0] if races else None
+
+    def _seed_finished(self, season, rounds):
+        # one paged season listing instead of two requests per round, split into per-round entries
+        results = self._get_races(season, 'results', 'Results')
+        sprints = self._get_races(season, 'sprint', 'SprintResults')
+        for rnd in rounds:
+            if rnd not in results:
+                # not in the listing (yet): left to the per-round fetch, so an empty answer is not stored
+                continue
+            for resource, races in (('results', results), ('sprint', sprints)):
+                race = races.get(rnd)
+                self.ergast.put(season, rnd, resource, {'RaceTable': {'season': season, 'round': str(rnd), 'Races': [race] if race else []}})
+
+    def refresh(self):
+        """Bring the tables up to the newest completed round; returns the JSON payload."""
+        self.last_error = None
+        self.last_fetch = time.time()
+        try:
+            races = self.ergast.get('current', 'last', 'results')['RaceTable']['Races']
+            if not races:
+                return self.payload
+            newest = races[0]
+            season, newest_round = newest['season'], int(newest['round'])
+            self.ergast.note_latest(season, newest_round)
+            if season != self.season or newest_round < len(self.rounds):
+                self._reset(season)
+            loaded = len(self.rounds)
+            # rounds that became final since the last refresh, including the previous newest,
+            # and earlier ones that were still empty
+            finished = sorted(self.missing.union(range(max(loaded, 1), newest_round)))
+            missing = [r for r in finished if not self.ergast.has(season, r, 'results')]
+            if len(missing) > 1:
+                self._seed_finished(season, missing)
+            for rnd in finished:
+                race = self._round(season, rnd, 'results')
+                if race:
+                    self.missing.discard(rnd)
+                    self._apply(rnd, race, self._round(season, rnd, 'sprint'))
+                else:
+                    self.missing.add(rnd)
+                    self._set_meta(rnd, {'round': rnd, 'name': '', 'date': '', 'missing': True})
+            # the newest round stays volatile: re-checked each refresh for late penalties
+            self._apply(newest_round, newest, self._round(season, newest_round, 'sprint'))
+            self.payload = self._serialize()
+        except Exception:
+            tb = traceback.format_exc()
+            self.last_error = tb
+            _append_debug_log('[progression] ' + tb)
+        return self.payload
+
+    def _set_meta(self, rnd, meta):
+        # rounds lines up with the table columns; a gap holds a placeholder until its round loads
+        while len(self.rounds) < rnd:
+            n = len(self.rounds) + 1
+            self.rounds.append({'round': n, 'name': '', 'date': '', 'missing': True})
+        self.rounds[rnd - 1] = meta
+
+    def _apply(self, rnd, race, sprint):
+        col = rnd - 1
+        self._set_meta(rnd, {'round': rnd, 'name': race.get('raceName', ''), 'date': race.get('date', '')})
+        d_pts, d_wins, d_info = {}, {}, {}
+        c_pts, c_wins, c_info = {}, {}, {}
+        results = [(r, True) for r in race.get('Results', [])]
+        if sprint:
+            results += [(r, False) for r in sprint.get('SprintResults', [])]
+        for res, is_race in results:
+            pts = float(res.get('points') or 0)
+            won = 1 if is_race and str(res.get('position')) == '1' else 0
+            drv, con = res.get('Driver', {}), res.get('Constructor', {})
+            did, cid = drv.get('driverId'), con.get('constructorId')
+            if did:
+                d_pts[did] = d_pts.get(did, 0) + pts
+                d_wins[did] = d_wins.get(did, 0) + won
+                d_info[did] = {'name': ('%s %s' % (drv.get('givenName', ''), drv.get('familyName', ''))).strip(),
+                               'code': drv.get('code', ''), 'team': con.get('name', '')}
+            if cid:
+                c_pts[cid] = c_pts.get(cid, 0) + pts
+                c_wins[cid] = c_wins.get(cid, 0) + won
+                c_info[cid] = {'name': con.get('name', '')}
+        self.drivers.set_round(col, d_pts, d_wins, d_info)
+        self.constructors.set_round(col, c_pts, c_wins, c_info)
+
+    def _serialize(self):
+        return json.dumps({
+            'season': self.season,
+            'rounds': self.rounds,
+            'drivers': self.drivers.rows(),
+            'constructors': self.constructors.rows(),
+        })
@@ -0,0 +1,97 @@
+"""Per-client token buckets for the API routes (see create_app(rate_limits=...)).
+
+Every (route, client) pair gets `rate` requests per second with bursts of up
+to `burst`; a client is its API key header if it sends one of the configured
+keys, otherwise its IP.
+The buckets sit in one OrderedDict in least-recently-used order, so each
+request is O(1): refill from the timestamp, move to the end, and drop the
+buckets at the front that have refilled completely (a full bucket is the same
+as no bucket) or that exceed max_clients.
+
+A limited client is served the last good response of the same URL from
+memory, or a 429 if there is none yet; the server adds Retry-After to both.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# route -> (requests per second, burst); the page itself refreshes about once a minute
+DEFAULT_RATE_LIMITS = {
+    '/': (1, 10),
+    '/api/dashboard': (1, 10),
+    '/api/news': (1, 10),
+    '/api/standings': (0.5, 5),
+    '/api/progression': (0.5, 5),
+}
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated', 'full_at')
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated = now
+        self.full_at = now
+
+
+class RateLimiter:
+    def __init__(self, limits=None, max_clients=10000, max_replays=256):
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self.max_clients = max_clients
+        self.max_replays = max_replays
+        self._buckets = OrderedDict()
+        self._replays = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {'allowed': 0, 'replayed': 0, 'rejected': 0, 'evicted': 0}
+
+    def take(self, route, client, now=None):
+        """Spend a token; returns 0 if allowed, else seconds until the next token."""
+        rate, burst = self.limits[route]
+        now = time.monotonic() if now is None else now
+        key = (route, client)
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = _Bucket(burst, now)
+            else:
+                b.tokens = min(burst, b.tokens + (now - b.updated) * rate)
+                b.updated = now
+                self._buckets.move_to_end(key)
+            if b.tokens >= 1:
+                b.tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - b.tokens) / rate
+            b.full_at = now + (burst - b.tokens) / rate
+            # only the front needs checking: it holds the buckets untouched the longest
+            while self._buckets:
+                k, front = next(iter(self._buckets.items()))
+                if front.full_at > now and len(self._buckets) <= self.max_clients:
+                    break
+                del self._buckets[k]
+                self.counts['evicted'] += 1
+            self.counts['allowed' if not wait else 'rejected'] += 1
+        return wait
+
+    def replay(self, url):
+        """The last stored response of url as (body, content_type, headers), or None."""
+        with self._lock:
+            entry = self._replays.get(url)
+            if entry is not None:
+                self._replays.move_to_end(url)
+                self.counts['replayed'] += 1
+                self.counts['rejected'] -= 1
+            return entry
+
+    def store(self, url, body, content_type, headers):
+        with self._lock:
+            self._replays[url] = (body, content_type, headers)
+            self._replays.move_to_end(url)
+            while len(self._replays) > self.max_replays:
+                self._replays.popitem(last=False)
+
+    def stats(self):
+        # no client keys here: they may be API keys
+        with self._lock:
+            return dict(self.counts, limits={r: {'rate': rate, 'burst': burst} for r, (rate, burst) in self.limits.items()},
+                        clients=len(self._buckets), stored_responses=len(self._replays))
@@ -0,0 +1,93 @@
+"""Per-feed polling intervals learned from the publication times a feed has shown.
+
+Each feed keeps the newest published_ts values seen in it. The mean gap
+between them is the feed's publication rate; the feed is polled at half
+that gap, so a new item waits on average a quarter of the gap. A feed that
+has gone quiet for longer than its usual gap is polled at half the quiet
+time instead, and every poll that brings nothing new (or fails) stretches
+the interval further. Intervals always stay within [min_interval, max_interval].
+"""
+import time
+from threading import Lock
+
+HISTORY = 20  # published_ts values kept per feed
+POLL_FRACTION = 0.5  # poll every half publication gap
+BACKOFF = 1.5  # growth after a poll with nothing new
+
+
+class FeedSchedule:
+    def __init__(self, min_interval=60, max_interval=1800, initial_interval=120):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self._feeds = {}
+        self._lock = Lock()
+
+    def _state(self, feed):
+        state = self._feeds.get(feed)
+        if state is None:
+            state = self._feeds[feed] = {
+                'interval': self._clamp(self.initial_interval),
+                'next_poll': 0,  # never polled: due now
+                'last_poll': None,
+                'last_new': None,
+                'polls': 0,
+                'failures': 0,
+                'published': [],  # newest first
+            }
+        return state
+
+    def _clamp(self, seconds):
+        return max(self.min_interval, min(self.max_interval, seconds))
+
+    def due(self, feed, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return now >= self._state(feed)['next_poll']
+
+    def record(self, feed, published_ts, now=None):
+        """Update a feed after a poll; published_ts is None when the poll failed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(feed)
+            state['polls'] += 1
+            state['last_poll'] = now
+            if published_ts is None:
+                state['failures'] += 1
+                state['interval'] = self._clamp(state['interval'] * BACKOFF)
+            else:
+                known = set(state['published'])
+                fresh = {ts for ts in published_ts if ts and ts not in known}
+                if fresh:
+                    state['published'] = sorted(known | fresh, reverse=True)[:HISTORY]
+                    state['last_new'] = now
+                base = self._clamp(self._expected_gap(state, now) * POLL_FRACTION)
+                state['interval'] = base if fresh else self._clamp(max(base, state['interval'] * BACKOFF))
+            state['next_poll'] = now + state['interval']
+
+    def _expected_gap(self, state, now):
+        ts = state['published']
+        if len(ts) < 2:
+            return self.initial_interval / POLL_FRACTION
+        mean_gap = (ts[0] - ts[-1]) / (len(ts) - 1)
+        # a feed that has been quiet for longer than usual is probably quiet for a while
+        return max(mean_gap, now - ts[0])
+
+    def snapshot(self, now=None):
+        """Per-feed schedule for debugging."""
+        now = time.time() if now is None else now
+        with self._lock:
+            out = {}
+            for feed, state in self._feeds.items():
+                ts = state['published']
+                out[feed] = {
+                    'interval': round(state['interval'], 1),
+                    'next_poll': state['next_poll'],
+                    'next_poll_in': round(max(0, state['next_poll'] - now), 1),
+                    'last_poll': state['last_poll'],
+                    'last_new': state['last_new'],
+                    'mean_gap': round((ts[0] - ts[-1]) / (len(ts) - 1), 1) if len(ts) >= 2 else None,
+                    'polls': state['polls'],
+                    'failures': state['failures'],
+                }
+            return out
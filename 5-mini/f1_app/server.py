@@ -1,68 +1,343 @@
 import logging
-from flask import Flask, render_template, jsonify
+from flask import Flask, g, render_template, jsonify, request, send_file
+from . import deadline
 from .cache import SimpleCache
 from .aggregator import FeedAggregator
+from .schedule import FeedSchedule
 from .standings import StandingsFetcher
+from .progression import HAVE_NUMPY, SeasonProgression
+from .ergast_cache import ERGAST_BASE, ErgastCache
+from .news_store import NewsStore
+from .fields import DASHBOARD_NEWS_FIELDS, NEWS_FIELDS, parse_fields, project_items
+from .assets import AssetPipeline
+from .profiling import SamplingProfiler, phase
+from .lazy import PREWARM_MODULES, prewarm as prewarm_imports
+from .ratelimit import RateLimiter
+from .thumbnails import ThumbnailCache, ThumbnailError
 import json
+import math
 import os
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('f1_app')
 
+# templates/ and static/ live next to the package, not inside it
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ERGAST_CACHE_DIR = os.path.join(BASE_DIR, 'data', 'ergast_cache')
+THUMB_CACHE_DIR = os.path.join(BASE_DIR, 'data', 'thumbnails')
+# a thumbnail URL never changes content: its file is keyed by source URL and size
+THUMB_MAX_AGE = 365 * 24 * 3600
+
+
+def _load_sample(name):
+    try:
+        with open(os.path.join(os.getcwd(), 'data', name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def script_safe_json(text):
+    """JSON text that can sit inside a <script> element (no '</script>' breakout)."""
+    return text.replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026')
+
+
+def create_app(feeds=None, summary_length=200, parser=None, ergast_base=ERGAST_BASE, ergast_cache_dir=ERGAST_CACHE_DIR,
+               poll_min=60, poll_max=1800, request_budget=1.5, max_upstream=8, max_upstream_queued=16,
+               profile_rate=None, profile_interval=0.005, profile_token=None, prewarm=True,
+               rate_limits=None, rate_limit_key_header='X-API-Key', rate_limit_api_keys=(), rate_limit_max_clients=10000,
+               thumb_cache_dir=THUMB_CACHE_DIR, thumb_size=(320, 180), thumb_cache_max_bytes=64 * 1024 * 1024):
+    app = Flask(__name__, static_folder=os.path.join(BASE_DIR, 'static'), template_folder=os.path.join(BASE_DIR, 'templates'))
+    AssetPipeline(app.static_folder).init_app(app)
+
+    # per-client token buckets: rate_limits maps a route to (requests per second, burst),
+    # None uses ratelimit.DEFAULT_RATE_LIMITS and {} turns limiting off. A client is its
+    # rate_limit_key_header API key if that is one of rate_limit_api_keys, or its IP (an
+    # unknown key is ignored, so a fresh key per request is no way around the limit).
+    # Over the limit it gets the last response of the same URL replayed
+    # (X-Rate-Limited: replay) or a 429, both with Retry-After.
+    # registered after the asset pipeline, so responses are stored before compression
+    rate_limiter = RateLimiter(rate_limits, max_clients=rate_limit_max_clients)
+    rate_limit_api_keys = frozenset(rate_limit_api_keys or ())
+
+    @app.before_request
+    def check_rate_limit():
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        if rule not in rate_limiter.limits or request.method != 'GET':
+            return None
+        api_key = request.headers.get(rate_limit_key_header) if rate_limit_key_header else None
+        wait = rate_limiter.take(rule, 'key:' + api_key if api_key in rate_limit_api_keys else 'ip:%s' % request.remote_addr)
+        if not wait:
+            g.rate_limited_rule = rule
+            return None
+        retry_after = max(1, int(math.ceil(wait)))
+        replay = rate_limiter.replay(request.full_path)
+        if replay is not None:
+            body, content_type, headers = replay
+            response = app.response_class(body, content_type=content_type, headers=headers)
+            response.headers['X-Rate-Limited'] = 'replay'
+        else:
+            response = jsonify({'error': 'rate limit exceeded', 'retry_after': retry_after})
+            response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    @app.after_request
+    def store_for_replay(response):
+        # only complete 200s are replayed; partial (deadline-cut) responses are not
+        if g.pop('rate_limited_rule', None) and response.status_code == 200 and not response.direct_passthrough \
+                and not deadline.current().partial:
+            headers = [(k, v) for k, v in response.headers.items()
+                       if k not in ('Content-Length', 'Content-Type', 'Content-Encoding', 'Vary', 'ETag')]
+            rate_limiter.store(request.full_path, response.get_data(), response.content_type, headers)
+        return response
+    app.extensions['rate_limiter'] = rate_limiter
 
-def create_app(feeds=None):
-    app = Flask(__name__, static_folder='static', template_folder='templates')
     cache = SimpleCache(ttl=120)
+    # every request gets request_budget seconds for upstream work; beyond max_upstream fetches
+    # in flight, up to max_upstream_queued wait for a slot and the rest are shed
+    limiter = deadline.UpstreamLimiter(max_in_flight=max_upstream, max_queued=max_upstream_queued)
+
+    @app.before_request
+    def start_deadline():
+        g.deadline_token = deadline.begin(request_budget, limiter)
+
+    @app.after_request
+    def flag_partial(response):
+        dl = deadline.current()
+        if dl is not None and dl.partial:
+            response.headers['X-Partial-Response'] = '1'
+        return response
+
+    @app.teardown_request
+    def end_deadline(exc):
+        token = g.pop('deadline_token', None)
+        if token is not None:
+            deadline.end(token)
+
+    # opt-in sampling profiler: profile_rate of requests are sampled (0 pauses it); the rate
+    # can be changed at runtime with POST /debug/profile, guarded by profile_token if given
+    profiler = None
+    if profile_rate is not None:
+        profiler = SamplingProfiler(rate=profile_rate, interval=profile_interval)
+
+        @app.before_request
+        def start_profile():
+            if request.path != '/debug/profile' and profiler.sampled():
+                rule = request.url_rule.rule if request.url_rule is not None else request.path
+                g.profile_token = profiler.begin('%s %s' % (request.method, rule))
+
+        @app.teardown_request
+        def end_profile(exc):
+            token = g.pop('profile_token', None)
+            if token is not None:
+                profiler.end(token)
+
+        @app.route('/debug/profile', methods=['GET', 'POST'])
+        def debug_profile():
+            # GET: collapsed stacks (?route=GET /api/news to filter, ?format=json for totals per phase)
+            # POST: {"rate": 0.05} and/or {"reset": true}
+            if profile_token and request.headers.get('X-Admin-Token') != profile_token:
+                return jsonify({'error': 'forbidden'}), 403
+            if request.method == 'POST':
+                body = request.get_json(silent=True) or request.form
+                if 'rate' in body:
+                    try:
+                        rate = float(body['rate'])
+                    except (TypeError, ValueError):
+                        rate = -1
+                    if not 0 <= rate <= 1:
+                        return jsonify({'error': 'rate must be between 0 and 1'}), 400
+                    profiler.rate = rate
+                if str(body.get('reset', '')).lower() in ('1', 'true', 'yes'):
+                    profiler.reset()
+                return jsonify(profiler.stats())
+            if request.args.get('format') == 'json':
+                return jsonify(profiler.stats())
+            return app.response_class(profiler.collapsed(request.args.get('route')), mimetype='text/plain')
+    app.extensions['profiler'] = profiler
+
     if feeds is None:
         feeds = [
             'https://www.planetf1.com/feed/',
             'https://www.autosport.com/feed/',
             'https://www.motorsport.com/rss/all/',
         ]
-    aggregator = FeedAggregator(feeds)
-    standings = StandingsFetcher()
-
-    @app.route('/')
-    def index():
-        logger.info('Rendering index')
-        return render_template('index.html')
+    # feed images are served through /thumbnail resized to thumb_size, from a disk cache
+    # of at most thumb_cache_max_bytes under thumb_cache_dir (None turns images off)
+    thumbnails = None
+    if thumb_cache_dir:
+        thumbnails = ThumbnailCache(thumb_cache_dir, size=thumb_size, max_bytes=thumb_cache_max_bytes)
+    # each feed is polled on its own interval between poll_min and poll_max seconds
+    aggregator = FeedAggregator(feeds, summary_length=summary_length, parser=parser,
+                                schedule=FeedSchedule(min_interval=poll_min, max_interval=poll_max),
+                                thumbnails=thumbnails)
+    news_store = NewsStore()
+    # the dashboard snapshot is never older than the fastest possible feed poll
+    snapshot_cache = SimpleCache(ttl=poll_min)
+    # finished rounds are stored compressed under ergast_cache_dir and never re-fetched
+    ergast = ErgastCache(base_url=ergast_base, cache_dir=ergast_cache_dir)
+    standings = StandingsFetcher(ergast=ergast)
+    progression = SeasonProgression(ergast=ergast)
 
-    @app.route('/api/news')
-    def api_news():
-        logger.info('Request /api/news')
-        data = cache.get_or_load('news', aggregator.fetch)
+    def news_section():
+        # no TTL here: the aggregator only re-polls feeds that are due
+        data = aggregator.fetch()
         meta = {
             'last_fetch': getattr(aggregator, 'last_fetch', None),
             'last_error': getattr(aggregator, 'last_error', None),
+            'partial': aggregator.partial,
         }
         # if live fetch returned nothing, attempt to load sample data
         if not data:
-            try:
-                sample_path = os.path.join(os.getcwd(), 'data', 'sample_news.json')
-                with open(sample_path, 'r', encoding='utf-8') as f:
-                    sample = json.load(f)
-                return jsonify({'items': sample.get('items', []), 'meta': {**meta, 'sample_used': True}})
-            except Exception:
-                pass
-        return jsonify({'items': data, 'meta': meta})
+            sample = _load_sample('sample_news.json')
+            if sample is not None:
+                data = sample.get('items', [])
+                meta['sample_used'] = True
+        # clients sync from this version with /api/news?since_version=
+        meta['version'] = news_store.update(data)
+        return data, meta
 
-    @app.route('/api/standings')
-    def api_standings():
-        logger.info('Request /api/standings')
+    def standings_section():
         data = cache.get_or_load('standings', standings.fetch)
         meta = {
             'last_fetch': getattr(standings, 'last_fetch', None),
             'last_error': getattr(standings, 'last_error', None),
         }
+        if meta['last_error']:
+            # failed or ran out of time: retry on the next request instead of caching the gap
+            cache.invalidate('standings')
         if (not data) or (not data.get('drivers') and not data.get('constructors')):
-            try:
-                sample_path = os.path.join(os.getcwd(), 'data', 'sample_standings.json')
-                with open(sample_path, 'r', encoding='utf-8') as f:
-                    sample = json.load(f)
-                return jsonify({'data': sample, 'meta': {**meta, 'sample_used': True}})
-            except Exception:
-                pass
-        return jsonify({'data': data, 'meta': meta})
+            sample = _load_sample('sample_standings.json')
+            if sample is not None:
+                return sample, {**meta, 'sample_used': True}
+        return data, meta
+
+    def build_dashboard():
+        # every section of one snapshot comes from the same cache generation
+        items, news_meta = news_section()
+        data, standings_meta = standings_section()
+        with phase('serialize'):
+            return json.dumps({
+                'news': {'items': project_items(items, DASHBOARD_NEWS_FIELDS), 'meta': news_meta},
+                'standings': {'data': data, 'meta': standings_meta},
+                'meta': {'generated': time.time()},
+            })
+
+    def dashboard_snapshot():
+        snapshot = snapshot_cache.get_or_load('dashboard', build_dashboard)
+        if deadline.current().partial:
+            snapshot_cache.invalidate('dashboard')
+        return snapshot
+
+    @app.route('/')
+    def index():
+        logger.info('Rendering index')
+        # embed the dashboard snapshot so the first paint needs no API round trip
+        snapshot = dashboard_snapshot()
+        return render_template('index.html', dashboard=script_safe_json(snapshot))
+
+    @app.route('/api/dashboard')
+    def api_dashboard():
+        logger.info('Request /api/dashboard')
+        return app.response_class(dashboard_snapshot(), mimetype='application/json')
+
+    @app.route('/api/news')
+    def api_news():
+        logger.info('Request /api/news')
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'allowed': list(NEWS_FIELDS)}), 400
+        since = request.args.get('since_version')
+        if since is not None and not since.isdigit():
+            return jsonify({'error': 'since_version must be a number'}), 400
+        items, meta = news_section()
+        with phase('serialize'):
+            if since is None:
+                return jsonify({'items': project_items(items, fields), 'meta': meta})
+            # delta sync: only what changed since the client's version (or everything, flagged full)
+            delta = news_store.changes_since(int(since))
+            if delta['full']:
+                delta['items'] = project_items(delta['items'], fields)
+            else:
+                delta['added'] = [{'at': a['at'], 'item': project_items([a['item']], fields)[0]} for a in delta['added']]
+            return jsonify({**delta, 'meta': meta})
+
+    @app.route('/api/standings')
+    def api_standings():
+        logger.info('Request /api/standings')
+        season = request.args.get('season')
+        rnd = request.args.get('round')
+        if season or rnd:
+            # historical standings: ?season=2024[&round=5]
+            if not (season or '').isdigit() or (rnd is not None and not rnd.isdigit()):
+                return jsonify({'error': 'season and round must be numbers'}), 400
+            if not ergast.in_range(season, rnd):
+                return jsonify({'error': 'no such season or round'}), 404
+            fetched = time.time()
+            data, error = standings.fetch_round(season, rnd)
+            meta = {'last_fetch': fetched, 'last_error': error, 'final': ergast.is_final(season, rnd)}
+            return jsonify({'data': data, 'meta': meta})
+        data, meta = standings_section()
+        with phase('serialize'):
+            return jsonify({'data': data, 'meta': meta})
+
+    @app.route('/api/progression')
+    def api_progression():
+        logger.info('Request /api/progression')
+        # the payload is serialized once per refresh; only meta is encoded per request
+        body = cache.get_or_load('progression', progression.refresh)
+        if progression.last_error:
+            cache.invalidate('progression')
+        meta = {
+            'last_fetch': progression.last_fetch,
+            'last_error': progression.last_error,
+            'numpy': HAVE_NUMPY,
+        }
+        return app.response_class('{"data": %s, "meta": %s}' % (body, json.dumps(meta)), mimetype='application/json')
+
+    @app.route('/thumbnail')
+    def thumbnail():
+        # a feed image at card size; fetched once, then served from the disk cache
+        if thumbnails is None:
+            return jsonify({'error': 'thumbnails are disabled'}), 404
+        try:
+            found = thumbnails.get(request.args.get('src', ''))
+        except ThumbnailError as e:
+            return jsonify({'error': str(e)}), 502
+        except deadline.DeadlineExceeded:
+            return jsonify({'error': 'image fetch did not finish in time'}), 504
+        if found is None:
+            # only images from the feeds are proxied
+            return jsonify({'error': 'unknown image'}), 404
+        path, mimetype = found
+        response = send_file(path, mimetype=mimetype, conditional=True, max_age=THUMB_MAX_AGE)
+        response.headers['Cache-Control'] = 'public, max-age=%d, immutable' % THUMB_MAX_AGE
+        return response
+
+    @app.route('/debug/thumbnails')
+    def debug_thumbnails():
+        return jsonify(thumbnails.stats() if thumbnails is not None else {'enabled': False})
+
+    @app.route('/debug/feeds')
+    def debug_feeds():
+        # learned per-feed polling intervals and when each feed is polled next
+        return jsonify({'feeds': aggregator.schedule.snapshot(), 'min_interval': poll_min, 'max_interval': poll_max})
+
+    @app.route('/debug/upstream')
+    def debug_upstream():
+        return jsonify({'request_budget': request_budget, **limiter.stats()})
+
+    if prewarm:
+        # requests, the parser backend and numpy are imported on first use (lazy.py);
+        # start on them now so the first request rarely pays for the imports
+        prewarm_imports(PREWARM_MODULES[:1] + (aggregator.parser.module,) + PREWARM_MODULES[1:], profiler)
+
+    @app.route('/debug/ratelimit')
+    def debug_ratelimit():
+        return jsonify(rate_limiter.stats())
 
     @app.route('/debug/log')
     def debug_log():
@@ -80,8 +355,14 @@ def create_app(feeds=None):
     return app
 
 
-app = create_app()
+def __getattr__(name):
+    # the module-level app (app.py, 'f1_app.server:app') is built on first access, so
+    # importing this module for create_app or script_safe_json does not build one
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
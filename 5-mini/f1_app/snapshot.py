@@ -0,0 +1,265 @@
+"""Static snapshot export: the dashboard as files a CDN can serve (scripts/export_snapshot.py).
+
+One export runs a single FeedAggregator / StandingsFetcher cycle and writes
+the results in both front ends' API schemas:
+
+    out/
+      manifest.json                 current version and the files in it (short cache)
+      index.html                    this app's page, reading ./manifest.json
+      assets/                       fingerprinted static files
+      v/<version>/mini/*.json       /api/news, /api/standings, /api/dashboard bodies
+      v/<version>/grok/*.json       grok-code-fast /api/news, /api/*-standings, /api/dashboard
+      _headers                      cache rules for hosts that read them (Netlify, Cloudflare Pages)
+
+Every JSON file also gets .gz (and .br with brotli installed) siblings for
+hosts that serve precompressed files. A version directory is written under a
+temporary name and renamed into place; index.html and then manifest.json are
+swapped in with os.replace, so a client never sees a half-written version.
+A section that came back empty reuses the previous version's file (flagged
+stale in meta), or the sample data when there is none; an export whose
+content matches the published one is skipped.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from flask import Flask, render_template
+from .aggregator import FeedAggregator
+from .assets import AssetPipeline, _encodings, compress
+from .fields import DASHBOARD_NEWS_FIELDS, project_items
+from .standings import StandingsFetcher
+
+MANIFEST = 'manifest.json'
+VERSIONS_DIR = 'v'
+# data files may be read by a page on another origin (grok-code-fast with SNAPSHOT_BASE_URL)
+HEADERS = """/manifest.json
+  Cache-Control: public, max-age=60
+  Access-Control-Allow-Origin: *
+/index.html
+  Cache-Control: public, max-age=60
+/v/*
+  Cache-Control: public, max-age=31536000, immutable
+  Access-Control-Allow-Origin: *
+/assets/*
+  Cache-Control: public, max-age=31536000, immutable
+"""
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True, default=str).encode('utf-8')
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+def _error_line(tb):
+    # the published files are public: keep the exception line, not the traceback
+    return tb.strip().splitlines()[-1] if tb else None
+
+
+# grok-code-fast schema (app/models.py to_dict)
+
+def grok_news(items):
+    return [{'title': it.get('title', ''), 'link': it.get('link', ''), 'summary': it.get('summary', ''),
+             'published': it.get('published') or '', 'source': it.get('source', ''),
+             'image': it.get('image', '')} for it in items]
+
+
+def grok_drivers(drivers):
+    out = []
+    for x in drivers:
+        d = x.get('Driver', {})
+        teams = x.get('Constructors') or [{}]
+        out.append({'position': str(x.get('position', '')),
+                    'name': ('%s %s' % (d.get('givenName', ''), d.get('familyName', ''))).strip(),
+                    'nationality': d.get('nationality', 'Unknown'), 'constructor': teams[0].get('name', 'Unknown Team'),
+                    'points': str(x.get('points', '0')), 'wins': str(x.get('wins', '0'))})
+    return out
+
+
+def grok_constructors(constructors):
+    out = []
+    for x in constructors:
+        c = x.get('Constructor') or {'name': x.get('name', '')}
+        out.append({'position': str(x.get('position', '')), 'name': c.get('name', ''),
+                    'nationality': c.get('nationality', 'Unknown'),
+                    'points': str(x.get('points', '0')), 'wins': str(x.get('wins', '0'))})
+    return out
+
+
+class SnapshotExporter:
+    def __init__(self, out_dir, aggregator=None, standings=None, keep=3, sample_dir=None):
+        self.out_dir = out_dir
+        self.aggregator = aggregator or FeedAggregator([
+            'https://www.planetf1.com/feed/',
+            'https://www.autosport.com/feed/',
+            'https://www.motorsport.com/rss/all/',
+        ])
+        self.standings = standings or StandingsFetcher()
+        self.keep = keep  # published versions kept for clients holding an older manifest
+        base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.base_dir = base
+        self.sample_dir = sample_dir or os.path.join(base, 'data')
+
+    def manifest(self):
+        """The published manifest, or None before the first export."""
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _previous(self, manifest, name):
+        """A file of the published version (to carry a section that failed this time)."""
+        if not manifest or name not in manifest.get('files', {}):
+            return None
+        try:
+            with open(os.path.join(self.out_dir, manifest['files'][name]['path']), 'rb') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _sample(self, name):
+        try:
+            with open(os.path.join(self.sample_dir, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def collect(self, manifest=None):
+        """Run one fetch cycle; returns {file name: payload} in both schemas."""
+        now = time.time()
+        items = self.aggregator.fetch()
+        news_meta = {'last_fetch': self.aggregator.last_fetch, 'last_error': _error_line(self.aggregator.last_error)}
+        if not items:
+            prev = self._previous(manifest, 'mini/news')
+            if prev is not None:
+                items, news_meta['stale'] = prev['items'], True
+            else:
+                items, news_meta['sample_used'] = (self._sample('sample_news.json') or {}).get('items', []), True
+        data = self.standings.fetch()
+        standings_meta = {'last_fetch': self.standings.last_fetch, 'last_error': _error_line(self.standings.last_error)}
+        if not data.get('drivers') and not data.get('constructors'):
+            prev = self._previous(manifest, 'mini/standings')
+            if prev is not None:
+                data, standings_meta['stale'] = prev['data'], True
+            else:
+                data, standings_meta['sample_used'] = self._sample('sample_standings.json') or data, True
+
+        news = {'items': items, 'meta': news_meta}
+        standings = {'data': data, 'meta': standings_meta}
+        g_news = grok_news(items)
+        g_drivers = grok_drivers(data.get('drivers', []))
+        g_constructors = grok_constructors(data.get('constructors', []))
+        return {
+            'mini/news': news,
+            'mini/standings': standings,
+            'mini/dashboard': {
+                'news': {'items': project_items(items, DASHBOARD_NEWS_FIELDS), 'meta': news_meta},
+                'standings': standings,
+                'meta': {'generated': now},
+            },
+            'grok/news': g_news,
+            'grok/driver-standings': g_drivers,
+            'grok/constructor-standings': g_constructors,
+            'grok/dashboard': {'news': g_news, 'news_version': None, 'driver_standings': g_drivers,
+                               'constructor_standings': g_constructors, 'generated': now},
+        }
+
+    def export(self, force=False):
+        """Fetch, write and publish a new version; returns its manifest, or None if nothing changed."""
+        current = self.manifest()
+        payloads = self.collect(current)
+        # only the data decides whether there is anything new, not fetch times
+        content_hash = hashlib.sha256(_dumps({
+            'news': payloads['mini/news']['items'], 'standings': payloads['mini/standings']['data']
+        })).hexdigest()
+        if current and current.get('content_hash') == content_hash and not force:
+            return None
+        version = '%s-%s' % (time.strftime('%Y%m%dT%H%M%SZ', time.gmtime()), content_hash[:8])
+        return self.publish(payloads, version, content_hash, current)
+
+    def publish(self, payloads, version, content_hash, current=None):
+        versions = os.path.join(self.out_dir, VERSIONS_DIR)
+        os.makedirs(versions, exist_ok=True)
+        # published versions are immutable: a forced re-export within the same second gets a suffix
+        base_version, n = version, 1
+        while os.path.exists(os.path.join(versions, version)):
+            n += 1
+            version = '%s.%d' % (base_version, n)
+        staging = tempfile.mkdtemp(prefix='.tmp-', dir=versions)
+        files = {}
+        try:
+            for name, payload in payloads.items():
+                body = _dumps(payload)
+                path = os.path.join(staging, *name.split('/')) + '.json'
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(body)
+                encodings = []
+                for enc in _encodings():
+                    with open(path + ('.br' if enc == 'br' else '.gz'), 'wb') as f:
+                        f.write(compress(body, enc))
+                    encodings.append(enc)
+                files[name] = {'path': '%s/%s/%s.json' % (VERSIONS_DIR, version, name), 'bytes': len(body),
+                               'sha256': hashlib.sha256(body).hexdigest(), 'encodings': encodings}
+            os.chmod(staging, 0o755)
+            os.rename(staging, os.path.join(versions, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        previous = ([current['version']] + current.get('previous', [])) if current else []
+        manifest = {
+            'version': version,
+            'generated': payloads['mini/dashboard']['meta']['generated'],
+            'content_hash': content_hash,
+            'files': files,
+            'previous': previous[:self.keep - 1],
+        }
+        self._write_site(payloads['mini/dashboard'], version)
+        # the manifest goes last: until it is replaced, clients keep reading the old version
+        _write_atomic(os.path.join(self.out_dir, MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+        self._prune(manifest)
+        return manifest
+
+    def _write_site(self, dashboard, version):
+        """index.html with the snapshot embedded, plus the fingerprinted assets it links."""
+        from .server import script_safe_json
+        site = Flask('f1_app', static_folder=os.path.join(self.base_dir, 'static'),
+                     template_folder=os.path.join(self.base_dir, 'templates'))
+        # relative URLs so the site also works from a sub-path (e.g. GitHub Pages)
+        assets = AssetPipeline(site.static_folder, url_prefix='assets')
+        site.jinja_env.globals['asset_url'] = assets.url_for
+        asset_dir = os.path.join(self.out_dir, 'assets')
+        os.makedirs(asset_dir, exist_ok=True)
+        for hashed, entry in assets._files.items():
+            path = os.path.join(asset_dir, *hashed.split('/'))
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _write_atomic(path, entry['variants'][None])
+        with site.test_request_context('/'):
+            html = render_template('index.html', dashboard=script_safe_json(_dumps(dashboard).decode('utf-8')),
+                                   snapshot_base='./', snapshot_version=version)
+        _write_atomic(os.path.join(self.out_dir, 'index.html'), html.encode('utf-8'))
+        _write_atomic(os.path.join(self.out_dir, '_headers'), HEADERS.encode('utf-8'))
+
+    def _prune(self, manifest):
+        live = {manifest['version']} | set(manifest['previous'])
+        versions = os.path.join(self.out_dir, VERSIONS_DIR)
+        for name in os.listdir(versions):
+            # old versions, and staging dirs of exports that died halfway
+            if name not in live:
+                shutil.rmtree(os.path.join(versions, name), ignore_errors=True)
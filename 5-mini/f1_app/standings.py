@@ -1,32 +1,43 @@
-import requests
+from .ergast_cache import ErgastCache
 
 
 class StandingsFetcher:
-    DRIVER_URL = 'http://ergast.com/api/f1/current/driverStandings.json'
-    CONSTRUCTOR_URL = 'http://ergast.com/api/f1/current/constructorStandings.json'
-
-    def __init__(self, timeout=8):
+    def __init__(self, timeout=8, ergast=None):
         self.timeout = timeout
-        self.session = requests.Session()
-    self.last_error = None
-    self.last_fetch = None
+        self.ergast = ergast or ErgastCache(timeout=timeout)
+        self.last_error = None
+        self.last_fetch = None
 
     def fetch(self):
+        """Current standings (short TTL in the Ergast cache); sets last_error/last_fetch."""
         import time as _time
-        out = {}
-        self.last_error = None
         self.last_fetch = _time.time()
+        out, self.last_error = self.fetch_round('current', None)
+        return out
+
+    def fetch_round(self, season, rnd):
+        """(standings, error) after a given round; finished rounds are served from the immutable cache.
+
+        Historical lookups leave last_error/last_fetch alone: those describe
+        the current table, and a bad ?season= must not show up there.
+        """
+        out = {}
+        error = None
         try:
-            drv = self.session.get(self.DRIVER_URL, timeout=self.timeout).json()
-            cons = self.session.get(self.CONSTRUCTOR_URL, timeout=self.timeout).json()
-            out['drivers'] = drv['MRData']['StandingsTable']['StandingsLists'][0]['DriverStandings']
-            out['constructors'] = cons['MRData']['StandingsTable']['StandingsLists'][0]['ConstructorStandings']
+            drv = self.ergast.get(season, rnd, 'driverStandings')
+            cons = self.ergast.get(season, rnd, 'constructorStandings')
+            drv_list = drv['StandingsTable']['StandingsLists'][0]
+            if season == 'current' and drv_list.get('round'):
+                # standings always describe the newest finished race
+                self.ergast.note_latest(drv_list['season'], drv_list['round'])
+            out['drivers'] = drv_list['DriverStandings']
+            out['constructors'] = cons['StandingsTable']['StandingsLists'][0]['ConstructorStandings']
         except Exception:
             import traceback
             try:
-                self.last_error = traceback.format_exc()
+                error = traceback.format_exc()
             except Exception:
-                self.last_error = 'error'
+                error = 'error'
             out['drivers'] = []
             out['constructors'] = []
-        return out
+        return out, error
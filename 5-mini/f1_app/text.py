@@ -0,0 +1,64 @@
+import re
+from html.parser import HTMLParser
+
+_WS_RE = re.compile(r'\s+')
+# content of these tags is never readable text
+_SKIP_TAGS = {'script', 'style', 'iframe', 'noscript', 'svg'}
+# block-level tags that separate words when stripped
+_BREAK_TAGS = {'br', 'p', 'div', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'figure', 'figcaption', 'tr', 'td'}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BREAK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            if self._skip:
+                self._skip -= 1
+        elif tag in _BREAK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def strip_html(text):
+    """Return the readable text of an HTML fragment with whitespace collapsed."""
+    if not text:
+        return ''
+    if '<' not in text and '&' not in text:
+        return _WS_RE.sub(' ', text).strip()
+    parser = _TextExtractor()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception:
+        # malformed markup: fall back to a crude tag strip
+        return _WS_RE.sub(' ', re.sub(r'<[^>]*>', ' ', text)).strip()
+    return _WS_RE.sub(' ', ''.join(parser.parts)).strip()
+
+
+def truncate(text, max_length):
+    """Cut text to at most max_length chars, preferring a word boundary."""
+    if not max_length or len(text) <= max_length:
+        return text
+    cut = text[: max_length - 1]
+    space = cut.rfind(' ')
+    if space > max_length // 2:
+        cut = cut[:space]
+    return cut.rstrip(' ,.;:-') + '…'
+
+
+def clean_summary(text, max_length=200):
+    """Plain-text, length-bounded summary for an RSS description/Atom summary."""
+    return truncate(strip_html(text), max_length)
@@ -0,0 +1,251 @@
+"""News card images: fetched once, resized, kept in a size-bounded disk cache.
+
+Feed items carry the publisher's image URL (parsers._entry_image). Cards load
+it through /thumbnail?src=..., which downloads the image once, center-crops
+and scales it to the card size and writes the JPEG under cache_dir, so the
+publisher sees one request per image and browsers get a few KB instead of a
+full-size photo. Concurrent requests for an image being fetched wait for that
+one fetch.
+
+Only URLs the aggregator saw in a feed (or already on disk) are fetched, so
+the route is not an open proxy; a failed image is not retried for retry_after
+seconds. Past max_bytes the least recently used files are deleted (after a
+restart the order comes from file modification times).
+
+Resizing needs Pillow; without it JPEG/PNG/GIF/WebP sources of up to
+passthrough_max_bytes are cached unchanged and larger ones are refused.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from . import deadline
+from .lazy import LazyModule, installed
+from .parsers import is_image
+from .profiling import phase
+
+requests = LazyModule('requests')
+HAVE_PIL = installed('PIL')
+Image = LazyModule('PIL.Image')
+ImageOps = LazyModule('PIL.ImageOps')
+
+# stored unchanged when Pillow is missing
+PASSTHROUGH_TYPES = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif', 'image/webp': '.webp'}
+EXT_TYPES = {ext: mime for mime, ext in PASSTHROUGH_TYPES.items()}
+
+
+class ThumbnailError(Exception):
+    """The image could not be fetched or resized."""
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir, size=(320, 180), max_bytes=64 * 1024 * 1024, max_source_bytes=8 * 1024 * 1024,
+                 timeout=10, max_known=5000, retry_after=600, passthrough_max_bytes=300 * 1024, quality=80):
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self.max_bytes = max_bytes
+        self.max_source_bytes = max_source_bytes
+        self.timeout = timeout
+        self.max_known = max_known
+        self.retry_after = retry_after
+        self.passthrough_max_bytes = passthrough_max_bytes
+        self.quality = quality
+        self._session = None
+        self._files = OrderedDict()  # key -> (ext, bytes), least recently used first
+        self._bytes = 0
+        self._known = OrderedDict()
+        self._failed = OrderedDict()  # key -> (when, message)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'fetches': 0, 'coalesced': 0, 'failures': 0, 'evicted': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    @property
+    def session(self):
+        # made on the first fetch, so requests is not imported at startup (see lazy.py)
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def _scan(self):
+        # files left by a previous run, oldest first
+        found = []
+        for d, _, names in os.walk(self.cache_dir):
+            for name in names:
+                key, ext = os.path.splitext(name)
+                if name.startswith('.') or ext not in EXT_TYPES:
+                    continue
+                st = os.stat(os.path.join(d, name))
+                found.append((st.st_mtime, key, ext, st.st_size))
+        with self._lock:
+            for _, key, ext, size in sorted(found):
+                self._files[key] = (ext, size)
+                self._bytes += size
+            self._evict()
+
+    def key(self, url):
+        return hashlib.sha256(('%dx%d %s' % (self.size[0], self.size[1], url)).encode('utf-8')).hexdigest()
+
+    def path(self, key, ext):
+        return os.path.join(self.cache_dir, key[:2], key + ext)
+
+    def allow(self, urls):
+        """Remember image URLs seen in a feed; only these are fetched."""
+        with self._lock:
+            for url in urls:
+                if is_image(url, 'image/'):
+                    self._known[url] = None
+                    self._known.move_to_end(url)
+            while len(self._known) > self.max_known:
+                self._known.popitem(last=False)
+
+    def get(self, url):
+        """(path, mimetype) of url's thumbnail, fetching it on first use; None if url is unknown.
+
+        Raises ThumbnailError when the image cannot be fetched or resized (or
+        failed recently) and DeadlineExceeded when the fetch does not fit the
+        request budget.
+        """
+        key = self.key(url)
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None:
+                self._files.move_to_end(key)
+                self.counts['hits'] += 1
+                return self.path(key, entry[0]), EXT_TYPES[entry[0]]
+            if url not in self._known:
+                return None
+            failed = self._failed.get(key)
+            if failed is not None and time.monotonic() - failed[0] < self.retry_after:
+                raise ThumbnailError(failed[1])
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.counts['coalesced'] += 1
+
+        if not leader:
+            # the leader's fetch is bounded by its own deadline; wait no longer than ours
+            if not flight.done.wait(deadline.remaining()):
+                deadline.mark_partial()
+                raise deadline.DeadlineExceeded('request deadline passed waiting for %s' % url)
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._load(url, key)
+            return flight.value
+        except ThumbnailError as e:
+            with self._lock:
+                self.counts['failures'] += 1
+                self._failed[key] = (time.monotonic(), str(e))
+                self._failed.move_to_end(key)
+                while len(self._failed) > self.max_known:
+                    self._failed.popitem(last=False)
+            flight.error = e
+            raise
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _load(self, url, key):
+        with self._lock:
+            self.counts['fetches'] += 1
+        try:
+            r = deadline.fetch(self.session, url, self.timeout, max_bytes=self.max_source_bytes,
+                               headers={'Accept': 'image/avif,image/webp,image/*;q=0.8'})
+            r.raise_for_status()
+        except deadline.ResponseTooLarge as e:
+            raise ThumbnailError(str(e)) from e
+        except requests.RequestException as e:
+            raise ThumbnailError('fetching %s failed: %s' % (url, e)) from e
+        with phase('resize'):
+            mime = r.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            data, ext = self._resize(url, r.content, mime)
+        return self._store(key, data, ext)
+
+    def _resize(self, url, content, mime):
+        if not HAVE_PIL:
+            if mime not in PASSTHROUGH_TYPES:
+                raise ThumbnailError('%s is not a JPEG/PNG/GIF/WebP image (%s)' % (url, mime or 'no type'))
+            if len(content) > self.passthrough_max_bytes:
+                raise ThumbnailError('%s is too large to serve unresized (Pillow is not installed)' % url)
+            return content, PASSTHROUGH_TYPES[mime]
+        try:
+            with Image.open(io.BytesIO(content)) as src:
+                # JPEGs decode straight at the smallest scale that still covers the card
+                src.draft('RGB', self.size)
+                img = ImageOps.exif_transpose(src)
+                if img.mode != 'RGB':
+                    # transparency becomes white, like the card background
+                    img = img.convert('RGBA')
+                    bg = Image.new('RGB', img.size, 'white')
+                    bg.paste(img, mask=img.getchannel('A'))
+                    img = bg
+                out = io.BytesIO()
+                ImageOps.fit(img, self.size, method=Image.Resampling.LANCZOS).save(
+                    out, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+        except Exception as e:
+            # Pillow raises several types for corrupt, truncated or oversized images
+            raise ThumbnailError('cannot resize %s: %s' % (url, e)) from e
+        return out.getvalue(), '.jpg'
+
+    def _store(self, key, data, ext):
+        path = self.path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # written to a temp file and renamed, so a reader never sees half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise ThumbnailError('cannot store thumbnail: %s' % e) from e
+        with self._lock:
+            old = self._files.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._files[key] = (ext, len(data))
+            self._bytes += len(data)
+            self._evict()
+        return path, EXT_TYPES[ext]
+
+    def _evict(self):
+        # lock held; the newest file always stays
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            key, (ext, size) = self._files.popitem(last=False)
+            self._bytes -= size
+            self.counts['evicted'] += 1
+            try:
+                os.unlink(self.path(key, ext))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, size=list(self.size), resizing=HAVE_PIL, files=len(self._files),
+                        bytes=self._bytes, max_bytes=self.max_bytes, known_urls=len(self._known),
+                        recent_failures=len(self._failed))
@@ -0,0 +1,80 @@
+"""Response time of cold requests against slow upstreams, with and without a request budget.
+
+One of the feeds answers after 5 s. Without a budget a cold /api/news waits
+for it; with the default 1.5 s budget the request returns the other feeds'
+items on time, flagged X-Partial-Response. A burst of concurrent cold
+standings requests against a slow Ergast stand-in shows the in-flight cap
+queueing and shedding upstream fetches while every response stays in budget.
+
+    python scripts/bench_deadline.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from f1_app.server import create_app  # noqa: E402
+from scripts.stub_upstream import serve  # noqa: E402
+
+SLOW = 5.0
+BURST = 40
+
+
+def cold_app(base, ergast_base=None, **kwargs):
+    feeds = [base + '/planetf1.xml', base + '/autosport.xml?delay=%s' % SLOW, base + '/motorsport_atom.xml']
+    # no rate limits: the burst below comes from one client on purpose
+    return create_app(feeds=feeds, ergast_base=ergast_base or base + '/ergast', ergast_cache_dir=None, rate_limits={}, **kwargs)
+
+
+def timed_get(client, path):
+    start = time.perf_counter()
+    r = client.get(path)
+    return time.perf_counter() - start, r
+
+
+def burst(app):
+    # a different historical round per request: every one is a cache miss that goes upstream
+    times, partial = [], []
+    lock = threading.Lock()
+
+    def one(i):
+        # two seasons, so every request is a round that can exist
+        elapsed, r = timed_get(app.test_client(), '/api/standings?season=%d&round=%d' % (2023 + i % 2, i // 2 + 1))
+        with lock:
+            times.append(elapsed)
+            partial.append(r.headers.get('X-Partial-Response') == '1')
+
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(BURST)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return max(times), sum(partial)
+
+
+def main():
+    import logging
+    logging.getLogger('f1_app').setLevel(logging.WARNING)
+    server, base = serve()
+    # every Ergast answer takes 0.4 s, so a standings request needs 0.8 s of upstream time
+    slow_server, slow_base = serve(delay=0.4)
+    try:
+        for label, kwargs in (('no budget', {'request_budget': 60}), ('1.5 s budget', {})):
+            elapsed, r = timed_get(cold_app(base, **kwargs).test_client(), '/api/news')
+            print('%-13s cold /api/news: %5.2fs  items=%-3d partial=%s'
+                  % (label, elapsed, len(r.get_json()['items']), r.headers.get('X-Partial-Response') == '1'))
+
+        app = cold_app(base, ergast_base=slow_base + '/ergast', max_upstream=4, max_upstream_queued=8)
+        worst, partial = burst(app)
+        stats = app.test_client().get('/debug/upstream').get_json()
+        print('burst of %d cold standings requests: worst %.2fs, %d partial, %d fetches shed'
+              % (BURST, worst, partial, stats['shed']))
+    finally:
+        server.shutdown()
+        slow_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
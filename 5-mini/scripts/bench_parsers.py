@@ -0,0 +1,94 @@
+"""Head-to-head benchmark of the feed parser backends on data/fixtures.
+
+Each installed backend is first checked against expected_items.json (titles,
+links, timestamps and cleaned summaries of every fixture feed); only backends
+that get the whole corpus right are timed. The fastest correct one is printed
+as the recommended create_app(parser=...) value.
+
+    python scripts/bench_parsers.py [repeats]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from f1_app.aggregator import FeedAggregator  # noqa: E402
+from f1_app.parsers import PARSERS, available_parsers  # noqa: E402
+from scripts.stub_upstream import FIXTURES  # noqa: E402
+
+CHECKED = ('title', 'link', 'summary', 'published_ts')
+
+
+def load_corpus():
+    with open(os.path.join(FIXTURES, 'expected_items.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+    corpus = {}
+    for name in expected:
+        with open(os.path.join(FIXTURES, name), 'rb') as f:
+            corpus[name] = f.read()
+    return corpus, expected
+
+
+def check(agg, corpus, expected):
+    problems = []
+    for name, content in corpus.items():
+        try:
+            got = [{k: it[k] for k in CHECKED} for it in agg.parse(content)]
+        except Exception as e:
+            problems.append('%s: %s' % (name, e))
+            continue
+        if len(got) != len(expected[name]):
+            problems.append('%s: %d items, expected %d' % (name, len(got), len(expected[name])))
+            continue
+        for i, (g, e) in enumerate(zip(got, expected[name])):
+            bad = [k for k in CHECKED if g[k] != e[k]]
+            if bad:
+                problems.append('%s item %d: %s differ' % (name, i, ', '.join(bad)))
+                break
+    return problems
+
+
+def timeit(fn, corpus, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for content in corpus.values():
+            fn(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    corpus, expected = load_corpus()
+    size_mb = sum(len(c) for c in corpus.values()) / 1e6
+    print('corpus: %d feeds, %.2f MB; best of %d runs' % (len(corpus), size_mb, repeats))
+    missing = [n for n in PARSERS if n not in available_parsers()]
+    if missing:
+        print('not installed:', ', '.join(missing))
+
+    results = []
+    for name in available_parsers():
+        agg = FeedAggregator([], parser=name)
+        problems = check(agg, corpus, expected)
+        if problems:
+            print('%-10s INCORRECT: %s' % (name, '; '.join(problems[:3])))
+            continue
+        raw = timeit(agg.parser.parse, corpus, repeats)
+        full = timeit(agg.parse, corpus, repeats)
+        results.append((full, name))
+        print('%-10s parse %7.2f ms (%5.1f MB/s)   parse+clean %7.2f ms' % (name, raw * 1000, size_mb / raw, full * 1000))
+
+    if not results:
+        print('no backend handled the corpus correctly')
+        return 1
+    best = min(results)[1]
+    print('fastest correct backend: %s  ->  create_app(parser=%r)' % (best, best))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
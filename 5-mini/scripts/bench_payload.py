@@ -0,0 +1,73 @@
+"""Bytes per /api/news response before and after ingest-time summary cleaning.
+
+Runs the app against the local stand-in (data/fixtures) and compares:
+  before    - raw RSS/Atom descriptions, as served before cleaning
+  after     - cleaned + truncated summaries
+  projected - after, with ?fields=title,link,published_ts,source
+
+    python scripts/bench_payload.py
+"""
+import gzip
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from f1_app.server import create_app  # noqa: E402
+from scripts.stub_upstream import FIXTURES, serve  # noqa: E402
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+LIST_FIELDS = 'title,link,published_ts,source'
+
+
+def raw_payload(paths, urls):
+    # the pre-cleaning response: descriptions passed through untouched
+    items = []
+    for path, url in zip(paths, urls):
+        root = ET.parse(path).getroot()
+        for it in root.findall('.//item'):
+            items.append({'title': it.findtext('title') or '', 'link': it.findtext('link') or '',
+                          'summary': it.findtext('description') or '', 'published': it.findtext('pubDate') or '',
+                          'published_ts': 0, 'source': url})
+        for e in root.findall('.//' + ATOM + 'entry'):
+            link_el = e.find(ATOM + 'link')
+            items.append({'title': e.findtext(ATOM + 'title') or '', 'link': link_el.get('href') if link_el is not None else '',
+                          'summary': e.findtext(ATOM + 'summary') or '', 'published': e.findtext(ATOM + 'updated') or '',
+                          'published_ts': 0, 'source': url})
+    return json.dumps({'items': items[:50]}).encode('utf-8')
+
+
+def report(label, body, n_items):
+    gz = len(gzip.compress(body))
+    start = time.perf_counter()
+    for _ in range(20):
+        json.loads(body)
+    parse_ms = (time.perf_counter() - start) / 20 * 1000
+    print('%-10s %9d bytes  %7d gzipped  %7.0f bytes/item  %6.2f ms json.loads' % (label, len(body), gz, len(body) / max(n_items, 1), parse_ms))
+    return len(body)
+
+
+def main():
+    server, base = serve()
+    names = sorted(n for n in os.listdir(FIXTURES) if n.endswith('.xml'))
+    urls = [base + '/' + n for n in names]
+    client = create_app(feeds=urls).test_client()
+
+    after = client.get('/api/news').get_data()
+    n_items = len(json.loads(after)['items'])
+    projected = client.get('/api/news?fields=' + LIST_FIELDS).get_data()
+    before = raw_payload([os.path.join(FIXTURES, n) for n in names], urls)
+
+    print('/api/news over %d fixture feeds, %d items' % (len(names), n_items))
+    b = report('before', before, n_items)
+    a = report('after', after, n_items)
+    p = report('projected', projected, n_items)
+    print('after is %.1fx smaller, projected %.1fx smaller than before' % (b / a, b / p))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Cold-start cost of a worker: import time, create_app() and the first response.
+
+Every run is a fresh interpreter (what an autoscaled or recycled worker
+pays), pointed at the local stub feeds. Two modes:
+
+  lazy      prewarm=False: nothing heavy may be imported by create_app(); the
+            first /api/news pays for importing requests and the parser itself
+  prewarm   the default: the background prewarm starts with the app and the
+            first request arrives PREWARM_GAP seconds later, as it would
+            behind a load balancer's health check
+
+Medians over the runs are checked against the budgets (milliseconds); the
+script exits 1 if one is over or a heavy module was imported eagerly, so it
+can gate CI:
+
+    python scripts/bench_startup.py [--runs 7] [--import-budget 250] [--create-budget 50] [--first-budget 250]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.stub_upstream import serve  # noqa: E402
+
+# must not be in sys.modules right after create_app(prewarm=False)
+HEAVY = ['requests', 'numpy', 'feedparser', 'lxml', 'xml.etree.ElementTree', 'PIL']
+PREWARM_GAP = 0.5
+
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+from f1_app.server import create_app
+t1 = time.perf_counter()
+base, prewarm = sys.argv[1], sys.argv[2] == '1'
+app = create_app(feeds=[base + '/planetf1.xml', base + '/autosport.xml', base + '/motorsport_atom.xml'],
+                 ergast_cache_dir=None, prewarm=prewarm)
+t2 = time.perf_counter()
+eager = [m for m in %r if m in sys.modules]
+if prewarm:
+    time.sleep(%r)
+t3 = time.perf_counter()
+r = app.test_client().get('/api/news')
+t4 = time.perf_counter()
+print(json.dumps({'import': (t1 - t0) * 1000, 'create': (t2 - t1) * 1000, 'first': (t4 - t3) * 1000,
+                  'eager': eager, 'status': r.status_code, 'items': len(r.get_json()['items'])}))
+''' % (HEAVY, PREWARM_GAP)
+
+
+def run_once(base, prewarm):
+    out = subprocess.run([sys.executable, '-c', CHILD, base, '1' if prewarm else '0'], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--runs', type=int, default=7)
+    ap.add_argument('--import-budget', type=float, default=250, help='ms to import f1_app.server')
+    ap.add_argument('--create-budget', type=float, default=50, help='ms for create_app()')
+    ap.add_argument('--first-budget', type=float, default=250, help='ms for the first /api/news (lazy mode)')
+    args = ap.parse_args(argv)
+
+    server, base = serve()
+    failures = []
+    try:
+        print('%-8s %10s %10s %10s  eager imports' % ('mode', 'import ms', 'create ms', 'first ms'))
+        for mode in ('lazy', 'prewarm'):
+            runs = [run_once(base, mode == 'prewarm') for _ in range(args.runs)]
+            med = {k: statistics.median(r[k] for r in runs) for k in ('import', 'create', 'first')}
+            eager = sorted(set(m for r in runs for m in r['eager']))
+            print('%-8s %10.1f %10.1f %10.1f  %s' % (mode, med['import'], med['create'], med['first'], ', '.join(eager) or '-'))
+            if any(r['status'] != 200 or not r['items'] for r in runs):
+                failures.append('%s: /api/news did not return the stub items' % mode)
+            if mode == 'lazy':
+                if eager:
+                    failures.append('imported at startup: %s' % ', '.join(eager))
+                for key, budget in (('import', args.import_budget), ('create', args.create_budget), ('first', args.first_budget)):
+                    if med[key] > budget:
+                        failures.append('%s %.1f ms is over the %.0f ms budget' % (key, med[key], budget))
+    finally:
+        server.shutdown()
+
+    for f in failures:
+        print('FAIL', f)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
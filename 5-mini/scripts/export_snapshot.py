@@ -0,0 +1,60 @@
+"""Export the dashboard as static files for CDN / GitHub Pages hosting.
+
+Runs one fetch cycle with FeedAggregator and StandingsFetcher (no Flask
+server involved) and publishes a new snapshot version under OUT_DIR (see
+f1_app/snapshot.py for the layout). Meant for cron / CI:
+
+    python scripts/export_snapshot.py public/ [--feed URL ...] [--keep 3] [--force]
+
+Exits 0 after publishing or when nothing changed, 1 on failure; the last
+published version stays live either way.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from f1_app.aggregator import FeedAggregator  # noqa: E402
+from f1_app.ergast_cache import ERGAST_BASE, ErgastCache  # noqa: E402
+from f1_app.snapshot import SnapshotExporter  # noqa: E402
+from f1_app.standings import StandingsFetcher  # noqa: E402
+
+DEFAULT_FEEDS = [
+    'https://www.planetf1.com/feed/',
+    'https://www.autosport.com/feed/',
+    'https://www.motorsport.com/rss/all/',
+]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('out_dir', help='directory to publish into (the site root)')
+    ap.add_argument('--feed', action='append', dest='feeds', help='feed URL (repeatable; default: the app feeds)')
+    ap.add_argument('--ergast-base', default=ERGAST_BASE)
+    ap.add_argument('--parser', default=None, help='feed parser backend (etree, lxml, feedparser)')
+    ap.add_argument('--summary-length', type=int, default=200)
+    ap.add_argument('--keep', type=int, default=3, help='published versions to keep (default 3)')
+    ap.add_argument('--force', action='store_true', help='publish even if the data did not change')
+    args = ap.parse_args(argv)
+
+    aggregator = FeedAggregator(args.feeds or DEFAULT_FEEDS, summary_length=args.summary_length, parser=args.parser)
+    standings = StandingsFetcher(ergast=ErgastCache(base_url=args.ergast_base))
+    exporter = SnapshotExporter(args.out_dir, aggregator=aggregator, standings=standings, keep=max(1, args.keep))
+    try:
+        manifest = exporter.export(force=args.force)
+    except Exception as e:
+        print('export failed: %s' % e, file=sys.stderr)
+        return 1
+    if manifest is None:
+        print('unchanged, still serving', exporter.manifest()['version'])
+        return 0
+    sizes = {name: f['bytes'] for name, f in manifest['files'].items()}
+    print('published', manifest['version'])
+    print(json.dumps(sizes, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Local stand-in for the upstream feeds and APIs.
+
+Serves the files under data/fixtures over HTTP so the fetch path can be
+exercised (benchmarks, smoke checks) without touching the real sites.
+serve(delay=...) or a ?delay=<seconds> query parameter makes responses
+that slow, to stand in for a sluggish upstream.
+
+    python scripts/stub_upstream.py [port]
+"""
+import os
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'fixtures')
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        delay = parse_qs(urlsplit(self.path).query).get('delay')
+        delay = float(delay[0]) if delay else self.server.delay
+        if delay:
+            time.sleep(delay)
+        super().do_GET()
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # clients that give up on a slow response (deadlines) are expected here
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def serve(directory=FIXTURES, port=0, delay=0):
+    """Start the stand-in on a daemon thread; returns (server, base_url)."""
+    handler = partial(_QuietHandler, directory=directory)
+    server = _Server(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://127.0.0.1:%d' % server.server_address[1]
+
+
+if __name__ == '__main__':
+    srv, url = serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print('Serving', FIXTURES, 'at', url)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -0,0 +1,157 @@
+"""Checks the feed image path end to end against the local stub upstream.
+
+A temporary directory holds a feed whose media:content / media:thumbnail /
+enclosure images point at the stub, plus large generated photos; the app
+polls the feed through the stub and the checks run against /thumbnail:
+
+  - every backend extracts the image URL at ingest and /api/news carries it
+  - the first request fetches and resizes to the card size; later ones are hits
+  - concurrent first requests for a slow image share one upstream fetch
+  - URLs that were not in a feed get a 404 (no open proxy)
+  - a broken image is a 502 and is not fetched again right away
+  - the cache stays under its byte bound and is reused after a restart
+  - responses carry a long-lived immutable Cache-Control
+
+Needs Pillow for the resize checks (they are skipped without it).
+
+    python scripts/test_thumbnails.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from f1_app import thumbnails  # noqa: E402
+from f1_app.parsers import available_parsers, get_parser  # noqa: E402
+from f1_app.server import create_app  # noqa: E402
+from scripts.stub_upstream import serve  # noqa: E402
+
+SIZE = (320, 180)
+SLOW = 0.5
+BOUND = 30 * 1024  # any two of the three thumbnails fit, not all three
+
+FEED = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+<channel><title>stub</title>
+<item><title>Content</title><link>https://example.com/1</link><description>a</description>
+  <pubDate>Mon, 04 Mar 2024 10:00:00 GMT</pubDate>
+  <media:content url="{base}/big0.jpg" medium="image" width="2400" height="1600"/></item>
+<item><title>Thumbnail first</title><link>https://example.com/2</link><description>b</description>
+  <pubDate>Mon, 04 Mar 2024 09:00:00 GMT</pubDate>
+  <media:group><media:content url="{base}/big-full.jpg" medium="image"/>
+  <media:thumbnail url="{base}/big1.png"/></media:group></item>
+<item><title>Enclosure</title><link>https://example.com/3</link><description>c</description>
+  <pubDate>Mon, 04 Mar 2024 08:00:00 GMT</pubDate>
+  <enclosure url="{base}/big2.jpg?delay={slow}" type="image/jpeg" length="0"/></item>
+<item><title>Video only</title><link>https://example.com/4</link><description>d</description>
+  <pubDate>Mon, 04 Mar 2024 07:00:00 GMT</pubDate>
+  <enclosure url="{base}/clip.mp4" type="video/mp4" length="0"/></item>
+<item><title>Gone</title><link>https://example.com/5</link><description>e</description>
+  <pubDate>Mon, 04 Mar 2024 06:00:00 GMT</pubDate>
+  <media:thumbnail url="{base}/missing.jpg"/></item>
+</channel></rss>
+'''
+
+
+def check(cond, msg):
+    print('%s %s' % ('ok  ' if cond else 'FAIL', msg))
+    return bool(cond)
+
+
+def make_images(directory):
+    from PIL import Image
+    for i, (fmt, mode) in enumerate((('JPEG', 'RGB'), ('PNG', 'RGBA'), ('JPEG', 'RGB'))):
+        # noise so the files (and thumbnails) have realistic sizes
+        # (the PNG stays under the 8 MB source limit)
+        img = Image.effect_noise((2400, 1600) if fmt == 'JPEG' else (1200, 800), 64).convert(mode)
+        img.save(os.path.join(directory, 'big%d.%s' % (i, 'jpg' if fmt == 'JPEG' else 'png')), fmt)
+
+
+def main():
+    ok = True
+    upstream = tempfile.mkdtemp()
+    cache_dir = tempfile.mkdtemp()
+    server, base = serve(upstream)
+    try:
+        with open(os.path.join(upstream, 'feed.xml'), 'w', encoding='utf-8') as f:
+            f.write(FEED.format(base=base, slow=SLOW))
+        with open(os.path.join(upstream, 'feed.xml'), 'rb') as f:
+            content = f.read()
+        expected = [base + '/big0.jpg', base + '/big1.png', base + '/big2.jpg?delay=%s' % SLOW, '', base + '/missing.jpg']
+        for name in available_parsers():
+            got = [e['image'] for e in get_parser(name).parse(content)]
+            ok &= check(got == expected, '%s backend extracts the images: %s' % (name, got))
+
+        if not thumbnails.HAVE_PIL:
+            print('skip resize checks: Pillow is not installed')
+            return 0 if ok else 1
+        make_images(upstream)
+
+        app = create_app(feeds=[base + '/feed.xml'], ergast_cache_dir=None, prewarm=False, rate_limits={},
+                         thumb_cache_dir=cache_dir, thumb_size=SIZE, thumb_cache_max_bytes=BOUND)
+        client = app.test_client()
+        items = client.get('/api/news?fields=title,image').get_json()['items']
+        ok &= check([it['image'] for it in items] == expected, '/api/news carries the image URLs')
+
+        def thumb(src, c=client):
+            r = c.get('/thumbnail', query_string={'src': src})
+            body = r.data
+            r.close()
+            return r, body
+
+        from PIL import Image
+        r, body = thumb(expected[0])
+        ok &= check(r.status_code == 200 and r.mimetype == 'image/jpeg', 'first request: 200 image/jpeg')
+        ok &= check(Image.open(io.BytesIO(body)).size == SIZE, 'resized to %dx%d (%d bytes)' % (SIZE + (len(body),)))
+        cc = r.headers.get('Cache-Control', '')
+        ok &= check('immutable' in cc and 'max-age=31536000' in cc, 'long-lived Cache-Control: %s' % cc)
+        r, body = thumb(expected[1])
+        ok &= check(r.status_code == 200 and Image.open(io.BytesIO(body)).size == SIZE, 'transparent PNG resized')
+        thumb(expected[0])
+        stats = client.get('/debug/thumbnails').get_json()
+        ok &= check(stats['fetches'] == 2 and stats['hits'] == 1, 'second request is a cache hit: %s' % stats)
+
+        codes = []
+
+        def worker():
+            codes.append(thumb(expected[2], app.test_client())[0].status_code)
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = client.get('/debug/thumbnails').get_json()
+        ok &= check(codes == [200] * 6 and stats['fetches'] == 3 and stats['coalesced'] == 5,
+                    '6 concurrent requests for a slow image share one fetch: %s' % stats)
+
+        ok &= check(thumb(base + '/feed.xml')[0].status_code == 404, 'a URL not seen in a feed is refused')
+        ok &= check(thumb('http://169.254.169.254/latest/meta-data/')[0].status_code == 404, 'no open proxy')
+        first, _ = thumb(expected[4])
+        again, _ = thumb(expected[4])
+        stats = client.get('/debug/thumbnails').get_json()
+        ok &= check(first.status_code == again.status_code == 502 and stats['fetches'] == 4,
+                    'a missing image is a 502, not retried right away: %s' % stats)
+        on_disk = sum(os.path.getsize(os.path.join(d, n)) for d, _, names in os.walk(cache_dir) for n in names)
+        ok &= check(stats['evicted'] >= 1 and on_disk <= BOUND,
+                    'disk cache within its bound: %d bytes, %d evicted' % (on_disk, stats['evicted']))
+
+        # a new worker reuses the files on disk without fetching
+        app2 = create_app(feeds=[base + '/feed.xml'], ergast_cache_dir=None, prewarm=False, rate_limits={},
+                          thumb_cache_dir=cache_dir, thumb_size=SIZE, thumb_cache_max_bytes=BOUND)
+        r, _ = thumb(expected[2], app2.test_client())
+        stats = app2.test_client().get('/debug/thumbnails').get_json()
+        ok &= check(r.status_code == 200 and stats['fetches'] == 0, 'restart serves from disk: %s' % stats)
+    finally:
+        server.shutdown()
+        shutil.rmtree(upstream, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
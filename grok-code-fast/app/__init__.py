@@ -2,6 +2,12 @@
 Flask application factory for F1 News Dashboard.
 """
 from flask import Flask
+from .assets import AssetPipeline
+from .deadline import RequestBudget
+from .lazy import PREWARM_MODULES, prewarm
+from .parsers import PARSERS
+from .profiling import SamplingProfiler
+from .ratelimit import RateLimiter
 from .routes import create_routes
 
 
@@ -25,7 +31,43 @@ def create_app(config_class=None):
         from ..config import DevelopmentConfig
         app.config.from_object(DevelopmentConfig)
 
+    # Fingerprint/precompress static files and compress API responses
+    AssetPipeline(
+        app.static_folder,
+        url_prefix=app.config.get('ASSET_URL_PREFIX', '/assets'),
+        min_size=app.config.get('COMPRESS_MIN_SIZE', 512)
+    ).init_app(app)
+
+    # Per-client token buckets on the API routes; limited clients get the last response replayed
+    RateLimiter(
+        limits=app.config.get('RATE_LIMITS'),
+        key_header=app.config.get('RATE_LIMIT_KEY_HEADER', 'X-API-Key'),
+        api_keys=app.config.get('RATE_LIMIT_API_KEYS'),
+        max_clients=app.config.get('RATE_LIMIT_MAX_CLIENTS', 10000)
+    ).init_app(app)
+
+    # Bound every request's upstream work in time and cap concurrent upstream fetches
+    RequestBudget(
+        seconds=app.config.get('REQUEST_DEADLINE', 1.5),
+        max_in_flight=app.config.get('UPSTREAM_MAX_IN_FLIGHT', 8),
+        max_queued=app.config.get('UPSTREAM_MAX_QUEUED', 16)
+    ).init_app(app)
+
+    # Opt-in sampling profiler; the rate can be changed at runtime on /debug/profile
+    if app.config.get('PROFILING_ENABLED', False):
+        SamplingProfiler(
+            rate=app.config.get('PROFILE_SAMPLE_RATE', 0.01),
+            interval=app.config.get('PROFILE_INTERVAL', 0.005)
+        ).init_app(app, token=app.config.get('PROFILE_ADMIN_TOKEN'))
+
     # Register routes
     create_routes(app)
 
+    # Heavy dependencies are imported on first use; start importing them now in the
+    # background so the first request finds them loaded (see app.lazy)
+    if app.config.get('PREWARM_IMPORTS', True):
+        parser_class = PARSERS.get(app.config.get('FEED_PARSER') or 'etree')
+        modules = PREWARM_MODULES + ((parser_class.module,) if parser_class else ())
+        prewarm(modules, profiler=app.extensions.get('profiler'))
+
     return app
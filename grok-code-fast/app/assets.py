@@ -0,0 +1,163 @@
+"""
+Build-free static asset pipeline.
+
+Static files are fingerprinted and precompressed once when the app starts;
+dynamic JSON/HTML responses are compressed per request according to the
+client's Accept-Encoding.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Iterable, List, Optional
+
+from flask import Response, abort, request
+
+try:
+    import brotli
+    HAVE_BROTLI = True
+except ImportError:
+    brotli = None
+    HAVE_BROTLI = False
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Dynamic response types worth compressing on the fly
+COMPRESSIBLE_TYPES = {
+    'application/json', 'text/html', 'text/plain', 'text/css',
+    'application/javascript', 'image/svg+xml'
+}
+
+
+def supported_encodings() -> List[str]:
+    """Content-codings this process can produce, best first."""
+    return ['br', 'gzip'] if HAVE_BROTLI else ['gzip']
+
+
+def choose_encoding(available: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Negotiate a content-coding for the current request.
+
+    Args:
+        available: Restrict the choice to these codings (default: all supported)
+
+    Returns:
+        'br', 'gzip', or None for identity.
+    """
+    offered = [enc for enc in supported_encodings() if available is None or enc in available]
+    if not offered:
+        return None
+    return request.accept_encodings.best_match(offered)
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress data with the given content-coding (maximum level by default)."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+
+
+class AssetPipeline:
+    """
+    Fingerprints and precompresses every file under a static directory.
+
+    Templates call asset_url('script.js') to get /assets/script.<hash>.js,
+    which is served from memory with an immutable Cache-Control header.
+    """
+
+    def __init__(self, static_dir: str, url_prefix: str = '/assets', min_size: int = 512):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.min_size = min_size
+        self.manifest: Dict[str, str] = {}   # logical name -> fingerprinted name
+        self._files: Dict[str, dict] = {}    # fingerprinted name -> entry
+        self._build()
+
+    def _build(self):
+        """Read, hash and precompress all static files."""
+        if not self.static_dir or not os.path.isdir(self.static_dir):
+            return
+
+        for root, _dirs, files in os.walk(self.static_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, self.static_dir).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                stem, ext = os.path.splitext(name)
+                hashed_name = f'{stem}.{digest}{ext}'
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+                variants = {None: data}
+                if len(data) >= self.min_size and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES):
+                    for encoding in supported_encodings():
+                        packed = compress(data, encoding)
+                        if len(packed) < len(data):
+                            variants[encoding] = packed
+
+                self.manifest[name] = hashed_name
+                self._files[hashed_name] = {'mimetype': mimetype, 'etag': digest, 'variants': variants}
+
+    def url_for(self, name: str) -> str:
+        """Fingerprinted URL for a static file (plain /static URL if unknown)."""
+        hashed_name = self.manifest.get(name)
+        if hashed_name is None:
+            return f'/static/{name}'
+        return f'{self.url_prefix}/{hashed_name}'
+
+    def serve(self, filename: str) -> Response:
+        """Serve a fingerprinted asset in the best encoding the client accepts."""
+        entry = self._files.get(filename)
+        if entry is None:
+            abort(404)
+
+        headers = {
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+            'ETag': f'"{entry["etag"]}"'
+        }
+        if request.if_none_match.contains(entry['etag']):
+            return Response(status=304, headers=headers)
+
+        encoding = choose_encoding(entry['variants'])
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(entry['variants'][encoding], mimetype=entry['mimetype'], headers=headers)
+
+    def init_app(self, app):
+        """Register the asset route, the asset_url template global and response compression."""
+        app.add_url_rule(f'{self.url_prefix}/<path:filename>', 'asset', self.serve)
+        app.jinja_env.globals['asset_url'] = self.url_for
+        app.after_request(self.compress_response)
+        app.extensions['assets'] = self
+
+    def compress_response(self, response: Response) -> Response:
+        """Add a validator and negotiated compression to dynamic JSON/HTML responses."""
+        if request.endpoint in ('asset', 'static'):
+            return response
+        if response.mimetype not in COMPRESSIBLE_TYPES or response.direct_passthrough:
+            return response
+
+        if response.status_code == 200:
+            # Before make_conditional, so a 304 varies on the same headers as its 200
+            response.vary.add('Accept-Encoding')
+            # Weak validator: the same entity may be sent with different encodings
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        encoding = choose_encoding()
+        if not encoding:
+            return response
+
+        # Cheaper levels than the startup precompression: this runs per request
+        response.set_data(compress(data, encoding, level=5 if encoding == 'br' else 6))
+        response.headers['Content-Encoding'] = encoding
+        return response
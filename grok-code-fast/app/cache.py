@@ -0,0 +1,193 @@
+"""
+Memoizing cache layer for service methods.
+
+Service methods are wrapped declaratively with @cached; the TTL of each
+method comes from the app configuration. Concurrent calls for the same key
+are coalesced into a single upstream load, and when a load fails the last
+good result is served (stale-on-error) before falling back to sample data.
+A failed load is not retried for error_ttl seconds: until then every request
+gets the stale value or the fallback straight away, so an outage does not
+cost each request a failing upstream fetch.
+"""
+import functools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .deadline import current_deadline
+
+
+class UpstreamError(Exception):
+    """Raised by a service method when its upstream source yielded no usable data."""
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and its bookkeeping."""
+    value: Any
+    stored_at: float
+    expires_at: float
+    last_error: Optional[str] = None
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+
+@dataclass
+class _Flight:
+    """An in-progress load that concurrent callers wait on."""
+    done: threading.Event = field(default_factory=threading.Event)
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class ServiceCache:
+    """Thread-safe TTL cache with call coalescing and stale-on-error."""
+
+    def __init__(self, stale_on_error: bool = True, error_ttl: float = 30):
+        """
+        Args:
+            stale_on_error: Serve the last good value when a load fails
+            error_ttl: Seconds after a failed load during which the key is not loaded again
+        """
+        self.stale_on_error = stale_on_error
+        self.error_ttl = error_ttl
+        self._entries: Dict[str, CacheEntry] = {}
+        self._flights: Dict[str, _Flight] = {}
+        # key -> (time the next load may be tried, error of the failed load)
+        self._failures: Dict[str, Tuple[float, BaseException]] = {}
+        self._lock = threading.Lock()
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key (fresh or stale) without loading anything."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or all entries when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._failures.clear()
+            else:
+                self._entries.pop(key, None)
+                self._failures.pop(key, None)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: float,
+                    fallback: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Return the cached value for key, loading it if missing or expired.
+
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing a fresh value
+            ttl: Seconds a loaded value stays fresh
+            fallback: Called when the load fails and no previous value exists
+
+        Returns:
+            Fresh value, the last good value if the load failed (stale-on-error),
+            or the fallback value.
+        """
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(key)
+            if entry is not None and entry.is_fresh(now):
+                return entry.value
+            failure = self._failures.get(key)
+            if failure is None or now >= failure[0]:
+                failure = None
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+        if failure is not None:
+            # Failed moments ago: serve stale data or the fallback without loading again
+            return self._recover(key, failure[1], fallback)
+
+        deadline = current_deadline()
+        if not leader:
+            # Someone else is already loading this key: share their result,
+            # but wait no longer than the current request's deadline allows
+            if not flight.done.wait(deadline.remaining() if deadline else None):
+                deadline.partial = True
+                if fallback is not None or self.peek(key) is not None:
+                    return self._recover(key, UpstreamError(f"Timed out waiting for '{key}'"), fallback)
+                # Nothing to serve meanwhile; the leader is bounded by its own deadline
+                flight.done.wait()
+            if flight.error is None:
+                return flight.value
+            return self._recover(key, flight.error, fallback)
+
+        partial_before = deadline is not None and deadline.partial
+        try:
+            value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._failures[key] = (time.time() + self.error_ttl, e)
+                self._flights.pop(key, None)
+            flight.done.set()
+            return self._recover(key, e, fallback)
+
+        if deadline is not None and deadline.partial and not partial_before:
+            # Incomplete because the deadline hit: serve it, keep it for stale-on-error,
+            # but load again on the next request
+            ttl = 0
+        now = time.time()
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, stored_at=now, expires_at=now + ttl)
+            self._failures.pop(key, None)
+            self._flights.pop(key, None)
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def _recover(self, key: str, error: BaseException, fallback: Optional[Callable[[], Any]]) -> Any:
+        """Serve the last good value or the fallback after a failed load."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_error = str(error)
+        if self.stale_on_error and entry is not None:
+            print(f"Serving stale '{key}' after error: {error}")
+            return entry.value
+        if fallback is not None:
+            return fallback()
+        raise error
+
+
+def cached(name: str, ttl_setting: str, fallback: Optional[str] = None, default_ttl: float = 300):
+    """
+    Declare a memoized service method.
+
+    The decorated method's instance must provide `cache` (a ServiceCache)
+    and `cache_settings` (a mapping such as the Flask app config).
+
+    Args:
+        name: Cache key for the method's result
+        ttl_setting: Configuration key holding the TTL in seconds
+        fallback: Name of a method returning fallback data when loading fails
+        default_ttl: TTL used when the setting is missing
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ServiceCache] = getattr(self, 'cache', None)
+            fallback_fn = getattr(self, fallback) if fallback else None
+            if cache is None:
+                try:
+                    return method(self, *args, **kwargs)
+                except UpstreamError:
+                    if fallback_fn is None:
+                        raise
+                    return fallback_fn()
+
+            ttl = (getattr(self, 'cache_settings', None) or {}).get(ttl_setting, default_ttl)
+            key = name if not args and not kwargs else f'{name}:{args!r}:{sorted(kwargs.items())!r}'
+            return cache.get_or_load(key, lambda: method(self, *args, **kwargs), ttl, fallback_fn)
+
+        wrapper.uncached = method
+        return wrapper
+    return decorator
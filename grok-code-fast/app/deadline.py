@@ -0,0 +1,233 @@
+"""
+Per-request deadlines and admission control for upstream fetches.
+
+RequestBudget gives every request a fixed time budget. All upstream HTTP
+goes through upstream_get(), which clips the caller's timeout to the time
+the request has left, waits no longer than that for a slot under the global
+in-flight cap, and stops reading a response body that is still arriving
+when the budget runs out. Sources that do not fit in the budget raise
+DeadlineExceeded; the service skips them and returns partial results, the
+request is marked partial, and the response carries X-Partial-Response.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from flask import Flask, g
+
+from .lazy import LazyModule
+from .profiling import phase
+
+requests = LazyModule('requests')  # Imported by the first upstream fetch or the prewarm
+
+CHUNK_SIZE = 16384
+
+_current: contextvars.ContextVar = contextvars.ContextVar('request_deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the current request has no time left for an upstream fetch."""
+
+
+class UpstreamBusy(DeadlineExceeded):
+    """Raised when the fetch was shed because too many are in flight and queued."""
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the caller's max_bytes."""
+
+
+class UpstreamLimiter:
+    """Global cap on concurrent upstream fetches with a bounded wait queue."""
+
+    def __init__(self, max_in_flight: int = 8, max_queued: int = 16):
+        """
+        Args:
+            max_in_flight: Fetches allowed to run at the same time
+            max_queued: Fetches allowed to wait for a slot; further ones are shed
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, wait: float):
+        """
+        Hold one in-flight slot for the duration of the block.
+
+        Args:
+            wait: Longest time to wait for a free slot, in seconds
+
+        Raises:
+            UpstreamBusy: If the wait queue is full.
+            DeadlineExceeded: If no slot became free in time.
+        """
+        with self._condition:
+            if self.in_flight >= self.max_in_flight:
+                if self.queued >= self.max_queued:
+                    self.shed += 1
+                    raise UpstreamBusy(f"{self.in_flight} upstream fetches in flight, {self.queued} queued")
+                self.queued += 1
+                try:
+                    if not self._condition.wait_for(lambda: self.in_flight < self.max_in_flight, timeout=wait):
+                        raise DeadlineExceeded(f"No upstream slot free within {wait:.2f}s")
+                finally:
+                    self.queued -= 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
+
+    def stats(self) -> dict:
+        """Current counters, for debugging."""
+        with self._condition:
+            return {
+                'in_flight': self.in_flight,
+                'queued': self.queued,
+                'shed': self.shed,
+                'max_in_flight': self.max_in_flight,
+                'max_queued': self.max_queued
+            }
+
+
+class Deadline:
+    """Time budget of one request."""
+
+    def __init__(self, seconds: float, limiter: Optional[UpstreamLimiter] = None):
+        self.expires_at = time.monotonic() + seconds
+        self.limiter = limiter
+        self.partial = False  # Set when a source was skipped or cut short
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        """Raise DeadlineExceeded (and mark the request partial) once the budget is used up."""
+        if time.monotonic() >= self.expires_at:
+            self.partial = True
+            raise DeadlineExceeded("Request deadline passed")
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float, limiter: Optional[UpstreamLimiter] = None):
+    """Run a block (e.g. a script or test) under a deadline."""
+    token = _current.set(Deadline(seconds, limiter))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def upstream_get(url: str, timeout: float, max_bytes: Optional[int] = None, **kwargs) -> 'requests.Response':
+    """
+    requests.get() bounded by the current request's deadline and the in-flight cap.
+
+    Args:
+        url: URL to fetch
+        timeout: The caller's own timeout; clipped to the remaining budget
+        max_bytes: Stop reading and fail once the body is larger than this (optional)
+        **kwargs: Passed on to requests.get()
+
+    Returns:
+        Response with its body already read.
+
+    Raises:
+        DeadlineExceeded: If the fetch cannot complete within the budget.
+        ResponseTooLarge: If the body exceeds max_bytes.
+    """
+    with phase('fetch'):
+        deadline = current_deadline()
+        if deadline is None:
+            response = requests.get(url, timeout=timeout, **kwargs)
+            if max_bytes is not None and len(response.content) > max_bytes:
+                raise ResponseTooLarge(f"{url} is larger than {max_bytes} bytes")
+            return response
+
+        try:
+            deadline.check()
+            if deadline.limiter is None:
+                return _read(url, deadline, timeout, max_bytes, kwargs)
+            with deadline.limiter.slot(deadline.remaining()):
+                return _read(url, deadline, timeout, max_bytes, kwargs)
+        except DeadlineExceeded:
+            deadline.partial = True
+            raise
+
+
+def _read(url: str, deadline: Deadline, timeout: float, max_bytes: Optional[int],
+          kwargs: dict) -> 'requests.Response':
+    deadline.check()
+    try:
+        response = requests.get(url, timeout=min(timeout, deadline.remaining()), stream=True, **kwargs)
+        try:
+            # Socket timeouts apply per read, so check the deadline between body chunks
+            body = bytearray()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                body.extend(chunk)
+                if max_bytes is not None and len(body) > max_bytes:
+                    raise ResponseTooLarge(f"{url} is larger than {max_bytes} bytes")
+                deadline.check()
+            response._content = bytes(body)  # Backs .content / .text / .json()
+        finally:
+            response.close()
+    except (requests.Timeout, requests.ConnectionError) as e:
+        # A timeout clipped to the deadline (while streaming it surfaces as ConnectionError)
+        if deadline.remaining() > 0.05:
+            raise
+        raise DeadlineExceeded(f"Request deadline passed while fetching {url}") from e
+    return response
+
+
+class RequestBudget:
+    """Opens a Deadline for every request and flags partial responses."""
+
+    def __init__(self, seconds: float = 1.5, max_in_flight: int = 8, max_queued: int = 16):
+        """
+        Args:
+            seconds: Time budget of each request
+            max_in_flight: Global cap on concurrent upstream fetches
+            max_queued: Upstream fetches allowed to wait for a slot before shedding
+        """
+        self.seconds = seconds
+        self.limiter = UpstreamLimiter(max_in_flight, max_queued)
+
+    def init_app(self, app: Flask):
+        """Register the request hooks and expose the budget as app.extensions['request_budget']."""
+        app.before_request(self._start)
+        app.after_request(self._flag_partial)
+        app.teardown_request(self._end)
+        app.extensions['request_budget'] = self
+
+    def _start(self):
+        g.deadline_token = _current.set(Deadline(self.seconds, self.limiter))
+
+    @staticmethod
+    def _flag_partial(response):
+        deadline = current_deadline()
+        if deadline is not None and deadline.partial:
+            response.headers['X-Partial-Response'] = '1'
+        return response
+
+    @staticmethod
+    def _end(exc):
+        token = g.pop('deadline_token', None)
+        if token is not None:
+            _current.reset(token)
+
+    def stats(self) -> dict:
+        """Budget and limiter counters, for debugging."""
+        return {'request_deadline': self.seconds, **self.limiter.stats()}
@@ -0,0 +1,82 @@
+"""
+Deferred imports of heavy dependencies.
+
+requests, bs4 and the feed parser backends cost tens of milliseconds to
+import, and workers are recycled often, so the app does not import them
+while it is being created. Modules that need one bind a LazyModule at import
+time and the real import happens on first attribute access: by the first
+request that needs it, or earlier by the background prewarm that
+create_app() starts (PREWARM_IMPORTS).
+"""
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Iterable
+
+# What the first requests will need (plus the feed parser backend); imported in this order
+PREWARM_MODULES = ('requests', 'bs4')
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            # The import system's module locks make concurrent first uses safe
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def is_installed(name: str) -> bool:
+    """Whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def prewarm(modules: Iterable[str] = PREWARM_MODULES, profiler=None) -> threading.Thread:
+    """
+    Import modules on a background thread.
+
+    Args:
+        modules: Module names, most urgent first; missing ones are skipped
+        profiler: SamplingProfiler to record the imports with (optional)
+
+    Returns:
+        The started daemon thread.
+    """
+    def run():
+        if profiler is not None:
+            with profiler.task('prewarm'):
+                _import_all(modules)
+        else:
+            _import_all(modules)
+
+    thread = threading.Thread(target=run, name='import-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def _import_all(modules: Iterable[str]):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        except Exception as e:
+            print(f"Prewarm import of {name} failed: {e}")
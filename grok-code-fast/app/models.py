@@ -2,8 +2,25 @@
 Data models for the F1 News Dashboard application.
 """
 from dataclasses import dataclass
-from typing import Optional
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
 from datetime import datetime
+from .parsers import rss_item_entry
+from .text import clean_summary, strip_html
+
+
+def published_timestamp(value: Optional[str]) -> float:
+    """Epoch seconds of an RSS (RFC 822) or Atom (ISO 8601) date, 0.0 if unparseable."""
+    if not value:
+        return 0.0
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
 
 
 @dataclass
@@ -14,31 +31,72 @@ class NewsItem:
     summary: str
     published: str
     source: str = ""  # News source (e.g., 'bbc.co.uk', 'espn.com')
+    published_ts: float = 0.0  # Parsed publication time, used for feed scheduling
+    image: str = ""  # Publisher's thumbnail URL; cards load it resized through /thumbnail
+
+    # Fields a client may select with /api/news?fields=
+    FIELDS = ('title', 'link', 'summary', 'published', 'source', 'image')
 
     @classmethod
-    def from_xml(cls, item, source="") -> 'NewsItem':
-        """Create NewsItem from XML element."""
-        title_elem = item.find('title')
-        link_elem = item.find('link')
-        desc_elem = item.find('description')
-        pub_elem = item.find('pubDate')
+    def from_entry(cls, entry: dict, source="", summary_length: Optional[int] = 280) -> 'NewsItem':
+        """
+        Create NewsItem from a parser entry dict (see app.parsers).
 
+        The description is sanitized to plain text and truncated to
+        summary_length characters once, here, rather than on every response.
+        """
         return cls(
-            title=title_elem.text or '' if title_elem is not None else '',
-            link=link_elem.text or '' if link_elem is not None else '',
-            summary=desc_elem.text or '' if desc_elem is not None else '',
-            published=pub_elem.text or '' if pub_elem is not None else '',
-            source=source
+            title=strip_html(entry.get('title')),
+            link=entry.get('link') or '',
+            summary=clean_summary(entry.get('summary'), summary_length),
+            published=entry.get('published') or '',
+            source=source,
+            published_ts=published_timestamp(entry.get('published')),
+            image=entry.get('image') or ''
         )
 
-    def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
+    @classmethod
+    def from_xml(cls, item, source="", summary_length: Optional[int] = 280) -> 'NewsItem':
+        """Create NewsItem from an RSS <item> XML element."""
+        return cls.from_entry(rss_item_entry(item), source, summary_length)
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Convert to dictionary for JSON serialization.
+
+        Args:
+            fields: Optional subset of FIELDS to include (default: all)
+        """
+        data = {
             'title': self.title,
             'link': self.link,
             'summary': self.summary,
-            'published': self.published
+            'published': self.published,
+            'source': self.source,
+            'image': self.image
         }
+        if fields is None:
+            return data
+        return {name: data[name] for name in fields}
+
+    @classmethod
+    def parse_fields(cls, raw: Optional[str]) -> Optional[tuple]:
+        """
+        Parse a comma-separated ?fields= value.
+
+        Returns:
+            Tuple of field names, or None when no projection was requested.
+
+        Raises:
+            ValueError: If an unknown field is requested.
+        """
+        if not raw:
+            return None
+        fields = tuple(name.strip() for name in raw.split(',') if name.strip())
+        unknown = [name for name in fields if name not in cls.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
 
 
 @dataclass
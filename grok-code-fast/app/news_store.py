@@ -0,0 +1,125 @@
+"""
+Versioned news item store for delta sync.
+
+The store keeps the current news list and moves to a new version every
+time the list changes. For each recent version it remembers the list's
+item keys (link plus a digest of the item's content), so a client that
+reports the version it holds can be sent only the removed links and the
+added items with their positions. Clients whose version is no longer in
+the history get a full resync. A version is a digest of the list's item
+keys rather than a counter, so every worker (and every restart) gives the
+same list the same number; a version this worker never held cannot be
+mistaken for one of its own lists and always gets a full resync.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def item_key(item: dict) -> str:
+    """Identity of one version of an item: its link plus a digest of its content."""
+    digest = hashlib.blake2b(json.dumps(item, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+    return f"{item.get('link', '')}#{digest}"
+
+
+def list_version(keys: Tuple[str, ...]) -> int:
+    """Version number of a list of item keys (48 bits, so exact as a JavaScript number)."""
+    return int.from_bytes(hashlib.blake2b('\n'.join(keys).encode('utf-8'), digest_size=6).digest(), 'big')
+
+
+def key_link(key: str) -> str:
+    """The link part of an item key."""
+    return key.rsplit('#', 1)[0]
+
+
+class NewsStore:
+    """Current news list with a bounded history of versions."""
+
+    def __init__(self, max_versions: int = 50):
+        """
+        Args:
+            max_versions: Versions a client may lag behind before it gets a full resync
+        """
+        self.max_versions = max_versions
+        self._keys: Tuple[str, ...] = ()
+        self.version = list_version(self._keys)
+        self._items: Dict[str, dict] = {}
+        self._history: "OrderedDict[int, Tuple[str, ...]]" = OrderedDict({self.version: self._keys})
+        self._lock = threading.Lock()
+
+    def update(self, items: List[dict]) -> int:
+        """
+        Record the current news list.
+
+        Args:
+            items: Serialized news items, newest first
+
+        Returns:
+            Version number describing the list.
+        """
+        keys = tuple(item_key(item) for item in items)
+        with self._lock:
+            if keys != self._keys:
+                self._items = dict(zip(keys, items))
+                self._keys = keys
+                self.version = list_version(keys)
+                self._history[self.version] = keys
+                self._history.move_to_end(self.version)
+                while len(self._history) > self.max_versions:
+                    self._history.popitem(last=False)
+            return self.version
+
+    def version_of(self, items: List[dict]) -> Optional[int]:
+        """
+        Version describing a news list, without recording anything.
+
+        Readers of a possibly older list (e.g. a cached dashboard snapshot)
+        use this instead of update(), so only fresh fetches move the version.
+
+        Args:
+            items: Serialized news items, newest first
+
+        Returns:
+            The version of items, or None if that list is not in the history.
+        """
+        version = list_version(tuple(item_key(item) for item in items))
+        with self._lock:
+            return version if version in self._history else None
+
+    def changes_since(self, version: int, fields: Optional[tuple] = None) -> dict:
+        """
+        Changes between a client's version and the current list.
+
+        Args:
+            version: Version the client currently shows
+            fields: Optional subset of item fields to return
+
+        Returns:
+            {'version', 'full': False, 'added': [{'at', 'item'}], 'removed': [links]}
+            or, for an unknown version, {'version', 'full': True, 'items': [...]}.
+        """
+        def project(item: dict) -> dict:
+            return item if fields is None else {name: item[name] for name in fields}
+
+        with self._lock:
+            current = self._keys
+            old = self._history.get(version)
+            if old is not None:
+                old_keys, new_keys = set(old), set(current)
+                added = [{'at': i, 'item': project(self._items[key])}
+                         for i, key in enumerate(current) if key not in old_keys]
+                # A delta replacing most of the list is no cheaper than the list itself
+                if len(added) <= len(current) // 2 or not current:
+                    return {
+                        'version': self.version,
+                        'full': False,
+                        'added': added,
+                        'removed': [key_link(key) for key in old if key not in new_keys]
+                    }
+            return {
+                'version': self.version,
+                'full': True,
+                'items': [project(self._items[key]) for key in current]
+            }
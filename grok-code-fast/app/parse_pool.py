@@ -0,0 +1,219 @@
+"""
+Optional process pool for CPU-heavy parsing.
+
+Parsing a large feed or standings page (ElementTree, BeautifulSoup's
+html.parser) is pure Python and holds the GIL for its whole duration, which
+stalls every other request thread of the worker. With PARSE_WORKERS > 0,
+inputs of at least PARSE_INLINE_THRESHOLD bytes are handed to a pool of
+worker processes as raw bytes, and only compact records come back (tuples of
+news fields, dicts of standings texts). Smaller inputs, where pickling and
+the round trip cost more than the parse, run inline as before. A job that
+does not finish within the request deadline raises DeadlineExceeded like a
+slow fetch; a crashed pool is rebuilt and the job runs inline.
+
+A job that is already running cannot be cancelled, so one abandoned at the
+deadline keeps its worker busy until it finishes. Jobs in flight are keyed
+by their function, arguments and a hash of the content: a later request for
+the same page waits on the job already running instead of queueing a copy
+behind it. At most max_pending jobs are in flight; past that, new ones run
+inline.
+"""
+import hashlib
+import pickle
+import threading
+from concurrent.futures import BrokenExecutor, Future, TimeoutError as FutureTimeout
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .deadline import DeadlineExceeded, current_deadline
+from .lazy import LazyModule
+from .models import NewsItem, published_timestamp
+from .parsers import FeedParser
+from .scraper import CONSTRUCTOR_LAYOUT, DRIVER_LAYOUT, StandingsScraper
+
+bs4 = LazyModule('bs4')
+
+LAYOUTS = {layout.name: layout for layout in (DRIVER_LAYOUT, CONSTRUCTOR_LAYOUT)}
+
+# Each worker process learns standings selectors on its own (see app.scraper)
+_worker_scraper: Optional[StandingsScraper] = None
+
+
+def parse_feed(content: bytes, parser: FeedParser, source: str, summary_length: int,
+               limit: int = 5) -> Tuple[List[tuple], List[float]]:
+    """
+    Parse a feed into compact records.
+
+    Returns:
+        (NewsItem field tuples of the first `limit` entries,
+         publication timestamps of all entries for the feed schedule)
+
+    Raises:
+        FeedParseError: If the document is not a parseable feed.
+    """
+    entries = parser.parse(content)
+    items = [NewsItem.from_entry(entry, source, summary_length) for entry in entries[:limit]]
+    return (
+        [(item.title, item.link, item.summary, item.published, item.source, item.published_ts, item.image)
+         for item in items],
+        [published_timestamp(entry.get('published')) for entry in entries]
+    )
+
+
+def scrape_standings(content: bytes, layout_name: str, fallback_names: Tuple[str, ...],
+                     scraper: Optional[StandingsScraper] = None) -> Tuple[str, list]:
+    """
+    Parse a standings page.
+
+    Args:
+        content: Raw HTML
+        layout_name: Name of the PageLayout to scrape with
+        fallback_names: Names to search the page text for when it has no row containers
+        scraper: Selector-learning scraper (the worker's own when run in the pool)
+
+    Returns:
+        ('rows', [field dicts]) or, for pages without row containers,
+        ('names', [texts of the first elements mentioning a fallback name]).
+    """
+    global _worker_scraper
+    if scraper is None:
+        if _worker_scraper is None:
+            _worker_scraper = StandingsScraper()
+        scraper = _worker_scraper
+
+    soup = bs4.BeautifulSoup(content, 'html.parser')
+    rows = scraper.scrape(soup, LAYOUTS[layout_name])
+    if rows is not None:
+        return 'rows', rows
+
+    names = []
+    for element in soup.find_all(['h1', 'h2', 'h3', 'h4', 'span', 'div', 'p']):
+        text = element.get_text().strip()
+        if any(name.upper() in text.upper() for name in fallback_names):
+            names.append(text)
+            if len(names) >= 10:
+                break
+    return 'names', names
+
+
+def _ready() -> bool:
+    return True
+
+
+class ParsePool:
+    """Runs parse jobs inline or in worker processes depending on input size."""
+
+    def __init__(self, workers: int = 0, inline_threshold: int = 128 * 1024, max_pending: int = 8):
+        """
+        Args:
+            workers: Worker processes (0 parses everything inline)
+            inline_threshold: Inputs smaller than this many bytes are parsed inline
+            max_pending: Jobs in flight in the pool at once; further ones are parsed inline
+        """
+        self.workers = workers
+        self.inline_threshold = inline_threshold
+        self.max_pending = max_pending
+        self.inline_jobs = 0
+        self.pool_jobs = 0
+        self.joined_jobs = 0
+        self.overflow_jobs = 0
+        self._in_flight: Dict[str, Future] = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        if workers > 0:
+            self._start()
+
+    def _start(self):
+        # Imported here: multiprocessing is only needed when the pool is enabled
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 'spawn' rather than fork: the parent has request threads and held locks
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self._executor.submit(_ready)  # Start the workers now rather than on the first big page
+
+    def run(self, job: Callable, content: bytes, *args, inline: Optional[Callable] = None) -> Any:
+        """
+        Run job(content, *args), in a worker process if content is large enough.
+
+        Args:
+            job: Module-level parse function (it is pickled by reference)
+            content: Raw bytes to parse
+            *args: Further picklable arguments
+            inline: Callable used instead of job when running in this process
+
+        Raises:
+            DeadlineExceeded: If a worker did not finish within the request deadline.
+        """
+        executor = self._executor
+        if executor is None or len(content) < self.inline_threshold:
+            with self._lock:
+                self.inline_jobs += 1
+            return (inline or job)(content, *args)
+
+        key = self._key(job, content, args)
+        deadline = current_deadline()
+        submitted = None
+        try:
+            with self._lock:
+                future = self._in_flight.get(key)
+                if future is not None:
+                    # The same page is being parsed already, maybe for a request that gave up on it
+                    self.joined_jobs += 1
+                elif len(self._in_flight) >= self.max_pending:
+                    # Workers are backed up (e.g. with abandoned jobs): don't queue behind them
+                    self.overflow_jobs += 1
+                else:
+                    self.pool_jobs += 1
+                    future = self._in_flight[key] = executor.submit(job, content, *args)
+                    submitted = future
+            if future is None:
+                return (inline or job)(content, *args)
+            if future is submitted:
+                future.add_done_callback(partial(self._finished, key))
+            return future.result(timeout=deadline.remaining() if deadline is not None else None)
+        except FutureTimeout:
+            # A running job cannot be cancelled; it stays in flight for later requests to join
+            deadline.partial = True
+            raise DeadlineExceeded("Request deadline passed while parsing") from None
+        except BrokenExecutor:  # BrokenProcessPool
+            print("Parse worker died; restarting the pool and parsing inline")
+            with self._lock:
+                if self._executor is executor:
+                    self._in_flight.clear()
+                    self._start()
+            return (inline or job)(content, *args)
+
+    @staticmethod
+    def _key(job: Callable, content: bytes, args: tuple) -> str:
+        """Identity of a job: its function, arguments and a hash of the content."""
+        digest = hashlib.blake2b(content, digest_size=16)
+        digest.update(pickle.dumps((job.__module__, job.__qualname__, args)))
+        return digest.hexdigest()
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> dict:
+        """Settings and job counters, for debugging."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'inline_threshold': self.inline_threshold,
+                'max_pending': self.max_pending,
+                'inline_jobs': self.inline_jobs,
+                'pool_jobs': self.pool_jobs,
+                'joined_jobs': self.joined_jobs,
+                'overflow_jobs': self.overflow_jobs,
+                'in_flight': len(self._in_flight)
+            }
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            with self._lock:
+                self._in_flight.clear()
@@ -0,0 +1,228 @@
+"""
+Interchangeable RSS/Atom parser backends.
+
+All backends share one interface: parse() takes the raw bytes of a feed that
+the service already fetched with its timed HTTP client (parsers never perform
+network I/O) and returns a list of entry dicts with 'title', 'link',
+'summary', 'published' and 'image' keys. Summaries are returned raw;
+NewsItem cleans them. 'image' is the entry's thumbnail URL (media:thumbnail,
+then an image media:content, then an image enclosure) or ''.
+"""
+from typing import Dict, List, Optional, Type, Union
+
+from .lazy import LazyModule, is_installed
+
+# Imported on first parse (see app.lazy)
+ET = LazyModule('xml.etree.ElementTree')
+feedparser = LazyModule('feedparser')
+lxml_etree = LazyModule('lxml.etree')
+HAVE_FEEDPARSER = is_installed('feedparser')
+HAVE_LXML = is_installed('lxml')
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+MEDIA_NS = '{http://search.yahoo.com/mrss/}'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+
+class FeedParseError(ValueError):
+    """Raised when a feed document cannot be parsed."""
+
+
+def is_image(url: Optional[str], mime_type: Optional[str] = None, medium: Optional[str] = None) -> bool:
+    """Whether a media/enclosure reference is an http(s) image."""
+    if not url or not url.startswith(('http://', 'https://')):
+        return False
+    if medium or mime_type:
+        return medium == 'image' or (mime_type or '').startswith('image/')
+    return url.lower().split('?')[0].endswith(IMAGE_EXTENSIONS)
+
+
+def entry_image(elem) -> str:
+    """Thumbnail URL of an RSS <item> or Atom <entry> (ElementTree API), or ''."""
+    # Direct children or inside <media:group>; the thumbnail is the smallest rendition
+    for thumb in elem.iterfind(f'.//{MEDIA_NS}thumbnail'):
+        if is_image(thumb.get('url'), 'image/'):
+            return thumb.get('url')
+    for content in elem.iterfind(f'.//{MEDIA_NS}content'):
+        if is_image(content.get('url'), content.get('type'), content.get('medium')):
+            return content.get('url')
+    for enclosure in elem.iterfind('enclosure'):
+        if is_image(enclosure.get('url'), enclosure.get('type')):
+            return enclosure.get('url')
+    for link in elem.iterfind(f'{ATOM_NS}link'):
+        if link.get('rel') == 'enclosure' and is_image(link.get('href'), link.get('type')):
+            return link.get('href')
+    return ''
+
+
+def rss_item_entry(item) -> Dict[str, str]:
+    """Extract an entry dict from an RSS <item> element (ElementTree API)."""
+    return {
+        'title': item.findtext('title') or '',
+        'link': item.findtext('link') or '',
+        'summary': item.findtext('description') or '',
+        'published': item.findtext('pubDate') or '',
+        'image': entry_image(item)
+    }
+
+
+def atom_entry(entry) -> Dict[str, str]:
+    """Extract an entry dict from an Atom <entry> element (ElementTree API)."""
+    link = ''
+    for link_elem in entry.iterfind(f'{ATOM_NS}link'):
+        if link_elem.get('rel', 'alternate') == 'alternate':
+            link = link_elem.get('href') or ''
+            break
+    return {
+        'title': entry.findtext(f'{ATOM_NS}title') or '',
+        'link': link,
+        'summary': entry.findtext(f'{ATOM_NS}summary') or entry.findtext(f'{ATOM_NS}content') or '',
+        'published': entry.findtext(f'{ATOM_NS}updated') or entry.findtext(f'{ATOM_NS}published') or '',
+        'image': entry_image(entry)
+    }
+
+
+def entries_from_root(root) -> List[Dict[str, str]]:
+    """Entries of an RSS or Atom document root (stdlib or lxml element)."""
+    entries = [rss_item_entry(item) for item in root.iterfind('.//item')]
+    if not entries:
+        entries = [atom_entry(entry) for entry in root.iterfind(f'.//{ATOM_NS}entry')]
+    return entries
+
+
+class FeedParser:
+    """Base class for feed parser backends."""
+    name = ''
+    module = ''  # The backend's library, imported on first parse
+
+    def __reduce__(self):
+        # Sent to parse worker processes by name (see app.parse_pool); lxml parsers do not pickle
+        return get_parser, (self.name or None,)
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the backend's dependencies are installed."""
+        return True
+
+    def parse(self, content: bytes) -> List[Dict[str, str]]:
+        """
+        Parse a feed document.
+
+        Args:
+            content: Raw feed bytes as received from the server
+
+        Returns:
+            List of entry dicts.
+
+        Raises:
+            FeedParseError: If the document is not a parseable feed.
+        """
+        raise NotImplementedError
+
+
+class ElementTreeParser(FeedParser):
+    """Standard library xml.etree backend."""
+    name = 'etree'
+    module = 'xml.etree.ElementTree'
+
+    def parse(self, content: bytes) -> List[Dict[str, str]]:
+        try:
+            root = ET.fromstring(content)
+        except ET.ParseError as e:
+            raise FeedParseError(str(e)) from e
+        return entries_from_root(root)
+
+
+class LxmlParser(FeedParser):
+    """lxml backend; recovers from minor XML errors."""
+    name = 'lxml'
+    module = 'lxml.etree'
+
+    @classmethod
+    def available(cls) -> bool:
+        return HAVE_LXML
+
+    def __init__(self):
+        # Never resolve external entities or touch the network
+        self._parser = lxml_etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=True)
+
+    def parse(self, content: bytes) -> List[Dict[str, str]]:
+        root = lxml_etree.fromstring(content, parser=self._parser)
+        if root is None:
+            raise FeedParseError('lxml could not parse feed')
+        return entries_from_root(root)
+
+
+class FeedparserParser(FeedParser):
+    """feedparser backend, fed pre-fetched bytes so it never opens URLs itself."""
+    name = 'feedparser'
+    module = 'feedparser'
+
+    @classmethod
+    def available(cls) -> bool:
+        return HAVE_FEEDPARSER
+
+    def parse(self, content: bytes) -> List[Dict[str, str]]:
+        parsed = feedparser.parse(content, sanitize_html=False, resolve_relative_uris=False)
+        if parsed.bozo and not parsed.entries:
+            raise FeedParseError(str(parsed.get('bozo_exception', 'unparseable feed')))
+
+        entries = []
+        for entry in parsed.entries:
+            summary = entry.get('summary', '')
+            if not summary and entry.get('content'):
+                summary = entry['content'][0].get('value', '')
+            entries.append({
+                'title': entry.get('title', ''),
+                'link': entry.get('link', ''),
+                'summary': summary,
+                'published': entry.get('published', '') or entry.get('updated', ''),
+                'image': self._image(entry)
+            })
+        return entries
+
+    @staticmethod
+    def _image(entry) -> str:
+        for thumb in entry.get('media_thumbnail') or []:
+            if is_image(thumb.get('url'), 'image/'):
+                return thumb['url']
+        for content in entry.get('media_content') or []:
+            if is_image(content.get('url'), content.get('type'), content.get('medium')):
+                return content['url']
+        for link in entry.get('links') or []:
+            if link.get('rel') == 'enclosure' and is_image(link.get('href'), link.get('type')):
+                return link['href']
+        return ''
+
+
+PARSERS: Dict[str, Type[FeedParser]] = {
+    cls.name: cls for cls in (ElementTreeParser, LxmlParser, FeedparserParser)
+}
+DEFAULT_PARSER = 'etree'
+
+
+def available_parsers() -> List[str]:
+    """Names of the backends that can be used in this environment."""
+    return [name for name, cls in PARSERS.items() if cls.available()]
+
+
+def get_parser(parser: Union[str, FeedParser, None] = None) -> FeedParser:
+    """
+    Resolve a backend name to a parser instance.
+
+    Args:
+        parser: Backend name, an existing parser instance, or None for the default
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    if isinstance(parser, FeedParser):
+        return parser
+
+    name = parser or DEFAULT_PARSER
+    parser_class: Optional[Type[FeedParser]] = PARSERS.get(name)
+    if parser_class is None:
+        raise ValueError(f"Unknown feed parser '{name}' (known: {', '.join(PARSERS)})")
+    if not parser_class.available():
+        raise ValueError(f"Feed parser '{name}' is not installed")
+    return parser_class()
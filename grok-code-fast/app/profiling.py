@@ -0,0 +1,247 @@
+"""
+Opt-in sampling profiler for requests and background work.
+
+A fraction of requests (PROFILE_SAMPLE_RATE) is profiled. While a profiled
+request runs, a sampler thread reads its stack every PROFILE_INTERVAL
+seconds via sys._current_frames(), so the profiled code itself runs at full
+speed and unprofiled requests only pay for one random() call. Code marks
+its phases with `with phase('fetch'):` (likewise parse, dedupe, serialize);
+the mark follows the request into worker threads started with
+contextvars.copy_context(). Samples are aggregated as collapsed stacks
+(`route;phase;frame;frame... count`), the input format of flamegraph.pl,
+inferno and speedscope, and served from /debug/profile, where the sample
+rate can also be changed at runtime.
+"""
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, Response, abort, g, jsonify, request
+
+OUTSIDE_PHASES = 'handler'  # Phase name for profiled time not inside any phase() block
+OVERFLOW_STACK = '[other stacks]'
+
+
+@dataclass(frozen=True)
+class _Profiled:
+    """Marks the current context as profiled (copied into worker threads with it)."""
+    profiler: 'SamplingProfiler'
+    label: str
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('profiled', default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Attribute the samples taken inside the block to a phase.
+
+    A no-op unless the current request or task is being profiled.
+    """
+    profiled = _current.get()
+    if profiled is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    previous = profiled.profiler._enter(thread_id, profiled.label, name)
+    try:
+        yield
+    finally:
+        profiled.profiler._leave(thread_id, previous)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """Samples the stacks of profiled requests and tasks into collapsed-stack counts."""
+
+    def __init__(self, rate: float = 0.01, interval: float = 0.005, max_depth: int = 64,
+                 max_stacks: int = 5000):
+        """
+        Args:
+            rate: Fraction of requests and tasks to profile (0 pauses profiling)
+            interval: Seconds between stack samples of a profiled thread
+            max_depth: Innermost frames kept per sample
+            max_stacks: Distinct stacks kept; further ones are counted under OVERFLOW_STACK
+        """
+        self.rate = rate
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.profiled = 0
+        self.samples = 0
+        self._counts: Counter = Counter()
+        self._threads: Dict[int, Tuple[str, str]] = {}  # Thread id -> (label, phase)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def init_app(self, app: Flask, url: str = '/debug/profile', token: Optional[str] = None):
+        """
+        Profile sampled requests and serve the results.
+
+        Args:
+            app: Flask application
+            url: Admin endpoint for the collapsed stacks and the runtime switch
+            token: If set, the endpoint requires it in the X-Admin-Token header
+        """
+        self.url = url
+        self.token = token
+        app.before_request(self._start_request)
+        app.teardown_request(self._end_request)
+        app.add_url_rule(url, 'debug_profile', self._endpoint, methods=['GET', 'POST'])
+        app.extensions['profiler'] = self
+
+    def should_sample(self) -> bool:
+        """Decide whether the next request or task is profiled."""
+        return self.rate > 0 and random.random() < self.rate
+
+    @contextmanager
+    def task(self, label: str):
+        """Profile a piece of background work (e.g. a cache refresh) at the sample rate."""
+        if not self.should_sample():
+            yield
+            return
+        token = self._begin(label)
+        try:
+            yield
+        finally:
+            self._finish(token)
+
+    def _begin(self, label: str) -> contextvars.Token:
+        with self._lock:
+            self.profiled += 1
+        token = _current.set(_Profiled(self, label))
+        self._enter(threading.get_ident(), label, OUTSIDE_PHASES)
+        return token
+
+    def _finish(self, token: contextvars.Token):
+        self._leave(threading.get_ident(), None)
+        _current.reset(token)
+
+    def _start_request(self):
+        if request.path == self.url or not self.should_sample():
+            return
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        g.profile_token = self._begin(f"{request.method} {rule}")
+
+    def _end_request(self, exc):
+        token = g.pop('profile_token', None)
+        if token is not None:
+            self._finish(token)
+
+    def _enter(self, thread_id: int, label: str, phase_name: str) -> Optional[Tuple[str, str]]:
+        """Register a thread as profiled; returns what it was doing before."""
+        with self._lock:
+            previous = self._threads.get(thread_id)
+            self._threads[thread_id] = (label, phase_name)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._sampler.start()
+        self._wake.set()
+        return previous
+
+    def _leave(self, thread_id: int, previous: Optional[Tuple[str, str]]):
+        with self._lock:
+            if previous is None:
+                self._threads.pop(thread_id, None)
+            else:
+                self._threads[thread_id] = previous
+
+    def _run(self):
+        while True:
+            with self._lock:
+                targets = dict(self._threads)
+                if not targets:
+                    self._wake.clear()
+            if not targets:
+                self._wake.wait()
+                continue
+            self._sample(targets)
+            time.sleep(self.interval)
+
+    def _sample(self, targets: Dict[int, Tuple[str, str]]):
+        frames = sys._current_frames()
+        stacks = []
+        for thread_id, (label, phase_name) in targets.items():
+            frame = frames.get(thread_id)
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                stacks.append(';'.join([label, phase_name] + names[::-1]))
+        del frames
+        with self._lock:
+            for stack in stacks:
+                if stack not in self._counts and len(self._counts) >= self.max_stacks:
+                    stack = OVERFLOW_STACK
+                self._counts[stack] += 1
+            self.samples += len(stacks)
+
+    def collapsed(self, label: Optional[str] = None) -> str:
+        """Collapsed stacks, one `stack count` line each, optionally for one route/task."""
+        with self._lock:
+            counts = list(self._counts.items())
+        lines = [f"{stack} {count}" for stack, count in sorted(counts)
+                 if label is None or stack.startswith(label + ';')]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def stats(self) -> dict:
+        """Settings, counters and samples per route and phase."""
+        with self._lock:
+            by_route: Dict[str, Counter] = {}
+            for stack, count in self._counts.items():
+                label, _, rest = stack.partition(';')
+                by_route.setdefault(label, Counter())[rest.partition(';')[0]] += count
+            return {
+                'rate': self.rate,
+                'interval': self.interval,
+                'profiled': self.profiled,
+                'samples': self.samples,
+                'stacks': len(self._counts),
+                'routes': {label: dict(phases) for label, phases in by_route.items()}
+            }
+
+    def reset(self):
+        """Drop the collected samples."""
+        with self._lock:
+            self._counts.clear()
+            self.samples = 0
+            self.profiled = 0
+
+    def _endpoint(self):
+        """
+        GET: collapsed stacks as text (?route=<label> filters, ?format=json summarizes).
+        POST: change the sample rate at runtime ({"rate": 0.05}) and/or {"reset": true}.
+        """
+        if self.token and request.headers.get('X-Admin-Token') != self.token:
+            abort(403)
+        if request.method == 'POST':
+            settings = request.get_json(silent=True) or request.form
+            if 'rate' in settings:
+                try:
+                    rate = float(settings['rate'])
+                except (TypeError, ValueError):
+                    rate = -1.0
+                if not 0.0 <= rate <= 1.0:
+                    return jsonify({'error': 'rate must be a number between 0 and 1'}), 400
+                self.rate = rate
+            if str(settings.get('reset', '')).lower() in ('1', 'true', 'yes'):
+                self.reset()
+            return jsonify(self.stats())
+        if request.args.get('format') == 'json':
+            return jsonify(self.stats())
+        return Response(self.collapsed(request.args.get('route')), mimetype='text/plain')
@@ -0,0 +1,172 @@
+"""
+Per-client rate limiting for the API routes.
+
+Each (route, client) pair has a token bucket: `rate` tokens per second up to
+`burst`, one token per request. A client is its API key (RATE_LIMIT_KEY_HEADER)
+when it sends one of the configured RATE_LIMIT_API_KEYS, else its IP address;
+an unknown key counts as no key, so inventing a new key per request neither
+escapes the limit nor fills the table with buckets. Buckets live in one OrderedDict in
+least-recently-used order, so a request costs O(1): the bucket is refilled
+from its timestamp, moved to the end, and buckets at the front that have
+refilled completely (indistinguishable from a new bucket) are dropped.
+
+A client over its limit gets the last 200 response of the same URL, replayed
+from memory and marked X-Rate-Limited, since a poller in a tight loop would
+get the same data anyway. If that URL has no stored response yet, the client
+gets a 429. Both carry Retry-After. Stored responses are shared by all
+clients and never include partial (deadline-cut) results.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import Flask, current_app, g, jsonify, request
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated', 'full_at')
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.full_at = updated
+
+
+class RateLimiter:
+    """Token buckets per route and client, with replay of the last good response."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 key_header: str = 'X-API-Key', api_keys: Optional[Iterable[str]] = None,
+                 max_clients: int = 10000, max_replays: int = 256):
+        """
+        Args:
+            limits: Route rule (e.g. '/api/news') -> (requests per second, burst)
+            key_header: Request header carrying an API key; clients without one are keyed by IP
+            api_keys: API keys that identify a client; any other key is ignored
+            max_clients: Buckets kept at most; the least recently used go first
+            max_replays: Responses kept for replaying to limited clients
+        """
+        self.limits = dict(limits or {})
+        self.key_header = key_header
+        self.api_keys = frozenset(api_keys or ())
+        self.max_clients = max_clients
+        self.max_replays = max_replays
+        self._buckets: 'OrderedDict[tuple, _Bucket]' = OrderedDict()
+        self._replays: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def init_app(self, app: Flask):
+        """
+        Register the request hooks and expose the limiter as app.extensions['rate_limiter'].
+
+        Call after the asset pipeline's init_app so responses are stored before
+        they are compressed for one particular client.
+        """
+        app.before_request(self._check)
+        app.after_request(self._remember)
+        app.extensions['rate_limiter'] = self
+
+    def client_key(self) -> str:
+        """The current request's client: its API key if it sent a known one, else its IP."""
+        api_key = request.headers.get(self.key_header) if self.key_header else None
+        return f'key:{api_key}' if api_key in self.api_keys else f'ip:{request.remote_addr}'
+
+    def take(self, route: str, client: str, now: Optional[float] = None) -> float:
+        """
+        Spend one token of the client's bucket for route.
+
+        Returns:
+            0 if the request is allowed, else the seconds until a token is available.
+        """
+        rate, burst = self.limits[route]
+        now = time.monotonic() if now is None else now
+        key = (route, client)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(burst, now)
+            else:
+                bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+                self._buckets.move_to_end(key)
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - bucket.tokens) / rate
+            bucket.full_at = now + (burst - bucket.tokens) / rate
+            self._evict(now)
+        return wait
+
+    def _evict(self, now: float):
+        # A refilled bucket behaves like a new one, so dropping it changes nothing
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket.full_at > now and len(self._buckets) <= self.max_clients:
+                break
+            del self._buckets[key]
+            self.evicted += 1
+
+    def _check(self):
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        if rule not in self.limits or request.method != 'GET':
+            return None
+
+        wait = self.take(rule, self.client_key())
+        if not wait:
+            with self._lock:
+                self.allowed += 1
+            g.rate_limit_rule = rule
+            return None
+
+        retry_after = str(max(1, math.ceil(wait)))
+        with self._lock:
+            replay = self._replays.get(request.full_path)
+            if replay is not None:
+                self._replays.move_to_end(request.full_path)
+                self.replayed += 1
+            else:
+                self.rejected += 1
+        if replay is not None:
+            body, content_type, headers = replay
+            response = current_app.response_class(body, content_type=content_type, headers=headers)
+            response.headers['X-Rate-Limited'] = 'replay'
+        else:
+            response = jsonify({'error': 'Rate limit exceeded', 'retry_after': int(retry_after)})
+            response.status_code = 429
+        response.headers['Retry-After'] = retry_after
+        return response
+
+    def _remember(self, response):
+        if not g.pop('rate_limit_rule', None) or response.status_code != 200 or response.direct_passthrough:
+            return response
+        if response.headers.get('X-Partial-Response'):
+            return response
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name not in ('Content-Length', 'Content-Type', 'Content-Encoding', 'Vary', 'ETag')]
+        with self._lock:
+            self._replays[request.full_path] = (response.get_data(), response.content_type, headers)
+            self._replays.move_to_end(request.full_path)
+            while len(self._replays) > self.max_replays:
+                self._replays.popitem(last=False)
+        return response
+
+    def stats(self) -> dict:
+        """Limits and counters, for debugging (client keys are not included)."""
+        with self._lock:
+            return {
+                'limits': {route: {'rate': rate, 'burst': burst} for route, (rate, burst) in self.limits.items()},
+                'clients': len(self._buckets),
+                'stored_responses': len(self._replays),
+                'allowed': self.allowed,
+                'replayed': self.replayed,
+                'rejected': self.rejected,
+                'evicted': self.evicted
+            }
@@ -1,8 +1,18 @@
 """
 Flask routes for the F1 News Dashboard application.
 """
-from flask import render_template, jsonify
+from flask import render_template, jsonify, request, send_file
+from .models import NewsItem
+from .cache import ServiceCache
+from .deadline import DeadlineExceeded
+from .parse_pool import ParsePool
+from .profiling import phase
+from .schedule import FeedSchedule
 from .services import F1DataService
+from .thumbnails import ThumbnailCache, ThumbnailError
+
+# Thumbnail URLs never change content (the key is the source URL and size)
+THUMBNAIL_MAX_AGE = 365 * 24 * 3600
 
 
 def create_routes(app):
@@ -12,33 +22,168 @@ def create_routes(app):
     drivers_url = app.config.get('DRIVERS_URL')
     constructors_url = app.config.get('CONSTRUCTORS_URL')
     timeout = app.config.get('REQUEST_TIMEOUT', 10)
+    summary_length = app.config.get('SUMMARY_MAX_LENGTH', 280)
+    thumbnail_dir = app.config.get('THUMBNAIL_CACHE_DIR')
+    thumbnail_width, thumbnail_height = app.config.get('THUMBNAIL_SIZE', (320, 180))
 
     f1_service = F1DataService(
         news_urls=news_urls,
         drivers_url=drivers_url,
         constructors_url=constructors_url,
-        timeout=timeout
+        timeout=timeout,
+        summary_length=summary_length,
+        feed_parser=app.config.get('FEED_PARSER'),
+        cache=ServiceCache(
+            stale_on_error=app.config.get('CACHE_STALE_ON_ERROR', True),
+            error_ttl=app.config.get('CACHE_ERROR_TTL', 30)
+        ),
+        cache_settings=app.config,
+        schedule=FeedSchedule(
+            min_interval=app.config.get('FEED_POLL_MIN_INTERVAL', 60),
+            max_interval=app.config.get('FEED_POLL_MAX_INTERVAL', 1800)
+        ),
+        parse_pool=ParsePool(
+            workers=app.config.get('PARSE_WORKERS', 0),
+            inline_threshold=app.config.get('PARSE_INLINE_THRESHOLD', 128 * 1024),
+            max_pending=app.config.get('PARSE_MAX_PENDING', 8)
+        ),
+        thumbnails=ThumbnailCache(
+            thumbnail_dir,
+            width=thumbnail_width,
+            height=thumbnail_height,
+            max_bytes=app.config.get('THUMBNAIL_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+            max_source_bytes=app.config.get('THUMBNAIL_MAX_SOURCE_BYTES', 8 * 1024 * 1024),
+            timeout=timeout
+        ) if thumbnail_dir else None
     )
+    app.extensions['f1_service'] = f1_service
+
+    # Versions of the news list for /api/news?since_version= delta sync; the service
+    # advances it whenever news is refetched, the routes only read it
+    news_store = f1_service.news_store
+
+    def dashboard_payload():
+        """JSON-ready dashboard snapshot shared by the index page and /api/dashboard."""
+        snapshot = f1_service.get_dashboard()
+        with phase('serialize'):
+            news = [item.to_dict() for item in snapshot['news']]
+            return {
+                'news': news,
+                'news_version': snapshot['news_version'],
+                'driver_standings': [driver.to_dict() for driver in snapshot['driver_standings']],
+                'constructor_standings': [constructor.to_dict() for constructor in snapshot['constructor_standings']],
+                'generated': snapshot['generated']
+            }
 
     @app.route('/')
     def index():
-        """Render the main dashboard page."""
-        return render_template('index.html')
+        """Render the main dashboard page with the data for the first paint embedded (or a snapshot URL)."""
+        snapshot_base = app.config.get('SNAPSHOT_BASE_URL')
+        if snapshot_base:
+            # The page reads published static snapshots; nothing to fetch here
+            return render_template('index.html', dashboard=None, snapshot_base=snapshot_base)
+        return render_template('index.html', dashboard=dashboard_payload())
+
+    @app.route('/api/dashboard')
+    def api_dashboard():
+        """API endpoint returning news and both standings tables in one response."""
+        payload = dashboard_payload()
+        with phase('serialize'):
+            return jsonify(payload)
 
     @app.route('/api/news')
     def api_news():
-        """API endpoint for F1 news."""
-        news = f1_service.get_f1_news()
-        return jsonify([item.to_dict() for item in news])
+        """
+        API endpoint for F1 news.
+
+        Supports ?fields=title,link,published,source to return only the
+        listed fields of each item, and ?since_version=N to return only the
+        changes since version N (see NewsStore.changes_since). The current
+        version is sent in the X-News-Version header.
+        """
+        try:
+            fields = NewsItem.parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'allowed': list(NewsItem.FIELDS)}), 400
+        since_version = request.args.get('since_version')
+        if since_version is not None and not since_version.isdigit():
+            return jsonify({'error': 'since_version must be a non-negative integer'}), 400
+
+        items = f1_service.get_f1_news()
+        with phase('serialize'):
+            if since_version is None:
+                news = [item.to_dict() for item in items]
+                version = news_store.version_of(news)
+                response = jsonify([{name: item[name] for name in fields} for item in news] if fields else news)
+            else:
+                # The store holds the freshest list; the delta and its version both come from it
+                delta = news_store.changes_since(int(since_version), fields)
+                version = delta['version']
+                response = jsonify(delta)
+        if version is not None:
+            response.headers['X-News-Version'] = str(version)
+        return response
 
     @app.route('/api/driver-standings')
     def api_driver_standings():
         """API endpoint for driver standings."""
         standings = f1_service.get_driver_standings()
-        return jsonify([driver.to_dict() for driver in standings])
+        with phase('serialize'):
+            return jsonify([driver.to_dict() for driver in standings])
 
     @app.route('/api/constructor-standings')
     def api_constructor_standings():
         """API endpoint for constructor standings."""
         standings = f1_service.get_constructor_standings()
-        return jsonify([constructor.to_dict() for constructor in standings])
+        with phase('serialize'):
+            return jsonify([constructor.to_dict() for constructor in standings])
+
+    @app.route('/thumbnail')
+    def thumbnail():
+        """A news image resized to the card size; fetched once, then served from the disk cache."""
+        if f1_service.thumbnails is None:
+            return jsonify({'error': 'Thumbnails are disabled'}), 404
+        try:
+            image = f1_service.thumbnails.get(request.args.get('src', ''))
+        except ThumbnailError as e:
+            return jsonify({'error': str(e)}), 502
+        except DeadlineExceeded:
+            return jsonify({'error': 'Image fetch did not finish in time'}), 504
+        if image is None:
+            # Only images from the news feeds are proxied
+            return jsonify({'error': 'Unknown image'}), 404
+        response = send_file(image.path, mimetype=image.mimetype, conditional=True, max_age=THUMBNAIL_MAX_AGE)
+        response.headers['Cache-Control'] = f'public, max-age={THUMBNAIL_MAX_AGE}, immutable'
+        return response
+
+    @app.route('/debug/feeds')
+    def debug_feeds():
+        """Learned polling interval and next poll time of every news feed."""
+        return jsonify(f1_service.schedule.snapshot())
+
+    @app.route('/debug/upstream')
+    def debug_upstream():
+        """Request deadline and in-flight/queued/shed counters of upstream fetches."""
+        return jsonify(app.extensions['request_budget'].stats())
+
+    @app.route('/debug/ratelimit')
+    def debug_ratelimit():
+        """Rate limits, tracked clients and allowed/replayed/rejected counters."""
+        return jsonify(app.extensions['rate_limiter'].stats())
+
+    @app.route('/debug/scraper')
+    def debug_scraper():
+        """Selectors learned per standings page fingerprint, with probe/hit counters."""
+        return jsonify(f1_service.scraper.cache.stats())
+
+    @app.route('/debug/parse')
+    def debug_parse():
+        """Parse pool settings and how many parse jobs ran inline vs in worker processes."""
+        return jsonify(f1_service.parse_pool.stats())
+
+    @app.route('/debug/thumbnails')
+    def debug_thumbnails():
+        """Thumbnail cache size and hit/fetch/coalesced/failure counters."""
+        if f1_service.thumbnails is None:
+            return jsonify({'enabled': False})
+        return jsonify(f1_service.thumbnails.stats())
@@ -0,0 +1,137 @@
+"""
+Adaptive per-feed polling schedule.
+
+Each feed's publication rate is learned from the publication times of the
+items it has returned. A feed is polled at half its mean gap between posts;
+feeds that have gone quiet, return nothing new or fail are backed off. All
+intervals stay within the configured minimum and maximum.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+HISTORY_SIZE = 20      # Publication times remembered per feed
+POLL_FRACTION = 0.5    # Poll every half publication gap
+BACKOFF_FACTOR = 1.5   # Interval growth after a poll with nothing new
+
+
+@dataclass
+class FeedState:
+    """Polling state of one feed."""
+    interval: float
+    next_poll: float = 0.0  # 0 means never polled, so due immediately
+    last_poll: Optional[float] = None
+    last_new_item: Optional[float] = None
+    polls: int = 0
+    failures: int = 0
+    published: List[float] = field(default_factory=list)  # Newest first
+
+    @property
+    def mean_gap(self) -> Optional[float]:
+        """Mean seconds between the remembered publication times."""
+        if len(self.published) < 2:
+            return None
+        return (self.published[0] - self.published[-1]) / (len(self.published) - 1)
+
+    def to_dict(self, now: float) -> dict:
+        """Convert to dictionary for the debug endpoint."""
+        mean_gap = self.mean_gap
+        return {
+            'interval': round(self.interval, 1),
+            'next_poll': datetime_iso(self.next_poll),
+            'next_poll_in': round(max(0.0, self.next_poll - now), 1),
+            'last_poll': datetime_iso(self.last_poll),
+            'last_new_item': datetime_iso(self.last_new_item),
+            'mean_gap': round(mean_gap, 1) if mean_gap is not None else None,
+            'polls': self.polls,
+            'failures': self.failures
+        }
+
+
+def datetime_iso(timestamp: Optional[float]) -> Optional[str]:
+    """Format an epoch timestamp as ISO 8601 UTC, or None."""
+    if not timestamp:
+        return None
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(timestamp))
+
+
+class FeedSchedule:
+    """Decides when each feed is polled next."""
+
+    def __init__(self, min_interval: float = 60, max_interval: float = 1800,
+                 initial_interval: float = 300):
+        """
+        Args:
+            min_interval: Shortest allowed polling interval in seconds
+            max_interval: Longest allowed polling interval in seconds
+            initial_interval: Interval used until a feed's rate is known
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self._feeds: Dict[str, FeedState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, url: str) -> FeedState:
+        state = self._feeds.get(url)
+        if state is None:
+            state = self._feeds[url] = FeedState(interval=self._clamp(self.initial_interval))
+        return state
+
+    def _clamp(self, seconds: float) -> float:
+        return max(self.min_interval, min(self.max_interval, seconds))
+
+    def is_due(self, url: str, now: Optional[float] = None) -> bool:
+        """Whether the feed should be polled now."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return now >= self._state(url).next_poll
+
+    def record_poll(self, url: str, published: Iterable[float], now: Optional[float] = None):
+        """
+        Update a feed's interval after a successful poll.
+
+        Args:
+            url: Feed URL
+            published: Publication timestamps of the returned items (0 = unknown)
+            now: Poll time (default: current time)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(url)
+            state.polls += 1
+            state.last_poll = now
+            known = set(state.published)
+            new_items = {ts for ts in published if ts and ts not in known}
+            if new_items:
+                state.published = sorted(known | new_items, reverse=True)[:HISTORY_SIZE]
+                state.last_new_item = now
+
+            if state.mean_gap is None:
+                expected_gap = self.initial_interval / POLL_FRACTION
+            else:
+                # A feed that has been quiet for longer than usual likely stays quiet
+                expected_gap = max(state.mean_gap, now - state.published[0])
+            interval = self._clamp(expected_gap * POLL_FRACTION)
+            if not new_items:
+                interval = self._clamp(max(interval, state.interval * BACKOFF_FACTOR))
+            state.interval = interval
+            state.next_poll = now + interval
+
+    def record_failure(self, url: str, now: Optional[float] = None):
+        """Back off a feed whose poll failed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(url)
+            state.polls += 1
+            state.failures += 1
+            state.last_poll = now
+            state.interval = self._clamp(state.interval * BACKOFF_FACTOR)
+            state.next_poll = now + state.interval
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, dict]:
+        """Per-feed schedule, for debugging."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {url: state.to_dict(now) for url, state in self._feeds.items()}
@@ -0,0 +1,274 @@
+"""
+Standings page scraping with learned selector strategies.
+
+A PageLayout lists, in order of preference, the selectors that may match
+the standings rows of a page and each field inside a row. Scraping always
+walks each cascade in that order and takes the first match, exactly like a
+hand-written `find() or find() or ...` chain. The first time a page
+structure is seen, the scraper records which selectors cannot match
+anything on it (no tag of that name, class or data attribute exists) under
+the page's structural fingerprint; later pages with the same fingerprint
+skip those selectors and nothing else, so the rows are always the ones the
+full cascade returns. A new fingerprint (the site changed its markup) is
+learned again. Fingerprinting walks the whole page, so it is only done when
+the first row selector finds nothing: a page on the preferred layout has no
+earlier selectors to skip and is scraped with the plain cascade.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+# A selector is a BeautifulSoup (name, attrs) pair, e.g. ('div', {'class': 'driver-card'})
+Selector = Tuple[str, dict]
+Row = Dict[str, Optional[str]]
+# A tag's structural signature: (name, classes, data-* attribute names)
+Signature = Tuple[str, FrozenSet[str], FrozenSet[str]]
+
+
+@dataclass(frozen=True)
+class PageLayout:
+    """Candidate selectors for the rows of one kind of page and the fields in each row."""
+    name: str
+    containers: Tuple[Selector, ...]
+    fields: Dict[str, Tuple[Selector, ...]]
+    limit: int = 10
+
+
+@dataclass
+class Strategy:
+    """Selectors that never match on one page structure (indexes into the layout's cascades)."""
+    containers: FrozenSet[int]
+    fields: Dict[str, FrozenSet[int]]
+    uses: int = 0
+
+
+DRIVER_LAYOUT = PageLayout(
+    name='drivers',
+    containers=(
+        ('div', {'class': 'driver-card'}),
+        ('div', {'class': 'listing-item--driver'}),
+        ('tr', {'class': 'driver'}),
+        ('div', {'data-driver': True}),
+        ('article', {'class': 'driver'}),
+    ),
+    fields={
+        'name': (
+            ('h3', {}),
+            ('a', {'class': 'driver-name'}),
+            ('span', {'class': 'name'}),
+            ('strong', {}),
+            ('h2', {}),
+        ),
+        'team': (
+            ('p', {'class': 'team'}),
+            ('span', {'class': 'team-name'}),
+            ('div', {'class': 'constructor'}),
+            ('span', {'class': 'constructor'}),
+        ),
+        'points': (
+            ('span', {'class': 'points'}),
+            ('div', {'class': 'points'}),
+            ('td', {'class': 'points'}),
+        ),
+        'nationality': (
+            ('span', {'class': 'nationality'}),
+        ),
+    }
+)
+
+CONSTRUCTOR_LAYOUT = PageLayout(
+    name='constructors',
+    containers=(
+        ('div', {'class': 'team-card'}),
+        ('div', {'class': 'listing-item--team'}),
+        ('tr', {'class': 'team'}),
+        ('div', {'data-team': True}),
+        ('article', {'class': 'team'}),
+    ),
+    fields={
+        'name': (
+            ('h3', {}),
+            ('a', {'class': 'team-name'}),
+            ('span', {'class': 'name'}),
+            ('strong', {}),
+            ('h2', {}),
+        ),
+        'points': (
+            ('span', {'class': 'points'}),
+            ('div', {'class': 'points'}),
+            ('td', {'class': 'points'}),
+        ),
+        'nationality': (
+            ('span', {'class': 'nationality'}),
+            ('span', {'class': 'country'}),
+        ),
+    }
+)
+
+
+def page_structure(soup) -> Tuple[str, Set[Signature]]:
+    """
+    A page's structural fingerprint and the tag signatures it is hashed from.
+
+    Text, ordering and the number of repeated rows do not change either, so
+    pages of the same template share a fingerprint across refreshes.
+    """
+    signatures = set()
+    for tag in soup.find_all(True):
+        signatures.add((tag.name, frozenset(tag.get('class', [])),
+                        frozenset(name for name in tag.attrs if name.startswith('data-'))))
+    text = '\n'.join(sorted(f"{name}.{'.'.join(sorted(classes))}[{','.join(sorted(data_attrs))}]"
+                            for name, classes, data_attrs in signatures))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest(), signatures
+
+
+def can_match(selector: Selector, signatures: Set[Signature]) -> bool:
+    """
+    Whether selector may match some tag of a page with these signatures.
+
+    Only class and data-* presence tests are decided from the signatures;
+    any other attribute filter counts as a possible match.
+    """
+    name, attrs = selector
+    for tag_name, classes, data_attrs in signatures:
+        if tag_name != name:
+            continue
+        for key, value in attrs.items():
+            if key == 'class' and isinstance(value, str) and ' ' not in value:
+                if value not in classes:
+                    break
+            elif key.startswith('data-') and value is True:
+                if key not in data_attrs:
+                    break
+        else:
+            return True
+    return False
+
+
+def _text(element) -> Optional[str]:
+    return element.text.strip() if element is not None else None
+
+
+class SelectorCache:
+    """Bounded map of (layout, fingerprint) to the Strategy learned for it."""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.probes = 0
+        self.hits = 0
+        self._entries: "OrderedDict[Tuple[str, str], Strategy]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, layout: str, fingerprint: str) -> Optional[Strategy]:
+        with self._lock:
+            strategy = self._entries.get((layout, fingerprint))
+            if strategy is not None:
+                self._entries.move_to_end((layout, fingerprint))
+                strategy.uses += 1
+                self.hits += 1
+            return strategy
+
+    def put(self, layout: str, fingerprint: str, strategy: Strategy):
+        with self._lock:
+            self.probes += 1
+            self._entries[(layout, fingerprint)] = strategy
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Probe/hit counters and the learned strategies, for debugging."""
+        with self._lock:
+            return {
+                'probes': self.probes,
+                'hits': self.hits,
+                'strategies': {
+                    f'{layout}:{fingerprint}': {
+                        'skipped_containers': sorted(s.containers),
+                        'skipped_fields': {name: sorted(skipped) for name, skipped in s.fields.items()},
+                        'uses': s.uses
+                    }
+                    for (layout, fingerprint), s in self._entries.items()
+                }
+            }
+
+
+class StandingsScraper:
+    """Extracts standings rows, remembering which selectors work per page structure."""
+
+    def __init__(self, cache: Optional[SelectorCache] = None, learn: bool = True):
+        """
+        Args:
+            cache: Strategy store (a private one by default)
+            learn: If False, probe every cascade on every page (no fingerprinting)
+        """
+        self.cache = cache or SelectorCache()
+        self.learn = learn
+
+    def scrape(self, soup, layout: PageLayout) -> Optional[List[Row]]:
+        """
+        Extract up to layout.limit rows from a parsed page.
+
+        Returns:
+            A dict of field texts (None where missing) per row, or None if the
+            page has no row containers at all.
+        """
+        if not self.learn:
+            return self._extract(soup, layout, None)
+
+        name, attrs = layout.containers[0]
+        containers = soup.find_all(name, attrs)
+        if containers:
+            # Preferred layout: the fingerprint would cost a page walk to save nothing
+            return self._rows(containers, layout, None)
+
+        fingerprint, signatures = page_structure(soup)
+        strategy = self.cache.get(layout.name, fingerprint)
+        if strategy is None:
+            strategy = self._learn(layout, signatures)
+            self.cache.put(layout.name, fingerprint, strategy)
+        return self._extract(soup, layout, strategy, start=1)
+
+    @staticmethod
+    def _learn(layout: PageLayout, signatures: Set[Signature]) -> Strategy:
+        """Note the selectors of each cascade that nothing on this structure can match."""
+        def never(selectors):
+            return frozenset(i for i, selector in enumerate(selectors) if not can_match(selector, signatures))
+
+        return Strategy(
+            containers=never(layout.containers),
+            fields={field_name: never(selectors) for field_name, selectors in layout.fields.items()}
+        )
+
+    @classmethod
+    def _extract(cls, soup, layout: PageLayout, strategy: Optional[Strategy],
+                 start: int = 0) -> Optional[List[Row]]:
+        """Walk every cascade in order from container selector start, skipping the selectors strategy rules out."""
+        skipped = strategy.containers if strategy else frozenset()
+        for index, (name, attrs) in enumerate(layout.containers):
+            if index < start or index in skipped:
+                continue
+            containers = soup.find_all(name, attrs)
+            if containers:
+                return cls._rows(containers, layout, strategy)
+        return None
+
+    @staticmethod
+    def _rows(containers: list, layout: PageLayout, strategy: Optional[Strategy]) -> List[Row]:
+        """Fields of the first layout.limit containers, each cascade walked in order."""
+        rows = []
+        for container in containers[:layout.limit]:
+            row = {}
+            for field_name, selectors in layout.fields.items():
+                skipped = strategy.fields[field_name] if strategy else frozenset()
+                row[field_name] = None
+                for index, (name, attrs) in enumerate(selectors):
+                    if index in skipped:
+                        continue
+                    element = container.find(name, attrs)
+                    if element is not None:
+                        row[field_name] = _text(element)
+                        break
+            rows.append(row)
+        return rows
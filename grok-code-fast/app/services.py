@@ -2,17 +2,37 @@
 Service layer for F1 data operations.
 Handles fetching and processing F1 news and standings data.
 """
-import requests
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
-from typing import List, Optional
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+from .cache import ServiceCache, UpstreamError, cached
+from .deadline import DeadlineExceeded, upstream_get
 from .models import NewsItem, Driver, Constructor
+from .news_store import NewsStore
+from .lazy import LazyModule
+from .parse_pool import ParsePool, parse_feed, scrape_standings
+from .parsers import FeedParseError, get_parser
+from .profiling import phase
+from .schedule import FeedSchedule
+from .scraper import CONSTRUCTOR_LAYOUT, DRIVER_LAYOUT, StandingsScraper
+from .thumbnails import ThumbnailCache
+
+requests = LazyModule('requests')  # Imported by the first fetch or the prewarm (see app.lazy)
 
 
 class F1DataService:
     """Service class for fetching and processing F1 data."""
 
-    def __init__(self, news_urls=None, drivers_url=None, constructors_url=None, timeout=10):
+    # Searched for in the page text when a standings page has no recognizable rows
+    DRIVER_NAMES = ('VERSTAPPEN', 'HAMILTON', 'LECLERC', 'SAINZ', 'RUSSELL', 'PEREZ', 'ALONSO', 'STROLL', 'NORRIS', 'PIASTRI')
+    TEAM_NAMES = ('MERCEDES', 'RED BULL', 'FERRARI', 'MCLAREN', 'ASTON MARTIN', 'ALPINE', 'WILLIAMS', 'SAUBER', 'HAAS', 'RACING BULLS')
+
+    def __init__(self, news_urls=None, drivers_url=None, constructors_url=None, timeout=10,
+                 summary_length=280, feed_parser=None, cache=None, cache_settings=None,
+                 schedule=None, max_workers=4, scraper=None, parse_pool=None,
+                 thumbnails=None, news_store=None):
         # Multiple news sources for better coverage
         self.news_urls = news_urls or [
             'https://feeds.bbci.co.uk/sport/formula1/rss.xml',
@@ -24,145 +44,170 @@ class F1DataService:
         self.drivers_url = drivers_url or 'https://www.formula1.com/en/drivers.html'
         self.constructors_url = constructors_url or 'https://www.formula1.com/en/teams.html'
         self.timeout = timeout
-
+        self.summary_length = summary_length
+        # Feed parser backend: 'etree', 'lxml' or 'feedparser' (see app.parsers)
+        self.parser = get_parser(feed_parser)
+        # Memoization for the @cached methods; TTLs are looked up in cache_settings
+        self.cache: Optional[ServiceCache] = cache
+        self.cache_settings = cache_settings or {}
+        # Each feed is polled on its own learned interval; between polls its last items are reused
+        self.schedule = schedule or FeedSchedule()
+        self._feed_items: Dict[str, List[NewsItem]] = {}
+        self.max_workers = max_workers
+        # Remembers which standings selectors work for each page structure
+        self.scraper = scraper or StandingsScraper()
+        # Large feeds/pages can be parsed in worker processes (see app.parse_pool)
+        self.parse_pool = parse_pool or ParsePool()
+        # Versions of the news list for delta sync; advanced only when news is actually fetched
+        self.news_store = news_store or NewsStore()
+        # Feed images are served resized through /thumbnail (see app.thumbnails)
+        self.thumbnails: Optional[ThumbnailCache] = thumbnails
+
+    @cached('news', ttl_setting='NEWS_CACHE_TTL', fallback='_sample_news')
     def get_f1_news(self) -> List[NewsItem]:
         """
         Fetch F1 news from multiple RSS feeds for better coverage.
 
+        Raises:
+            UpstreamError: If no source returned any news (the cache layer then
+                serves the last good result or the sample news).
+
         Returns:
             List of NewsItem objects containing the latest F1 news from multiple sources.
         """
         all_news_items = []
 
+        # Feeds that are not due yet contribute the items of their last poll
+        due_urls = [url for url in self.news_urls if self.schedule.is_due(url)]
+        if len(due_urls) > 1:
+            # Poll due feeds side by side so one slow feed cannot use up the request budget
+            # (each task runs in a copy of this context so the request deadline applies there too)
+            with ThreadPoolExecutor(max_workers=min(len(due_urls), self.max_workers)) as pool:
+                futures = {url: pool.submit(contextvars.copy_context().run, self._poll_feed, url) for url in due_urls}
+            polled = {url: future.result() for url, future in futures.items()}
+        else:
+            polled = {url: self._poll_feed(url) for url in due_urls}
+
         for news_url in self.news_urls:
-            try:
-                # Add headers to avoid 403 errors
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Accept': 'application/rss+xml, application/xml, text/xml',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                }
-
-                # Special handling for ESPN (try different approaches)
-                if 'espn.com' in news_url:
-                    # Try without headers first
-                    try:
-                        response = requests.get(news_url, timeout=self.timeout)
-                    except requests.HTTPError:
-                        # If that fails, try with headers
-                        response = requests.get(news_url, timeout=self.timeout, headers=headers)
-                else:
-                    response = requests.get(news_url, timeout=self.timeout, headers=headers)
-
-                response.raise_for_status()
-
-                # Try to parse as RSS/XML first
-                try:
-                    root = ET.fromstring(response.content)
-                    source_domain = news_url.split('/')[2]  # Extract domain name
-                    for item in root.findall('.//item')[:5]:  # Get top 5 from each source
-                        news_item = NewsItem.from_xml(item, source_domain)
-                        all_news_items.append(news_item)
-                except ET.ParseError:
-                    # If XML parsing fails, try as regular HTML or skip
-                    print(f"Skipping {news_url} - not a valid RSS feed")
-                    continue
-
-            except requests.HTTPError as e:
-                if e.response.status_code == 403:
-                    print(f"Access forbidden for {news_url} - may require different headers or authentication")
-                elif e.response.status_code == 404:
-                    print(f"RSS feed not found at {news_url} - URL may have changed")
-                else:
-                    print(f"HTTP error fetching news from {news_url}: {e}")
-                continue
-            except requests.RequestException as e:
-                print(f"Network error fetching news from {news_url}: {e}")
-                continue
-            except Exception as e:
-                print(f"Error parsing news from {news_url}: {e}")
-                continue
+            if news_url in polled:
+                all_news_items.extend(polled[news_url])
+            else:
+                all_news_items.extend(self._feed_items.get(news_url, []))
 
         # Sort by publication date (most recent first) and return top 15
-        all_news_items.sort(key=lambda x: x.published, reverse=True)
+        with phase('dedupe'):
+            all_news_items.sort(key=lambda x: x.published, reverse=True)
 
-        # If no news items found, return sample data
+        # No source produced anything: let the cache serve stale data or the samples
         if not all_news_items:
-            print("No news items retrieved from any source, using fallback data")
-            sample_news = [
-                {
-                    "title": "F1 2025 Season Preview: Verstappen vs Hamilton Battle Expected",
-                    "link": "https://www.formula1.com/en/latest/article/f1-2025-season-preview.123456.html",
-                    "summary": "The 2025 Formula 1 season promises to be one of the most competitive in recent years with Max Verstappen defending his title against Lewis Hamilton's comeback.",
-                    "published": "2025-08-27T10:00:00Z",
-                    "source": "Formula1.com"
-                },
-                {
-                    "title": "Ferrari Unveils 2025 Car with Major Aero Updates",
-                    "link": "https://www.scuderiaferrari.com/en/news/2025-car-unveiling/",
-                    "summary": "Ferrari has revealed their 2025 challenger with significant aerodynamic improvements aimed at closing the gap to Red Bull Racing.",
-                    "published": "2025-08-26T15:30:00Z",
-                    "source": "Scuderia Ferrari"
-                },
-                {
-                    "title": "McLaren Confirms Norris-Piastri Lineup for 2025",
-                    "link": "https://www.mclaren.com/racing/2025-lineup-confirmed/",
-                    "summary": "McLaren Racing has confirmed that Lando Norris and Oscar Piastri will continue as teammates for the 2025 Formula 1 season.",
-                    "published": "2025-08-25T12:00:00Z",
-                    "source": "McLaren"
-                }
-            ]
-
-            for news_data in sample_news:
-                all_news_items.append(NewsItem(
-                    title=news_data["title"],
-                    link=news_data["link"],
-                    summary=news_data["summary"],
-                    published=news_data["published"],
-                    source=news_data["source"]
-                ))
-
-        return all_news_items[:15]
+            raise UpstreamError("No news items retrieved from any source")
+
+        news_items = all_news_items[:15]
+        self.news_store.update([item.to_dict() for item in news_items])
+        return news_items
+
+    def _poll_feed(self, news_url: str) -> List[NewsItem]:
+        """
+        Fetch and parse one feed and record the poll in the schedule.
+
+        Returns:
+            The feed's items, or the items of its last successful poll if
+            this one failed or did not fit in the request deadline.
+        """
+        try:
+            # Add headers to avoid 403 errors
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                'Accept': 'application/rss+xml, application/xml, text/xml',
+                'Accept-Language': 'en-US,en;q=0.9',
+            }
+
+            # Special handling for ESPN (try different approaches)
+            if 'espn.com' in news_url:
+                # Try without headers first
+                try:
+                    response = upstream_get(news_url, timeout=self.timeout)
+                except requests.HTTPError:
+                    # If that fails, try with headers
+                    response = upstream_get(news_url, timeout=self.timeout, headers=headers)
+            else:
+                response = upstream_get(news_url, timeout=self.timeout, headers=headers)
+
+            response.raise_for_status()
+
+            # Parse the fetched bytes with the configured backend
+            try:
+                with phase('parse'):
+                    source_domain = news_url.split('/')[2]  # Extract domain name
+                    # Top 5 items from each source, plus every entry's date for the schedule
+                    records, published = self.parse_pool.run(
+                        parse_feed, response.content, self.parser, source_domain, self.summary_length, 5
+                    )
+                    feed_items = [NewsItem(*record) for record in records]
+            except FeedParseError:
+                # If feed parsing fails, skip this source
+                print(f"Skipping {news_url} - not a valid RSS feed")
+                return self._feed_failed(news_url)
+
+            # Learn the feed's publication rate from every entry, not just the top 5
+            self.schedule.record_poll(news_url, published)
+            self._feed_items[news_url] = feed_items
+            if self.thumbnails is not None:
+                self.thumbnails.allow(item.image for item in feed_items if item.image)
+            return feed_items
+
+        except DeadlineExceeded:
+            # Out of time or shed: the feed stays due and keeps its last items
+            return self._feed_items.get(news_url, [])
+        except requests.HTTPError as e:
+            if e.response.status_code == 403:
+                print(f"Access forbidden for {news_url} - may require different headers or authentication")
+            elif e.response.status_code == 404:
+                print(f"RSS feed not found at {news_url} - URL may have changed")
+            else:
+                print(f"HTTP error fetching news from {news_url}: {e}")
+            return self._feed_failed(news_url)
+        except requests.RequestException as e:
+            print(f"Network error fetching news from {news_url}: {e}")
+            return self._feed_failed(news_url)
+        except Exception as e:
+            print(f"Error parsing news from {news_url}: {e}")
+            return self._feed_failed(news_url)
+
+    def _feed_failed(self, news_url: str) -> List[NewsItem]:
+        """Back off a failing feed and return the items of its last successful poll."""
+        self.schedule.record_failure(news_url)
+        return self._feed_items.get(news_url, [])
 
+    @cached('driver_standings', ttl_setting='DRIVER_STANDINGS_CACHE_TTL', fallback='_sample_driver_standings')
     def get_driver_standings(self) -> List[Driver]:
         """
         Fetch F1 driver standings from official F1 website.
 
+        Raises:
+            UpstreamError: If the page could not be fetched or yielded no drivers.
+
         Returns:
             List of Driver objects containing current driver standings.
         """
         try:
-            response = requests.get(self.drivers_url, timeout=self.timeout, headers={
+            response = upstream_get(self.drivers_url, timeout=self.timeout, headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             })
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with phase('parse'):
+                # Rows via the selector cascades, minus those this page structure never matches (see app.scraper);
+                # big pages are parsed in a worker process when the parse pool is enabled
+                kind, rows = self.parse_pool.run(
+                    scrape_standings, response.content, DRIVER_LAYOUT.name, self.DRIVER_NAMES,
+                    inline=partial(scrape_standings, scraper=self.scraper)
+                )
             drivers = []
 
-            # Try multiple selectors for driver containers
-            driver_containers = (
-                soup.find_all('div', class_='driver-card') or
-                soup.find_all('div', class_='listing-item--driver') or
-                soup.find_all('tr', class_='driver') or
-                soup.find_all('div', {'data-driver': True}) or
-                soup.find_all('article', class_='driver')
-            )
-
-            # If no containers found, try to find driver names directly
-            if not driver_containers:
-                # Look for elements containing driver names
-                all_text_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'span', 'div', 'p'])
-                driver_names = []
-                for elem in all_text_elements:
-                    text = elem.get_text().strip()
-                    if any(name.upper() in text.upper() for name in ['VERSTAPPEN', 'HAMILTON', 'LECLERC', 'SAINZ', 'RUSSELL', 'PEREZ', 'ALONSO', 'STROLL', 'NORRIS', 'PIASTRI']):
-                        driver_names.append(elem)
-                        if len(driver_names) >= 10:
-                            break
-
-                for i, name_elem in enumerate(driver_names[:10], 1):
-                    name = name_elem.get_text().strip()
+            # If no containers found, use the elements that mention driver names
+            if kind == 'names':
+                for i, name in enumerate(rows, 1):
                     drivers.append(Driver(
                         position=str(i),
                         name=name,
@@ -172,34 +217,11 @@ class F1DataService:
                         wins='0'
                     ))
             else:
-                for i, container in enumerate(driver_containers[:10], 1):
-                    # Extract driver information with multiple fallback selectors
-                    name_elem = (
-                        container.find('h3') or
-                        container.find('a', class_='driver-name') or
-                        container.find('span', class_='name') or
-                        container.find('strong') or
-                        container.find('h2')
-                    )
-                    name = name_elem.text.strip() if name_elem else f'Driver {i}'
-
-                    team_elem = (
-                        container.find('p', class_='team') or
-                        container.find('span', class_='team-name') or
-                        container.find('div', class_='constructor') or
-                        container.find('span', class_='constructor')
-                    )
-                    team = team_elem.text.strip() if team_elem else 'Unknown Team'
-
-                    points_elem = (
-                        container.find('span', class_='points') or
-                        container.find('div', class_='points') or
-                        container.find('td', class_='points')
-                    )
-                    points = points_elem.text.strip() if points_elem else '0'
-
-                    nationality_elem = container.find('span', class_='nationality')
-                    nationality = nationality_elem.text.strip() if nationality_elem else 'Unknown'
+                for i, row in enumerate(rows, 1):
+                    name = row['name'] or f'Driver {i}'
+                    team = row['team'] or 'Unknown Team'
+                    points = row['points'] or '0'
+                    nationality = row['nationality'] or 'Unknown'
 
                     drivers.append(Driver(
                         position=str(i),
@@ -210,76 +232,50 @@ class F1DataService:
                         wins='0'  # Wins not easily available on drivers page
                     ))
 
-            # If no drivers found, return sample data
             if not drivers:
-                sample_drivers = [
-                    {"name": "Max Verstappen", "constructor": "Red Bull Racing", "nationality": "Netherlands", "points": "258"},
-                    {"name": "Lewis Hamilton", "constructor": "Mercedes", "nationality": "United Kingdom", "points": "187"},
-                    {"name": "Charles Leclerc", "constructor": "Ferrari", "nationality": "Monaco", "points": "138"},
-                    {"name": "Carlos Sainz", "constructor": "Ferrari", "nationality": "Spain", "points": "116"},
-                    {"name": "George Russell", "constructor": "Mercedes", "nationality": "United Kingdom", "points": "111"},
-                    {"name": "Sergio Perez", "constructor": "Red Bull Racing", "nationality": "Mexico", "points": "110"},
-                    {"name": "Fernando Alonso", "constructor": "Aston Martin", "nationality": "Spain", "points": "45"},
-                    {"name": "Lance Stroll", "constructor": "Aston Martin", "nationality": "Canada", "points": "24"}
-                ]
-
-                for i, driver_data in enumerate(sample_drivers[:10], 1):
-                    drivers.append(Driver(
-                        position=str(i),
-                        name=driver_data["name"],
-                        nationality=driver_data["nationality"],
-                        constructor=driver_data["constructor"],
-                        points=driver_data["points"],
-                        wins='0'
-                    ))
+                raise UpstreamError("No drivers found on standings page")
 
             return drivers
 
+        except DeadlineExceeded as e:
+            raise UpstreamError(f"No time left to fetch driver standings: {e}") from e
         except requests.RequestException as e:
             print(f"Error fetching driver standings: {e}")
-            return []
+            raise UpstreamError(f"Error fetching driver standings: {e}") from e
+        except UpstreamError:
+            raise
         except Exception as e:
             print(f"Error parsing driver standings: {e}")
-            return []
+            raise UpstreamError(f"Error parsing driver standings: {e}") from e
 
+    @cached('constructor_standings', ttl_setting='CONSTRUCTOR_STANDINGS_CACHE_TTL', fallback='_sample_constructor_standings')
     def get_constructor_standings(self) -> List[Constructor]:
         """
         Fetch F1 constructor standings from official F1 website.
 
+        Raises:
+            UpstreamError: If the page could not be fetched or yielded no constructors.
+
         Returns:
             List of Constructor objects containing current constructor standings.
         """
         try:
-            response = requests.get(self.constructors_url, timeout=self.timeout, headers={
+            response = upstream_get(self.constructors_url, timeout=self.timeout, headers={
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             })
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with phase('parse'):
+                # Rows via the selector cascades, minus those this page structure never matches (see app.scraper)
+                kind, rows = self.parse_pool.run(
+                    scrape_standings, response.content, CONSTRUCTOR_LAYOUT.name, self.TEAM_NAMES,
+                    inline=partial(scrape_standings, scraper=self.scraper)
+                )
             constructors = []
 
-            # Try multiple selectors for constructor containers
-            constructor_containers = (
-                soup.find_all('div', class_='team-card') or
-                soup.find_all('div', class_='listing-item--team') or
-                soup.find_all('tr', class_='team') or
-                soup.find_all('div', {'data-team': True}) or
-                soup.find_all('article', class_='team')
-            )
-
-            # If no containers found, try to find team names directly
-            if not constructor_containers:
-                team_names = []
-                all_text_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'span', 'div', 'p'])
-                for elem in all_text_elements:
-                    text = elem.get_text().strip()
-                    if any(team.upper() in text.upper() for team in ['MERCEDES', 'RED BULL', 'FERRARI', 'MCLAREN', 'ASTON MARTIN', 'ALPINE', 'WILLIAMS', 'SAUBER', 'HAAS', 'RACING BULLS']):
-                        team_names.append(elem)
-                        if len(team_names) >= 10:
-                            break
-
-                for i, name_elem in enumerate(team_names[:10], 1):
-                    name = name_elem.get_text().strip()
+            # If no containers found, use the elements that mention team names
+            if kind == 'names':
+                for i, name in enumerate(rows, 1):
                     constructors.append(Constructor(
                         position=str(i),
                         name=name,
@@ -288,29 +284,10 @@ class F1DataService:
                         wins='0'
                     ))
             else:
-                for i, container in enumerate(constructor_containers[:10], 1):
-                    # Extract constructor information with multiple fallback selectors
-                    name_elem = (
-                        container.find('h3') or
-                        container.find('a', class_='team-name') or
-                        container.find('span', class_='name') or
-                        container.find('strong') or
-                        container.find('h2')
-                    )
-                    name = name_elem.text.strip() if name_elem else f'Team {i}'
-
-                    points_elem = (
-                        container.find('span', class_='points') or
-                        container.find('div', class_='points') or
-                        container.find('td', class_='points')
-                    )
-                    points = points_elem.text.strip() if points_elem else '0'
-
-                    nationality_elem = (
-                        container.find('span', class_='nationality') or
-                        container.find('span', class_='country')
-                    )
-                    nationality = nationality_elem.text.strip() if nationality_elem else 'Unknown'
+                for i, row in enumerate(rows, 1):
+                    name = row['name'] or f'Team {i}'
+                    points = row['points'] or '0'
+                    nationality = row['nationality'] or 'Unknown'
 
                     constructors.append(Constructor(
                         position=str(i),
@@ -320,33 +297,135 @@ class F1DataService:
                         wins='0'  # Wins not easily available on teams page
                     ))
 
-            # If no constructors found, return sample data
             if not constructors:
-                sample_constructors = [
-                    {"name": "Red Bull Racing", "nationality": "Austria", "points": "368"},
-                    {"name": "Mercedes", "nationality": "Germany", "points": "298"},
-                    {"name": "Ferrari", "nationality": "Italy", "points": "254"},
-                    {"name": "McLaren", "nationality": "United Kingdom", "points": "212"},
-                    {"name": "Aston Martin", "nationality": "United Kingdom", "points": "69"},
-                    {"name": "Alpine", "nationality": "France", "points": "45"},
-                    {"name": "Williams", "nationality": "United Kingdom", "points": "11"},
-                    {"name": "Sauber", "nationality": "Switzerland", "points": "8"}
-                ]
-
-                for i, constructor_data in enumerate(sample_constructors[:10], 1):
-                    constructors.append(Constructor(
-                        position=str(i),
-                        name=constructor_data["name"],
-                        nationality=constructor_data["nationality"],
-                        points=constructor_data["points"],
-                        wins='0'
-                    ))
+                raise UpstreamError("No constructors found on standings page")
 
             return constructors
 
+        except DeadlineExceeded as e:
+            raise UpstreamError(f"No time left to fetch constructor standings: {e}") from e
         except requests.RequestException as e:
             print(f"Error fetching constructor standings: {e}")
-            return []
+            raise UpstreamError(f"Error fetching constructor standings: {e}") from e
+        except UpstreamError:
+            raise
         except Exception as e:
             print(f"Error parsing constructor standings: {e}")
-            return []
+            raise UpstreamError(f"Error parsing constructor standings: {e}") from e
+
+    @cached('dashboard', ttl_setting='DASHBOARD_CACHE_TTL')
+    def get_dashboard(self) -> Dict[str, Any]:
+        """
+        Snapshot of every dashboard section, taken at one point in time.
+
+        The snapshot itself is cached, so the index page and /api/dashboard
+        serve identical data until it expires, even if one section's own
+        cache entry is refreshed in between.
+
+        Returns:
+            Dict with 'news', 'driver_standings' and 'constructor_standings'
+            model lists, the 'news_version' describing the news list (None if
+            it is no longer in the store's history) and the 'generated' timestamp.
+        """
+        news = self.get_f1_news()
+        return {
+            'news': news,
+            # Read, not recorded: the news store only moves when get_f1_news() refetches
+            'news_version': self.news_store.version_of([item.to_dict() for item in news]),
+            'driver_standings': self.get_driver_standings(),
+            'constructor_standings': self.get_constructor_standings(),
+            'generated': time.time()
+        }
+
+    # Fallback data, used only when a source fails and there is no earlier good result
+
+    def _sample_news(self) -> List[NewsItem]:
+        """Sample news shown when no feed could be fetched."""
+        print("No news items retrieved from any source, using fallback data")
+        all_news_items = []
+        sample_news = [
+            {
+                "title": "F1 2025 Season Preview: Verstappen vs Hamilton Battle Expected",
+                "link": "https://www.formula1.com/en/latest/article/f1-2025-season-preview.123456.html",
+                "summary": "The 2025 Formula 1 season promises to be one of the most competitive in recent years with Max Verstappen defending his title against Lewis Hamilton's comeback.",
+                "published": "2025-08-27T10:00:00Z",
+                "source": "Formula1.com"
+            },
+            {
+                "title": "Ferrari Unveils 2025 Car with Major Aero Updates",
+                "link": "https://www.scuderiaferrari.com/en/news/2025-car-unveiling/",
+                "summary": "Ferrari has revealed their 2025 challenger with significant aerodynamic improvements aimed at closing the gap to Red Bull Racing.",
+                "published": "2025-08-26T15:30:00Z",
+                "source": "Scuderia Ferrari"
+            },
+            {
+                "title": "McLaren Confirms Norris-Piastri Lineup for 2025",
+                "link": "https://www.mclaren.com/racing/2025-lineup-confirmed/",
+                "summary": "McLaren Racing has confirmed that Lando Norris and Oscar Piastri will continue as teammates for the 2025 Formula 1 season.",
+                "published": "2025-08-25T12:00:00Z",
+                "source": "McLaren"
+            }
+        ]
+
+        for news_data in sample_news:
+            all_news_items.append(NewsItem(
+                title=news_data["title"],
+                link=news_data["link"],
+                summary=news_data["summary"],
+                published=news_data["published"],
+                source=news_data["source"]
+            ))
+
+        self.news_store.update([item.to_dict() for item in all_news_items])
+        return all_news_items
+
+    def _sample_driver_standings(self) -> List[Driver]:
+        """Sample driver standings shown when the standings page cannot be scraped."""
+        drivers = []
+        sample_drivers = [
+            {"name": "Max Verstappen", "constructor": "Red Bull Racing", "nationality": "Netherlands", "points": "258"},
+            {"name": "Lewis Hamilton", "constructor": "Mercedes", "nationality": "United Kingdom", "points": "187"},
+            {"name": "Charles Leclerc", "constructor": "Ferrari", "nationality": "Monaco", "points": "138"},
+            {"name": "Carlos Sainz", "constructor": "Ferrari", "nationality": "Spain", "points": "116"},
+            {"name": "George Russell", "constructor": "Mercedes", "nationality": "United Kingdom", "points": "111"},
+            {"name": "Sergio Perez", "constructor": "Red Bull Racing", "nationality": "Mexico", "points": "110"},
+            {"name": "Fernando Alonso", "constructor": "Aston Martin", "nationality": "Spain", "points": "45"},
+            {"name": "Lance Stroll", "constructor": "Aston Martin", "nationality": "Canada", "points": "24"}
+        ]
+
+        for i, driver_data in enumerate(sample_drivers[:10], 1):
+            drivers.append(Driver(
+                position=str(i),
+                name=driver_data["name"],
+                nationality=driver_data["nationality"],
+                constructor=driver_data["constructor"],
+                points=driver_data["points"],
+                wins='0'
+            ))
+
+        return drivers
+
+    def _sample_constructor_standings(self) -> List[Constructor]:
+        """Sample constructor standings shown when the teams page cannot be scraped."""
+        constructors = []
+        sample_constructors = [
+            {"name": "Red Bull Racing", "nationality": "Austria", "points": "368"},
+            {"name": "Mercedes", "nationality": "Germany", "points": "298"},
+            {"name": "Ferrari", "nationality": "Italy", "points": "254"},
+            {"name": "McLaren", "nationality": "United Kingdom", "points": "212"},
+            {"name": "Aston Martin", "nationality": "United Kingdom", "points": "69"},
+            {"name": "Alpine", "nationality": "France", "points": "45"},
+            {"name": "Williams", "nationality": "United Kingdom", "points": "11"},
+            {"name": "Sauber", "nationality": "Switzerland", "points": "8"}
+        ]
+
+        for i, constructor_data in enumerate(sample_constructors[:10], 1):
+            constructors.append(Constructor(
+                position=str(i),
+                name=constructor_data["name"],
+                nationality=constructor_data["nationality"],
+                points=constructor_data["points"],
+                wins='0'
+            ))
+
+        return constructors
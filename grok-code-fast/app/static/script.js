@@ -6,6 +6,32 @@ document.addEventListener('DOMContentLoaded', function() {
     const refreshDriversBtn = document.getElementById('refreshDriversBtn');
     const refreshConstructorsBtn = document.getElementById('refreshConstructorsBtn');
 
+    // Escape text before interpolating it into innerHTML templates
+    function escapeHtml(value) {
+        return String(value == null ? '' : value).replace(/[&<>"']/g, ch => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }[ch]));
+    }
+
+    // Static hosting: with <meta name="f1-snapshot-base"> the data comes from the snapshot
+    // files published by 5-mini/scripts/export_snapshot.py instead of this app's API
+    const snapshotMeta = document.querySelector('meta[name="f1-snapshot-base"]');
+    const snapshotBase = snapshotMeta ? snapshotMeta.content : null;
+    let snapshotVersion = null;
+
+    function loadManifest() {
+        return fetch(`${snapshotBase}manifest.json`, { cache: 'no-cache' })
+            .then(response => response.json());
+    }
+
+    // Fetch one data set: /api/<name>, or grok/<name> of the published snapshot
+    function fetchData(name) {
+        if (!snapshotBase) {
+            return fetch(`/api/${name}`);
+        }
+        return loadManifest().then(manifest => fetch(snapshotBase + manifest.files[`grok/${name}`].path));
+    }
+
     // Function to fetch and display news
     function loadNews() {
         // Show loading spinner
@@ -16,8 +42,11 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
         `;
 
-        fetch('/api/news')
-            .then(response => response.json())
+        fetchData('news')
+            .then(response => {
+                newsVersion = response.headers.get('X-News-Version');
+                return response.json();
+            })
             .then(data => {
                 displayNews(data);
             })
@@ -33,6 +62,51 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     }
 
+    // A thumbnail that fails to load is removed rather than shown broken
+    newsContainer.addEventListener('error', event => {
+        if (event.target.classList && event.target.classList.contains('news-thumb')) {
+            event.target.remove();
+        }
+    }, true);
+
+    // Server news version currently on screen (for /api/news?since_version=)
+    let newsVersion = null;
+
+    // Card image, resized and cached by the app; static snapshots have no /thumbnail
+    function thumbnailHtml(item) {
+        if (!item.image || snapshotBase) {
+            return '';
+        }
+        return `<img class="card-img-top news-thumb" src="/thumbnail?src=${encodeURIComponent(item.image)}" width="320" height="180" loading="lazy" alt="">`;
+    }
+
+    // Markup of one news card; data-link identifies it for delta updates
+    function newsCardHtml(item, index) {
+        return `
+        <div class="col-md-6 col-lg-4 mb-4 fade-in" style="animation-delay: ${index * 0.1}s" data-link="${escapeHtml(item.link)}">
+            <div class="card h-100">
+                ${thumbnailHtml(item)}
+                <div class="card-body d-flex flex-column">
+                    <h5 class="card-title">
+                        <i class="fas fa-newspaper"></i> ${escapeHtml(item.title)}
+                    </h5>
+                    <p class="card-text flex-grow-1">${escapeHtml(item.summary)}</p>
+                    <div class="mt-auto">
+                        <small class="text-muted">
+                            <i class="fas fa-calendar"></i> ${new Date(item.published).toLocaleDateString()}
+                            ${item.source ? ` • <i class="fas fa-globe"></i> ${escapeHtml(item.source)}` : ''}
+                        </small>
+                        <br>
+                        <a href="${escapeHtml(item.link)}" target="_blank" class="btn btn-sm btn-outline-primary mt-2">
+                            <i class="fas fa-external-link-alt"></i> Read More
+                        </a>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+    }
+
     // Function to display news items
     function displayNews(newsItems) {
         if (newsItems.length === 0) {
@@ -46,28 +120,7 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        newsContainer.innerHTML = newsItems.map((item, index) => `
-            <div class="col-md-6 col-lg-4 mb-4 fade-in" style="animation-delay: ${index * 0.1}s">
-                <div class="card h-100">
-                    <div class="card-body d-flex flex-column">
-                        <h5 class="card-title">
-                            <i class="fas fa-newspaper"></i> ${item.title}
-                        </h5>
-                        <p class="card-text flex-grow-1">${item.summary}</p>
-                        <div class="mt-auto">
-                            <small class="text-muted">
-                                <i class="fas fa-calendar"></i> ${new Date(item.published).toLocaleDateString()}
-                                ${item.source ? ` • <i class="fas fa-globe"></i> ${item.source}` : ''}
-                            </small>
-                            <br>
-                            <a href="${item.link}" target="_blank" class="btn btn-sm btn-outline-primary mt-2">
-                                <i class="fas fa-external-link-alt"></i> Read More
-                            </a>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        `).join('');
+        newsContainer.innerHTML = newsItems.map((item, index) => newsCardHtml(item, index)).join('');
     }
 
     // Function to fetch and display driver standings
@@ -79,7 +132,7 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
         `;
 
-        fetch('/api/driver-standings')
+        fetchData('driver-standings')
             .then(response => response.json())
             .then(data => {
                 displayDriverStandings(data);
@@ -138,7 +191,7 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
         `;
 
-        fetch('/api/constructor-standings')
+        fetchData('constructor-standings')
             .then(response => response.json())
             .then(data => {
                 displayConstructorStandings(data);
@@ -187,10 +240,99 @@ document.addEventListener('DOMContentLoaded', function() {
         `).join('');
     }
 
-    // Load news and standings on page load
-    loadNews();
-    loadDriverStandings();  // Load driver standings immediately
-    loadConstructorStandings();  // Load constructor standings immediately
+    // Apply a /api/news?since_version= response, touching only the changed cards
+    function applyNewsDelta(delta) {
+        if (delta.full) {
+            displayNews(delta.items);
+        } else if (delta.added.length || delta.removed.length) {
+            if (!newsContainer.querySelector('[data-link]')) {
+                newsContainer.innerHTML = '';  // Drop the "no news" message
+            }
+            const removed = new Set(delta.removed);
+            newsContainer.querySelectorAll('[data-link]').forEach(card => {
+                if (removed.has(card.dataset.link)) {
+                    card.remove();
+                }
+            });
+            // Positions refer to the new list, so insert in ascending order
+            delta.added.forEach(entry => {
+                const template = document.createElement('template');
+                template.innerHTML = newsCardHtml(entry.item, 0).trim();
+                newsContainer.insertBefore(template.content.firstElementChild, newsContainer.children[entry.at] || null);
+            });
+            if (!newsContainer.children.length) {
+                displayNews([]);
+            }
+        }
+        newsVersion = String(delta.version);
+    }
+
+    // Fetch only what changed since the version on screen
+    function syncNews() {
+        if (snapshotBase) {
+            syncSnapshot();
+            return;
+        }
+        if (newsVersion === null) {
+            loadNews();
+            return;
+        }
+        fetch(`/api/news?since_version=${encodeURIComponent(newsVersion)}`)
+            .then(response => response.json())
+            .then(applyNewsDelta)
+            .catch(error => {
+                console.error('Error syncing news:', error);
+            });
+    }
+
+    // Reload everything from the static snapshot, but only when a new version was published
+    function syncSnapshot() {
+        loadManifest()
+            .then(manifest => {
+                if (manifest.version === snapshotVersion) {
+                    return;
+                }
+                return fetch(snapshotBase + manifest.files['grok/dashboard'].path)
+                    .then(response => response.json())
+                    .then(dashboard => {
+                        displayDashboard(dashboard);
+                        snapshotVersion = manifest.version;
+                    });
+            })
+            .catch(error => {
+                console.error('Error syncing snapshot:', error);
+            });
+    }
+
+    // Render every section from one dashboard snapshot
+    function displayDashboard(dashboard) {
+        displayNews(dashboard.news || []);
+        newsVersion = dashboard.news_version != null ? String(dashboard.news_version) : null;
+        displayDriverStandings(dashboard.driver_standings || []);
+        displayConstructorStandings(dashboard.constructor_standings || []);
+    }
+
+    // Function to refresh all sections with a single request
+    function loadDashboard() {
+        fetchData('dashboard')
+            .then(response => response.json())
+            .then(data => {
+                displayDashboard(data);
+            })
+            .catch(error => {
+                console.error('Error fetching dashboard:', error);
+            });
+    }
+
+    // First paint uses the snapshot embedded in the page; fall back to one request
+    const initialData = document.getElementById('dashboard-data');
+    if (initialData) {
+        displayDashboard(JSON.parse(initialData.textContent));
+    } else if (snapshotBase) {
+        syncSnapshot();
+    } else {
+        loadDashboard();
+    }
 
     // Event listeners
     refreshNewsBtn.addEventListener('click', loadNews);
@@ -214,6 +356,6 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
-    // Auto-refresh news every 5 minutes
-    setInterval(loadNews, 300000);
+    // Auto-refresh news every 5 minutes; quiet cycles transfer an empty delta
+    setInterval(syncNews, 300000);
 });
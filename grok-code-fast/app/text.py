@@ -0,0 +1,101 @@
+"""
+Text helpers for cleaning feed content at ingest time.
+"""
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Tags whose content is never readable text
+_SKIP_TAGS = {'script', 'style', 'iframe', 'noscript', 'svg'}
+
+# Block-level tags that separate words once markup is removed
+_BREAK_TAGS = {
+    'br', 'p', 'div', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'blockquote', 'figure', 'figcaption', 'tr', 'td'
+}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text nodes of an HTML fragment."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BREAK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BREAK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def strip_html(text: Optional[str]) -> str:
+    """
+    Remove markup from an HTML fragment.
+
+    Args:
+        text: HTML (or plain) text, e.g. an RSS description
+
+    Returns:
+        The readable text with entities decoded and whitespace collapsed.
+    """
+    if not text:
+        return ''
+    if '<' not in text and '&' not in text:
+        return _WHITESPACE.sub(' ', text).strip()
+
+    parser = _TextExtractor()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception:
+        # Malformed markup: fall back to a crude tag strip
+        return _WHITESPACE.sub(' ', re.sub(r'<[^>]*>', ' ', text)).strip()
+    return _WHITESPACE.sub(' ', ''.join(parser.parts)).strip()
+
+
+def truncate(text: str, max_length: Optional[int]) -> str:
+    """
+    Shorten text to at most max_length characters, preferring a word boundary.
+
+    Args:
+        text: Plain text to shorten
+        max_length: Maximum length including the ellipsis; falsy disables truncation
+
+    Returns:
+        The (possibly) shortened text.
+    """
+    if not max_length or len(text) <= max_length:
+        return text
+    cut = text[:max_length - 1]
+    space = cut.rfind(' ')
+    if space > max_length // 2:
+        cut = cut[:space]
+    return cut.rstrip(' ,.;:-') + '…'
+
+
+def clean_summary(text: Optional[str], max_length: Optional[int] = 280) -> str:
+    """
+    Turn a feed description into a plain-text, length-bounded summary.
+
+    Args:
+        text: Raw description/summary from the feed
+        max_length: Maximum summary length
+
+    Returns:
+        Sanitized summary safe to render as text.
+    """
+    return truncate(strip_html(text), max_length)
@@ -0,0 +1,305 @@
+"""
+Resized news card images, fetched once and kept in a size-bounded disk cache.
+
+Feed items carry their publisher's image URL (see parsers.entry_image). The
+cards load it through /thumbnail?src=..., which fetches the image, crops and
+resizes it to the card size and stores the result on disk, so each image is
+downloaded from the publisher once and browsers get a few kilobytes instead
+of a full-size photo. Requests for an image that is being fetched wait for
+that fetch instead of starting their own.
+
+Only URLs that appeared in a feed (or are already on disk) are fetched, so the
+route is not an open proxy. A failed image is not tried again for retry_after
+seconds. When the cache grows over max_bytes, the least recently used files
+are deleted; after a restart their order is rebuilt from modification times.
+
+Resizing needs Pillow. Without it, JPEG/PNG/GIF/WebP sources of up to
+passthrough_max_bytes are cached unchanged and larger ones are refused.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Tuple
+
+from .deadline import ResponseTooLarge, current_deadline, upstream_get
+from .lazy import LazyModule, is_installed
+from .parsers import is_image
+from .profiling import phase
+
+requests = LazyModule('requests')
+HAVE_PIL = is_installed('PIL')
+Image = LazyModule('PIL.Image')
+ImageOps = LazyModule('PIL.ImageOps')
+
+# Served unchanged when Pillow is not installed
+PASSTHROUGH_TYPES = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif', 'image/webp': '.webp'}
+EXTENSION_TYPES = {extension: mime_type for mime_type, extension in PASSTHROUGH_TYPES.items()}
+
+
+class ThumbnailError(Exception):
+    """Raised when an image cannot be fetched or resized."""
+
+
+@dataclass
+class Thumbnail:
+    """A cached thumbnail file."""
+    path: str
+    mimetype: str
+    size: int
+
+
+@dataclass
+class _Flight:
+    """An in-progress fetch that concurrent requests for the same image wait on."""
+    done: threading.Event = field(default_factory=threading.Event)
+    value: Optional[Thumbnail] = None
+    error: Optional[BaseException] = None
+
+
+class ThumbnailCache:
+    """Fetch-once image proxy with resizing, a bounded disk cache and fetch coalescing."""
+
+    def __init__(self, cache_dir: str, width: int = 320, height: int = 180,
+                 max_bytes: int = 64 * 1024 * 1024, max_source_bytes: int = 8 * 1024 * 1024,
+                 timeout: float = 10, max_known: int = 5000, retry_after: float = 600,
+                 passthrough_max_bytes: int = 300 * 1024, quality: int = 80):
+        """
+        Args:
+            cache_dir: Directory for the resized files (created if missing)
+            width: Card image width in pixels
+            height: Card image height in pixels; images are center-cropped to width:height
+            max_bytes: Disk space the cached files may use
+            max_source_bytes: Larger source images are not downloaded
+            timeout: Fetch timeout; clipped to the request deadline
+            max_known: Feed image URLs remembered as allowed
+            retry_after: Seconds before a failed image is tried again
+            passthrough_max_bytes: Largest source cached unchanged when Pillow is missing
+            quality: JPEG quality of the thumbnails
+        """
+        self.cache_dir = cache_dir
+        self.size = (width, height)
+        self.max_bytes = max_bytes
+        self.max_source_bytes = max_source_bytes
+        self.timeout = timeout
+        self.max_known = max_known
+        self.retry_after = retry_after
+        self.passthrough_max_bytes = passthrough_max_bytes
+        self.quality = quality
+        # key -> (extension, bytes), least recently used first
+        self._files: 'OrderedDict[str, Tuple[str, int]]' = OrderedDict()
+        self._bytes = 0
+        self._known: 'OrderedDict[str, None]' = OrderedDict()
+        self._failed: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._flights: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.evicted = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Index the files left by a previous run, oldest first."""
+        found = []
+        for directory, _, names in os.walk(self.cache_dir):
+            for name in names:
+                key, extension = os.path.splitext(name)
+                if name.startswith('.') or extension not in EXTENSION_TYPES:
+                    continue
+                stat = os.stat(os.path.join(directory, name))
+                found.append((stat.st_mtime, key, extension, stat.st_size))
+        for _, key, extension, size in sorted(found):
+            self._files[key] = (extension, size)
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def key(self, url: str) -> str:
+        """Cache key of url at the configured size."""
+        return hashlib.sha256(f'{self.size[0]}x{self.size[1]} {url}'.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + extension)
+
+    def allow(self, urls: Iterable[str]):
+        """Remember image URLs seen in a feed; only these are fetched."""
+        with self._lock:
+            for url in urls:
+                if not is_image(url, 'image/'):
+                    continue
+                self._known[url] = None
+                self._known.move_to_end(url)
+            while len(self._known) > self.max_known:
+                self._known.popitem(last=False)
+
+    def get(self, url: str) -> Optional[Thumbnail]:
+        """
+        The thumbnail of url, fetching and resizing it on first use.
+
+        Returns:
+            The cached file, or None if url is not a known feed image.
+
+        Raises:
+            ThumbnailError: If the image cannot be fetched or resized (or failed recently).
+            DeadlineExceeded: If the fetch does not fit in the request deadline.
+        """
+        key = self.key(url)
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None:
+                self._files.move_to_end(key)
+                self.hits += 1
+                return self._thumbnail(key, entry)
+            if url not in self._known:
+                return None
+            failed = self._failed.get(key)
+            if failed is not None and time.monotonic() - failed[0] < self.retry_after:
+                raise ThumbnailError(failed[1])
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # The leader's fetch is bounded by its own deadline; wait for it at most as long as ours
+            deadline = current_deadline()
+            if not flight.done.wait(deadline.remaining() if deadline else None):
+                deadline.check()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._load(url, key)
+            return flight.value
+        except ThumbnailError as e:
+            with self._lock:
+                self.failures += 1
+                self._failed[key] = (time.monotonic(), str(e))
+                self._failed.move_to_end(key)
+                while len(self._failed) > self.max_known:
+                    self._failed.popitem(last=False)
+            flight.error = e
+            raise
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _load(self, url: str, key: str) -> Thumbnail:
+        """Fetch, resize and store one image."""
+        with self._lock:
+            self.fetches += 1
+        try:
+            response = upstream_get(url, timeout=self.timeout, max_bytes=self.max_source_bytes, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                'Accept': 'image/avif,image/webp,image/*;q=0.8'
+            })
+            response.raise_for_status()
+        except ResponseTooLarge as e:
+            raise ThumbnailError(str(e)) from e
+        except requests.RequestException as e:
+            raise ThumbnailError(f"Fetching {url} failed: {e}") from e
+
+        with phase('resize'):
+            mime_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            data, extension = self._resize(url, response.content, mime_type)
+        return self._store(key, data, extension)
+
+    def _resize(self, url: str, content: bytes, mime_type: str) -> Tuple[bytes, str]:
+        """Center-crop and scale content to the card size as JPEG, or pass it through without Pillow."""
+        if not HAVE_PIL:
+            if mime_type not in PASSTHROUGH_TYPES:
+                raise ThumbnailError(f"{url} is not a JPEG/PNG/GIF/WebP image ({mime_type or 'no type'})")
+            if len(content) > self.passthrough_max_bytes:
+                raise ThumbnailError(f"{url} is too large to serve without resizing (Pillow is not installed)")
+            return content, PASSTHROUGH_TYPES[mime_type]
+
+        try:
+            with Image.open(io.BytesIO(content)) as source:
+                # JPEGs are decoded at the smallest scale that still covers the card
+                source.draft('RGB', self.size)
+                image = ImageOps.exif_transpose(source)
+                if image.mode != 'RGB':
+                    # Transparent areas become white, like the card background
+                    image = image.convert('RGBA')
+                    background = Image.new('RGB', image.size, 'white')
+                    background.paste(image, mask=image.getchannel('A'))
+                    image = background
+                thumbnail = ImageOps.fit(image, self.size, method=Image.Resampling.LANCZOS)
+                output = io.BytesIO()
+                thumbnail.save(output, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+        except Exception as e:
+            # Pillow raises several types for corrupt, truncated or oversized images
+            raise ThumbnailError(f"Cannot resize {url}: {e}") from e
+        return output.getvalue(), '.jpg'
+
+    def _store(self, key: str, data: bytes, extension: str) -> Thumbnail:
+        """Write a thumbnail atomically and evict old ones beyond max_bytes."""
+        path = self._path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise ThumbnailError(f"Cannot store thumbnail: {e}") from e
+
+        with self._lock:
+            previous = self._files.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._files[key] = (extension, len(data))
+            self._bytes += len(data)
+            self._evict()
+        return self._thumbnail(key, (extension, len(data)))
+
+    def _evict(self):
+        # Called with the lock held; the newest file is always kept
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            key, (extension, size) = self._files.popitem(last=False)
+            self._bytes -= size
+            self.evicted += 1
+            try:
+                os.unlink(self._path(key, extension))
+            except FileNotFoundError:
+                pass
+
+    def _thumbnail(self, key: str, entry: Tuple[str, int]) -> Thumbnail:
+        extension, size = entry
+        return Thumbnail(path=self._path(key, extension), mimetype=EXTENSION_TYPES[extension], size=size)
+
+    def stats(self) -> dict:
+        """Cache size and counters, for debugging."""
+        with self._lock:
+            return {
+                'size': list(self.size),
+                'resizing': HAVE_PIL,
+                'files': len(self._files),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'known_urls': len(self._known),
+                'recent_failures': len(self._failed),
+                'hits': self.hits,
+                'fetches': self.fetches,
+                'coalesced': self.coalesced,
+                'failures': self.failures,
+                'evicted': self.evicted
+            }
@@ -3,6 +3,8 @@ Configuration settings for the F1 News Dashboard application.
 """
 import os
 
+basedir = os.path.abspath(os.path.dirname(__file__))
+
 
 class Config:
     """Base configuration class."""
@@ -28,6 +30,98 @@ class Config:
     # Request timeout settings
     REQUEST_TIMEOUT = 10
 
+    # News summaries are stripped of HTML and cut to this length at ingest
+    SUMMARY_MAX_LENGTH = 280
+
+    # Per-client rate limits: route -> (requests per second, burst). A client is
+    # its RATE_LIMIT_KEY_HEADER API key if that is one of RATE_LIMIT_API_KEYS
+    # (comma-separated in the environment), or its IP otherwise. A client over
+    # its limit gets the last response of the same URL replayed (or a 429 if
+    # there is none yet), with Retry-After. Routes not listed are not limited;
+    # at most RATE_LIMIT_MAX_CLIENTS buckets are kept.
+    RATE_LIMITS = {
+        '/': (1, 10),
+        '/api/dashboard': (1, 10),
+        '/api/news': (1, 10),
+        '/api/driver-standings': (0.5, 5),
+        '/api/constructor-standings': (0.5, 5)
+    }
+    RATE_LIMIT_KEY_HEADER = 'X-API-Key'
+    RATE_LIMIT_API_KEYS = frozenset(key for key in os.environ.get('RATE_LIMIT_API_KEYS', '').split(',') if key)
+    RATE_LIMIT_MAX_CLIENTS = 10000
+
+    # Feed parser backend: 'etree' (stdlib), 'lxml' or 'feedparser' if installed
+    FEED_PARSER = 'etree'
+
+    # Static assets are served fingerprinted from this prefix with immutable caching;
+    # responses smaller than COMPRESS_MIN_SIZE bytes are sent uncompressed
+    ASSET_URL_PREFIX = '/assets'
+    COMPRESS_MIN_SIZE = 512
+
+    # Every request gets REQUEST_DEADLINE seconds for upstream work; sources that
+    # do not fit are skipped and the response is marked X-Partial-Response.
+    # At most UPSTREAM_MAX_IN_FLIGHT fetches run at once, UPSTREAM_MAX_QUEUED
+    # more may wait for a slot and the rest are shed.
+    REQUEST_DEADLINE = 1.5
+    UPSTREAM_MAX_IN_FLIGHT = 8
+    UPSTREAM_MAX_QUEUED = 16
+
+    # Each news feed is polled on its own interval, learned from how often it
+    # publishes (about half its usual gap between posts), within these bounds
+    FEED_POLL_MIN_INTERVAL = 60
+    FEED_POLL_MAX_INTERVAL = 1800
+
+    # requests, bs4 and the feed parser backend are imported on first use rather
+    # than at startup; with PREWARM_IMPORTS a background thread imports them
+    # right after create_app() so the first request does not pay for it
+    PREWARM_IMPORTS = True
+
+    # Feeds and standings pages of at least PARSE_INLINE_THRESHOLD bytes are
+    # parsed in PARSE_WORKERS worker processes, so a big parse does not hold
+    # the GIL against other requests; 0 parses everything in the request thread.
+    # Requests for a page that is still being parsed wait on that job, and at most
+    # PARSE_MAX_PENDING jobs are in flight (further ones are parsed inline)
+    PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', 0))
+    PARSE_INLINE_THRESHOLD = 128 * 1024
+    PARSE_MAX_PENDING = 8
+
+    # News card images are fetched once through /thumbnail, cropped and resized
+    # to THUMBNAIL_SIZE (needs Pillow) and kept in THUMBNAIL_CACHE_DIR, which may
+    # use up to THUMBNAIL_CACHE_MAX_BYTES; None disables the images. Sources
+    # larger than THUMBNAIL_MAX_SOURCE_BYTES are not downloaded.
+    THUMBNAIL_CACHE_DIR = os.environ.get('THUMBNAIL_CACHE_DIR') or os.path.join(basedir, 'data', 'thumbnails')
+    THUMBNAIL_SIZE = (320, 180)
+    THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    THUMBNAIL_MAX_SOURCE_BYTES = 8 * 1024 * 1024
+
+    # Service results are memoized for this many seconds; concurrent requests
+    # share one upstream fetch. With CACHE_STALE_ON_ERROR a failed refresh keeps
+    # serving the last good result instead of the sample data; after a failure
+    # the source is not tried again for CACHE_ERROR_TTL seconds, so an outage
+    # does not cost every request a failing fetch.
+    NEWS_CACHE_TTL = 60  # Feed scheduling decides which sources are re-fetched
+    DRIVER_STANDINGS_CACHE_TTL = 900
+    CONSTRUCTOR_STANDINGS_CACHE_TTL = 900
+    # The combined /api/dashboard snapshot (also embedded in the index page)
+    DASHBOARD_CACHE_TTL = 60
+    CACHE_STALE_ON_ERROR = True
+    CACHE_ERROR_TTL = 30
+
+    # URL (ending in /) of a site published by 5-mini/scripts/export_snapshot.py;
+    # when set, the page loads its data from those static snapshots (e.g. on a
+    # CDN) and makes no API requests to this app
+    SNAPSHOT_BASE_URL = os.environ.get('SNAPSHOT_BASE_URL')
+
+    # Opt-in sampling profiler: PROFILE_SAMPLE_RATE of requests have their stacks
+    # sampled every PROFILE_INTERVAL seconds, aggregated by route and phase on
+    # /debug/profile (collapsed stacks for flamegraph tools). POST {"rate": x}
+    # there changes the rate without a restart; set PROFILE_ADMIN_TOKEN to
+    # require an X-Admin-Token header.
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+    PROFILE_SAMPLE_RATE = 0.01
+    PROFILE_INTERVAL = 0.005
+    PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN')
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -0,0 +1,148 @@
+"""
+Latency of cheap requests while a large standings page is being parsed, inline vs in the parse pool.
+
+Serves the feed fixtures and a generated multi-megabyte drivers page
+through the local stub (scripts/stub_upstream.py). With /api/news
+warm in the cache, one thread requests a cold /api/driver-standings while
+the main thread keeps requesting /api/news. With PARSE_WORKERS=0 the page
+is parsed in the request thread and holds the GIL against /api/news; with
+worker processes only the fetch and the small result stay in this process.
+The pool needs a spare core to help: on a single-CPU machine the worker and
+this process still share one core.
+
+The last section gives standings requests a deadline shorter than the parse:
+the first request times out, but the abandoned job keeps running and later
+requests wait on it instead of submitting the page again (with a small page
+the job may finish before all of them are made).
+
+    python scripts/bench_parse_pool.py [page MB] [workers]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from stub_upstream import serve  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'data', 'fixtures')
+
+
+def big_page(directory, megabytes):
+    """drivers.html with filler markup before the standings table, about megabytes in size."""
+    with open(os.path.join(FIXTURES, 'drivers.html'), 'rb') as f:
+        html = f.read()
+    block = b''.join(
+        b'<div class="promo-card"><a class="promo-link" href="/en/latest/article.%d.html">'
+        b'<span class="promo-title">Story %d</span><p class="promo-text">Paddock notes and race reports.</p></a></div>\n'
+        % (i, i) for i in range(100)
+    )
+    filler = block * max(1, int(megabytes * 1024 * 1024 / len(block)))
+    head, sep, tail = html.partition(b'<main class="main">')
+    with open(os.path.join(directory, 'drivers.html'), 'wb') as f:
+        f.write(head + sep + filler + tail)
+    return len(head) + len(sep) + len(filler) + len(tail)
+
+
+def run(workers, feeds_base, page_url):
+    class BenchConfig(TestingConfig):
+        NEWS_URLS = [feeds_base + name for name in ('planetf1.xml', 'autosport.xml', 'motorsport_atom.xml')]
+        DRIVERS_URL = page_url
+        REQUEST_DEADLINE = 60  # Measure the parse, not the deadline
+        PARSE_WORKERS = workers
+        RATE_LIMITS = {}  # The /api/news loop is one client polling on purpose
+
+    app = create_app(BenchConfig)
+    client = app.test_client()
+    try:
+        assert client.get('/api/news').status_code == 200  # Warm the news cache
+
+        result = {}
+
+        def standings():
+            start = time.perf_counter()
+            response = client.get('/api/driver-standings')
+            result['seconds'] = time.perf_counter() - start
+            result['drivers'] = len(response.get_json())
+
+        thread = threading.Thread(target=standings)
+        thread.start()
+        latencies = []
+        while thread.is_alive():
+            start = time.perf_counter()
+            client.get('/api/news')
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)  # Steady background traffic rather than a busy loop competing for the CPU
+        thread.join()
+
+        latencies.sort()
+        return {
+            'standings_s': result['seconds'],
+            'drivers': result['drivers'],
+            'news_requests': len(latencies),
+            'p50': statistics.median(latencies),
+            'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+            'max': latencies[-1],
+            'parse': app.extensions['f1_service'].parse_pool.stats()
+        }
+    finally:
+        app.extensions['f1_service'].parse_pool.shutdown()
+
+
+def abandoned(workers, page_url, requests=5):
+    """Parse pool counters after requests standings requests that each outlive a short deadline."""
+    class DeadlineConfig(TestingConfig):
+        NEWS_URLS = []
+        DRIVERS_URL = page_url
+        REQUEST_DEADLINE = 0.3
+        CACHE_ERROR_TTL = 0  # Reach the pool on every request instead of backing off after the first timeout
+        PARSE_WORKERS = workers
+        RATE_LIMITS = {}
+
+    app = create_app(DeadlineConfig)
+    client = app.test_client()
+    pool = app.extensions['f1_service'].parse_pool
+    try:
+        for _ in range(requests):
+            client.get('/api/driver-standings')
+        return pool.stats()
+    finally:
+        pool.shutdown()
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    page_dir = tempfile.mkdtemp(prefix='bench-parse-')
+    feeds, feeds_base = serve()
+    pages, pages_base = serve(directory=page_dir)
+    try:
+        size = big_page(page_dir, megabytes)
+        print(f"standings page: {size / 1024 / 1024:.1f} MB\n")
+        print(f"{'workers':>7} {'standings s':>12} {'news reqs':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for n in (0, workers):
+            r = run(n, feeds_base + '/', pages_base + '/drivers.html')
+            assert r['drivers'] == 10, r
+            print(f"{n:>7} {r['standings_s']:>12.2f} {r['news_requests']:>10} "
+                  f"{r['p50']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.2f}   {r['parse']}")
+
+        stats = abandoned(workers, pages_base + '/drivers.html')
+        print(f"\n5 standings requests with a 0.3 s deadline: {stats['pool_jobs']} submitted, "
+              f"{stats['joined_jobs']} joined the running job")
+        # Requests after the job finished are served from the standings cache, so only resubmission is a failure
+        assert stats['pool_jobs'] == 1, stats
+    finally:
+        feeds.shutdown()
+        pages.shutdown()
+        shutil.rmtree(page_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
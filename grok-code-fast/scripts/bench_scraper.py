@@ -0,0 +1,112 @@
+"""
+DOM work per standings scrape, with and without skipping never-matching selectors.
+
+Parses the saved pages under data/fixtures and scrapes them the way
+F1DataService does. "probe" walks every cascade in order on every scrape
+(the old behaviour); "learned" walks the same cascades in the same order
+but, when the first row selector finds nothing, fingerprints the page and
+skips the selectors that cannot match anything on that structure. Both must
+return the same rows. The work counted is tags visited by find()/find_all(),
+so the fingerprint's walk over the whole page is paid for in full; learned
+mode must never visit more tags than probing. drivers_cards.html is on the
+preferred layout, so it is scraped without a fingerprint, exactly as when
+probing. The last section swaps the drivers page for the card page and back
+to show that only the table layout is fingerprinted and learned.
+
+    python scripts/bench_scraper.py [repeats]
+"""
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.scraper import CONSTRUCTOR_LAYOUT, DRIVER_LAYOUT, StandingsScraper  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'data', 'fixtures')
+PAGES = [
+    ('drivers.html', DRIVER_LAYOUT),
+    ('drivers_cards.html', DRIVER_LAYOUT),
+    ('teams.html', CONSTRUCTOR_LAYOUT),
+]
+
+visited = 0
+_searching = False
+_find_all = Tag.find_all
+_descendants = Tag.descendants
+
+
+def _counting_find_all(self, *args, **kwargs):
+    # Tag.find() goes through find_all(limit=1), so this covers both
+    global _searching
+    _searching = True
+    try:
+        return _find_all(self, *args, **kwargs)
+    finally:
+        _searching = False
+
+
+def _counting_descendants(self):
+    # Every find_all() iterates descendants; a find() stops at its first match.
+    # Walks for .text outside a search are the same in both modes and not counted
+    global visited
+    for node in _descendants.fget(self):
+        if _searching and isinstance(node, Tag):
+            visited += 1
+        yield node
+
+
+Tag.find_all = _counting_find_all
+Tag.descendants = property(_counting_descendants)
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def scrape_many(scraper, html, layout, repeats):
+    """Parse and scrape a page repeats times; returns (rows, tags visited per scrape, ms per scrape)."""
+    global visited
+    soups = [BeautifulSoup(html, 'html.parser') for _ in range(repeats)]
+    visited = 0
+    start = time.perf_counter()
+    for soup in soups:
+        rows = scraper.scrape(soup, layout)
+    elapsed = time.perf_counter() - start
+    return rows, visited / repeats, elapsed / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'page':<20} {'mode':<8} {'tags/scrape':>12} {'ms/scrape':>10}")
+    for name, layout in PAGES:
+        html = load(name)
+        probe_rows, probe_tags, probe_ms = scrape_many(StandingsScraper(learn=False), html, layout, repeats)
+
+        learned = StandingsScraper()
+        learned.scrape(BeautifulSoup(html, 'html.parser'), layout)  # First sight of the page: probe
+        rows, learned_tags, learned_ms = scrape_many(learned, html, layout, repeats)
+        assert rows == probe_rows, f"{name}: learned selectors changed the result"
+        assert learned_tags <= probe_tags, f"{name}: learned mode visits more tags than probing"
+
+        print(f"{name:<20} {'probe':<8} {probe_tags:>12.0f} {probe_ms:>10.2f}")
+        print(f"{name:<20} {'learned':<8} {learned_tags:>12.0f} {learned_ms:>10.2f}"
+              f"   ({probe_tags - learned_tags:.0f} fewer tags visited)")
+
+    # Redesign: the same scraper sees the table page, then the card page, then the table again.
+    # The card layout matches the first row selector, so it never needs a strategy
+    scraper = StandingsScraper()
+    for name in ['drivers.html', 'drivers.html', 'drivers_cards.html', 'drivers_cards.html', 'drivers.html']:
+        scraper.scrape(BeautifulSoup(load(name), 'html.parser'), DRIVER_LAYOUT)
+    stats = scraper.cache.stats()
+    print(f"\nredesign sequence of 5 scrapes: {stats['probes']} learned, {stats['hits']} strategy hits")
+    assert stats['probes'] == 1 and stats['hits'] == 2
+
+
+if __name__ == '__main__':
+    main()
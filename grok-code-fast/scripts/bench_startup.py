@@ -0,0 +1,105 @@
+"""
+Worker cold start: import time, create_app() and time to the first response.
+
+Each run is a fresh interpreter, as for an autoscaled or recycled worker,
+with the news feeds pointed at the local stub (scripts/stub_upstream.py).
+
+    lazy      PREWARM_IMPORTS off: create_app() must not import requests, bs4
+              or a feed parser; the first /api/news pays for those imports
+    prewarm   the default config: the first request comes PREWARM_GAP seconds
+              after create_app(), by which time the prewarm thread is done
+
+The medians of the lazy runs are checked against the budgets (milliseconds).
+The script exits 1 when one is exceeded or a heavy module was imported at
+startup, so CI can run it as a regression gate.
+
+    python scripts/bench_startup.py [--runs 7] [--import-budget 250] [--create-budget 60] [--first-budget 250]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from stub_upstream import serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be loaded right after create_app() with PREWARM_IMPORTS off
+HEAVY_MODULES = ['requests', 'bs4', 'xml.etree.ElementTree', 'feedparser', 'lxml', 'multiprocessing', 'PIL']
+PREWARM_GAP = 0.5
+
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+from config import TestingConfig
+t1 = time.perf_counter()
+
+class StartupConfig(TestingConfig):
+    NEWS_URLS = [sys.argv[1] + name for name in ('/planetf1.xml', '/autosport.xml', '/motorsport_atom.xml')]
+    PREWARM_IMPORTS = sys.argv[2] == '1'
+
+app = create_app(StartupConfig)
+t2 = time.perf_counter()
+eager = [name for name in %r if name in sys.modules]
+if StartupConfig.PREWARM_IMPORTS:
+    time.sleep(%r)
+t3 = time.perf_counter()
+response = app.test_client().get('/api/news')
+t4 = time.perf_counter()
+print(json.dumps({
+    'import': (t1 - t0) * 1000, 'create': (t2 - t1) * 1000, 'first': (t4 - t3) * 1000,
+    'eager': eager, 'status': response.status_code, 'items': len(response.get_json())
+}))
+''' % (HEAVY_MODULES, PREWARM_GAP)
+
+
+def run_once(base_url: str, prewarm: bool) -> dict:
+    """Start a fresh interpreter and return its timings."""
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, base_url, '1' if prewarm else '0'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--import-budget', type=float, default=250, help='ms to import the app package')
+    parser.add_argument('--create-budget', type=float, default=60, help='ms for create_app()')
+    parser.add_argument('--first-budget', type=float, default=250, help='ms for the first /api/news')
+    args = parser.parse_args(argv)
+
+    server, base_url = serve()
+    failures = []
+    try:
+        print(f"{'mode':<8} {'import ms':>10} {'create ms':>10} {'first ms':>10}  eager imports")
+        for mode in ('lazy', 'prewarm'):
+            runs = [run_once(base_url, mode == 'prewarm') for _ in range(args.runs)]
+            medians = {key: statistics.median(run[key] for run in runs) for key in ('import', 'create', 'first')}
+            eager = sorted({name for run in runs for name in run['eager']})
+            print(f"{mode:<8} {medians['import']:>10.1f} {medians['create']:>10.1f} {medians['first']:>10.1f}  "
+                  f"{', '.join(eager) or '-'}")
+
+            if any(run['status'] != 200 or not run['items'] for run in runs):
+                failures.append(f"{mode}: /api/news did not return the stub feeds' items")
+            if mode == 'lazy':
+                if eager:
+                    failures.append(f"imported at startup: {', '.join(eager)}")
+                budgets = {'import': args.import_budget, 'create': args.create_budget, 'first': args.first_budget}
+                for key, budget in budgets.items():
+                    if medians[key] > budget:
+                        failures.append(f"{key} took {medians[key]:.1f} ms, over the {budget:.0f} ms budget")
+    finally:
+        server.shutdown()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
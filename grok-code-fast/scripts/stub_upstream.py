@@ -0,0 +1,69 @@
+"""
+Local stand-in for the upstream feeds and standings pages.
+
+Serves the files under data/fixtures over HTTP so the fetch path can be
+exercised by the benchmarks and checks without touching the real sites.
+serve(delay=...) or a ?delay=<seconds> query parameter slows every response
+down, to stand in for a sluggish upstream.
+
+    python scripts/stub_upstream.py [port]
+"""
+import os
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'fixtures')
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler without access logs, honouring ?delay=."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        delay = parse_qs(urlsplit(self.path).query).get('delay')
+        delay = float(delay[0]) if delay else self.server.delay
+        if delay:
+            time.sleep(delay)
+        super().do_GET()
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that give up on a slow response (request deadlines) are expected
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def serve(directory: str = FIXTURES, port: int = 0, delay: float = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stand-in on a daemon thread.
+
+    Args:
+        directory: Directory to serve
+        port: Port to listen on (0 picks a free one)
+        delay: Seconds to wait before every response
+
+    Returns:
+        (server, base URL without a trailing slash); call server.shutdown() to stop it.
+    """
+    server = _Server(('127.0.0.1', port), partial(_QuietHandler, directory=directory))
+    server.daemon_threads = True
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    stub, base_url = serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Serving {FIXTURES} at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.shutdown()
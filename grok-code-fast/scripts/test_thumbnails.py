@@ -0,0 +1,175 @@
+"""
+End-to-end checks of the news card images against the local stub upstream.
+
+A temporary directory served by scripts/stub_upstream.py holds a feed
+whose media:content, media:thumbnail and enclosure images point back at the
+stub, plus large generated photos. The app polls that feed and the checks
+run against /thumbnail:
+
+    - every parser backend extracts the image URL and /api/news carries it
+    - the first request fetches and resizes to THUMBNAIL_SIZE; repeats are hits
+    - concurrent first requests for a slow image share one upstream fetch
+    - URLs that were not in a feed get a 404, so the route is not an open proxy
+    - a broken image is a 502 and is not fetched again right away
+    - the disk cache stays under its byte bound and survives a restart
+    - responses carry a long-lived immutable Cache-Control
+
+The resize checks need Pillow and are skipped without it. Exits 1 on failure.
+
+    python scripts/test_thumbnails.py
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.parsers import available_parsers, get_parser  # noqa: E402
+from app.thumbnails import HAVE_PIL  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from stub_upstream import serve  # noqa: E402
+
+SIZE = (320, 180)
+SLOW = 0.5
+BOUND = 30 * 1024  # Any two of the three thumbnails fit, not all three
+
+FEED = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+<channel><title>stub</title>
+<item><title>Content</title><link>https://example.com/1</link><description>a</description>
+  <pubDate>Mon, 04 Mar 2024 10:00:00 GMT</pubDate>
+  <media:content url="{base}/big0.jpg" medium="image" width="2400" height="1600"/></item>
+<item><title>Thumbnail first</title><link>https://example.com/2</link><description>b</description>
+  <pubDate>Mon, 04 Mar 2024 09:00:00 GMT</pubDate>
+  <media:group><media:content url="{base}/big-full.jpg" medium="image"/>
+  <media:thumbnail url="{base}/big1.png"/></media:group></item>
+<item><title>Enclosure</title><link>https://example.com/3</link><description>c</description>
+  <pubDate>Mon, 04 Mar 2024 08:00:00 GMT</pubDate>
+  <enclosure url="{base}/big2.jpg?delay={slow}" type="image/jpeg" length="0"/></item>
+<item><title>Video only</title><link>https://example.com/4</link><description>d</description>
+  <pubDate>Mon, 04 Mar 2024 07:00:00 GMT</pubDate>
+  <enclosure url="{base}/clip.mp4" type="video/mp4" length="0"/></item>
+<item><title>Gone</title><link>https://example.com/5</link><description>e</description>
+  <pubDate>Mon, 04 Mar 2024 06:00:00 GMT</pubDate>
+  <media:thumbnail url="{base}/missing.jpg"/></item>
+</channel></rss>
+'''
+
+
+def check(condition: bool, message: str) -> bool:
+    """Print one check's outcome and return it."""
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    return bool(condition)
+
+
+def make_images(directory: str):
+    """Write noisy photos so sources and thumbnails have realistic sizes."""
+    from PIL import Image
+    Image.effect_noise((2400, 1600), 64).convert('RGB').save(os.path.join(directory, 'big0.jpg'))
+    # Transparent, and small enough to stay under the 8 MB source limit
+    Image.effect_noise((1200, 800), 64).convert('RGBA').save(os.path.join(directory, 'big1.png'))
+    Image.effect_noise((2400, 1600), 64).convert('RGB').save(os.path.join(directory, 'big2.jpg'))
+
+
+def make_app(base_url: str, cache_dir: str):
+    """App polling the stub feed, with rate limits and import prewarm off."""
+    class ThumbnailConfig(TestingConfig):
+        NEWS_URLS = [base_url + '/feed.xml']
+        PREWARM_IMPORTS = False
+        RATE_LIMITS = {}
+        THUMBNAIL_CACHE_DIR = cache_dir
+        THUMBNAIL_SIZE = SIZE
+        THUMBNAIL_CACHE_MAX_BYTES = BOUND
+
+    return create_app(ThumbnailConfig)
+
+
+def main() -> int:
+    ok = True
+    upstream = tempfile.mkdtemp()
+    cache_dir = tempfile.mkdtemp()
+    server, base_url = serve(upstream)
+    try:
+        with open(os.path.join(upstream, 'feed.xml'), 'w', encoding='utf-8') as f:
+            f.write(FEED.format(base=base_url, slow=SLOW))
+        with open(os.path.join(upstream, 'feed.xml'), 'rb') as f:
+            content = f.read()
+        expected = [base_url + '/big0.jpg', base_url + '/big1.png', f'{base_url}/big2.jpg?delay={SLOW}',
+                    '', base_url + '/missing.jpg']
+        for name in available_parsers():
+            images = [entry['image'] for entry in get_parser(name).parse(content)]
+            ok &= check(images == expected, f"{name} backend extracts the images")
+
+        if not HAVE_PIL:
+            print("skip resize checks: Pillow is not installed")
+            return 0 if ok else 1
+        from PIL import Image
+        make_images(upstream)
+
+        app = make_app(base_url, cache_dir)
+        client = app.test_client()
+        news = client.get('/api/news').get_json()
+        ok &= check([item['image'] for item in news] == expected, "/api/news carries the image URLs")
+
+        def thumbnail(src, test_client=client):
+            response = test_client.get('/thumbnail', query_string={'src': src})
+            body = response.data
+            response.close()
+            return response, body
+
+        def stats(test_client=client):
+            return test_client.get('/debug/thumbnails').get_json()
+
+        response, body = thumbnail(expected[0])
+        ok &= check(response.status_code == 200 and response.mimetype == 'image/jpeg', "first request: 200 image/jpeg")
+        ok &= check(Image.open(io.BytesIO(body)).size == SIZE, f"resized to {SIZE[0]}x{SIZE[1]} ({len(body)} bytes)")
+        cache_control = response.headers.get('Cache-Control', '')
+        ok &= check('immutable' in cache_control and 'max-age=31536000' in cache_control,
+                    f"long-lived Cache-Control: {cache_control}")
+        response, body = thumbnail(expected[1])
+        ok &= check(response.status_code == 200 and Image.open(io.BytesIO(body)).size == SIZE, "transparent PNG resized")
+        thumbnail(expected[0])
+        current = stats()
+        ok &= check(current['fetches'] == 2 and current['hits'] == 1, f"second request is a cache hit: {current}")
+
+        codes = []
+        threads = [threading.Thread(target=lambda: codes.append(thumbnail(expected[2], app.test_client())[0].status_code))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        current = stats()
+        ok &= check(codes == [200] * 6 and current['fetches'] == 3 and current['coalesced'] == 5,
+                    f"6 concurrent requests for a slow image share one fetch: {current}")
+
+        ok &= check(thumbnail(base_url + '/feed.xml')[0].status_code == 404, "a URL not seen in a feed is refused")
+        ok &= check(thumbnail('http://169.254.169.254/latest/meta-data/')[0].status_code == 404, "no open proxy")
+        first, again = thumbnail(expected[4])[0], thumbnail(expected[4])[0]
+        current = stats()
+        ok &= check(first.status_code == again.status_code == 502 and current['fetches'] == 4,
+                    f"a missing image is a 502, not retried right away: {current}")
+        on_disk = sum(os.path.getsize(os.path.join(directory, name))
+                      for directory, _, names in os.walk(cache_dir) for name in names)
+        ok &= check(current['evicted'] >= 1 and on_disk <= BOUND,
+                    f"disk cache within its bound: {on_disk} bytes, {current['evicted']} evicted")
+
+        # A new worker serves the files already on disk without fetching
+        restarted = make_app(base_url, cache_dir).test_client()
+        response, _ = thumbnail(expected[2], restarted)
+        current = stats(restarted)
+        ok &= check(response.status_code == 200 and current['fetches'] == 0, f"restart serves from disk: {current}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(upstream, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())